@@ -0,0 +1,450 @@
+#!/usr/bin/env python
+# benchmarks/run_benchmarks.py
+
+"""
+Conversion benchmarks
+
+Times the stages of a conversion on synthetic WWARA extracts (see
+synthetic.py) of 1k, 10k, 100k and 1M records:
+
+    process_file[ENGINE]  whole file conversion with each engine
+    process_row           Converter.convert_row, one row at a time
+    validate_row          ChirpValidator.validate_row, one row at a time
+    write_csv[pandas]     DataFrame.to_csv of the CHIRP table
+    write_csv[stdlib]     stdlib_backend.write_chirp_csv of the CHIRP rows
+    read[pandas]          parsing the extract with pd.read_csv
+    read[parse-cache]     loading the parsed DataFrame from a parse cache
+    read[typed]           parsing the extract with the typed reader
+
+Each benchmark reports the best and the median time of several runs,
+the throughput in records per second and, from a separate run under
+tracemalloc, the peak memory allocated. The whole file conversions must
+produce identical output with every engine; a mismatch fails the run.
+
+Results are compared with a baseline file, and the run fails (exit
+status 1) when the best time of a benchmark is slower than its
+baseline by more than the threshold; noise only ever adds time, so the
+best of several runs varies much less than a single run or the median.
+A run of a small extract mostly measures noise, so only the extracts in
+GATE_SIZES count, and only with at least MIN_GATE_REPEAT timed runs;
+other runs print their changes without failing.
+
+The numbers depend on the machine, so the baseline file records the
+machine it was measured on (see machine_info), and a run on another
+machine is not checked either. Record a baseline with --save on the
+machine that checks for regressions, one that runs nothing else at the
+time. The baseline.json in this directory was recorded on a shared
+single-CPU Linux VM (see its "machine" entry), where the best of five
+runs of a 100k extract still varied by up to 40% from run to run, so
+it documents the expected magnitudes rather than a usable gate.
+
+The conversions run with the channel limit raised to the number of
+records, so that every record is converted and written. With the default
+limit of 500 memories, most records of a large extract would be rejected
+and logged instead.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1k,10k,100k,1m --no-memory
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --sizes 100k --threshold 0.10
+"""
+
+import argparse
+import filecmp
+import functools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import pandas as pd  # noqa: E402
+
+from synthetic import write_extract  # noqa: E402
+from wwara_chirp.chirpvalidator import ChirpLimits  # noqa: E402
+from wwara_chirp.converter import (Converter, read_wwara_frame,  # noqa: E402
+                                   write_output_file)
+from wwara_chirp.core import ENGINES  # noqa: E402
+from wwara_chirp.parse_cache import read_cached  # noqa: E402
+from wwara_chirp.schema import read_typed_frame  # noqa: E402
+from wwara_chirp.stdlib_backend import write_chirp_csv  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+# Version of the baseline file layout
+BASELINE_FORMAT_VERSION = 2
+
+# Extract sizes selectable with --sizes
+SIZES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+DEFAULT_SIZES = '1k,10k'
+
+# Extract sizes whose timings are long enough to check for regressions
+GATE_SIZES = ('100k', '1m')
+
+# The per-row benchmarks hold every row in memory as a pd.Series, so they
+# run on at most this many records of an extract
+PER_ROW_LIMIT = 100_000
+
+# A benchmark fails when its best time is this much slower than its
+# baseline, and by more than MIN_REGRESSION_SECONDS, below which timings
+# are mostly noise
+DEFAULT_THRESHOLD = 0.25
+MIN_REGRESSION_SECONDS = 0.02
+
+# Timed runs per benchmark; fewer than MIN_GATE_REPEAT are not checked
+DEFAULT_REPEAT = 5
+MIN_GATE_REPEAT = 5
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one benchmark.
+
+    Attributes:
+        name: Benchmark name, e.g. 'process_file[row]/10k'.
+        records: Number of records processed per run.
+        seconds: Best wall clock time of a run.
+        median_seconds: Median wall clock time of the runs.
+        records_per_second: Throughput of the best run.
+        peak_bytes: Peak memory allocated during a run, or 0 if not
+            measured.
+    """
+    name: str
+    records: int
+    seconds: float
+    median_seconds: float
+    records_per_second: float
+    peak_bytes: int = 0
+
+    @property
+    def size(self) -> str:
+        """Size label of the extract, e.g. '10k'."""
+        return self.name.rsplit('/', 1)[1]
+
+    def change(self, base: Dict[str, Any]) -> float:
+        """Return the slowdown against a baseline result, as a fraction."""
+        return self.seconds / base['seconds'] - 1
+
+
+def measure(function: Callable[[], Any], repeat: int,
+            memory: bool) -> Tuple[float, float, int]:
+    """Time a function and optionally measure its peak memory.
+
+    Args:
+        function: The code to measure, taking no arguments.
+        repeat: Number of timed runs. They follow an untimed warm-up
+            run.
+        memory: Whether to make one more run under tracemalloc.
+
+    Returns:
+        A tuple of (best seconds, median seconds, peak bytes). Peak
+        bytes is 0 when memory is False.
+    """
+    function()
+    timings = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    peak = 0
+    if memory:
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak
+
+
+class ExtractBenchmarks:
+    """The benchmarks of one synthetic extract.
+
+    Attributes:
+        label: Size label, e.g. '10k'.
+        input_file: Path to the synthetic extract.
+        work_dir: Directory for output files.
+        limits: CHIRP limits that accept every record of the extract.
+    """
+
+    def __init__(self, label: str, input_file: str, work_dir: str):
+        self.label = label
+        self.input_file = input_file
+        self.work_dir = work_dir
+        self.df = pd.read_csv(input_file, skiprows=[0])
+        self.limits = ChirpLimits(channel_max=max(len(self.df), 499))
+        self.outputs: Dict[str, str] = {}
+
+    def _output_file(self, name: str) -> str:
+        """Return a fresh output path, removing an earlier file."""
+        output_file = os.path.join(self.work_dir, f'{name}-{self.label}.csv')
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        return output_file
+
+    def process_file(self, engine: str) -> None:
+        """Convert the extract with one engine."""
+        output_file = self._output_file(engine)
+        Converter(self.limits, engine).convert_file(self.input_file,
+                                                    output_file)
+        self.outputs[engine] = output_file
+
+    def run(self, engines: List[str], repeat: int, memory: bool
+            ) -> List[BenchmarkResult]:
+        """Run every benchmark on this extract.
+
+        Args:
+            engines: Engines to time process_file with.
+            repeat: Number of timed runs per benchmark.
+            memory: Whether to measure peak memory.
+
+        Returns:
+            One BenchmarkResult per benchmark.
+
+        Raises:
+            AssertionError: If two engines write different output.
+        """
+        records = len(self.df)
+        results = []
+
+        def record(name, function, count):
+            seconds, median_seconds, peak = measure(function, repeat,
+                                                    memory)
+            results.append(BenchmarkResult(
+                f'{name}/{self.label}', count, seconds, median_seconds,
+                count / seconds, peak))
+
+        for engine in engines:
+            record(f'process_file[{engine}]',
+                   functools.partial(self.process_file, engine), records)
+        for engine in engines[1:]:
+            if not filecmp.cmp(self.outputs[engines[0]],
+                               self.outputs[engine], shallow=False):
+                raise AssertionError(f'{engine} and {engines[0]} engines '
+                                     f'wrote different output')
+
+        sample = self.df.head(PER_ROW_LIMIT)
+        wwara_rows = [wwara_row for index, wwara_row in sample.iterrows()]
+        converter = Converter(self.limits)
+        chirp_rows = [converter.convert_row(wwara_row)
+                      for wwara_row in wwara_rows]
+
+        def process_rows():
+            row_converter = Converter(self.limits)
+            for wwara_row in wwara_rows:
+                row_converter.convert_row(wwara_row)
+
+        def validate_rows():
+            for chirp_row in chirp_rows:
+                converter.validator.validate_row(chirp_row)
+
+        record('process_row', process_rows, len(wwara_rows))
+        record('validate_row', validate_rows, len(chirp_rows))
+
+        chirp_table = Converter(self.limits).convert_frame(self.df)
+        chirp_dicts = chirp_table.to_dict('records')
+
+        def write_pandas():
+            write_output_file(self._output_file('write-pandas'), chirp_table)
+
+        def write_stdlib():
+            write_chirp_csv(self._output_file('write-stdlib'), chirp_dicts)
+
+        record('write_csv[pandas]', write_pandas, records)
+        record('write_csv[stdlib]', write_stdlib, records)
+
+        def read_pandas():
+            read_wwara_frame(self.input_file)
+
+        def read_parse_cache():
+            read_cached(self.input_file, 'rptrlist', 'frame',
+                        read_wwara_frame, self.work_dir)
+
+        record('read[pandas]', read_pandas, records)
+        record('read[parse-cache]', read_parse_cache, records)
+        record('read[typed]', functools.partial(read_typed_frame,
+                                                self.input_file), records)
+        return results
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, Any],
+            threshold: float) -> List[str]:
+    """Find benchmarks that regressed against the baseline.
+
+    Only the extracts in GATE_SIZES are checked.
+
+    Args:
+        results: This run's results.
+        baseline: Baseline results keyed by benchmark name.
+        threshold: Allowed slowdown of the best time, as a fraction of
+            the baseline's. Slowdowns under MIN_REGRESSION_SECONDS are
+            always allowed.
+
+    Returns:
+        The names of the benchmarks that are too slow.
+    """
+    regressions = []
+    for result in results:
+        if result.name not in baseline or result.size not in GATE_SIZES:
+            continue
+        base = baseline[result.name]
+        if (result.change(base) > threshold
+                and result.seconds - base['seconds']
+                > MIN_REGRESSION_SECONDS):
+            regressions.append(result.name)
+    return regressions
+
+
+def print_results(results: List[BenchmarkResult],
+                  baseline: Dict[str, Any]) -> None:
+    """Print a table of results, with the change against the baseline."""
+    print(f'{"benchmark":<30} {"best":>9} {"median":>9} {"records/s":>11} '
+          f'{"peak MiB":>9} {"change":>8}')
+    for result in results:
+        line = (f'{result.name:<30} {result.seconds:>9.4f} '
+                f'{result.median_seconds:>9.4f} '
+                f'{result.records_per_second:>11,.0f} '
+                f'{result.peak_bytes / 2 ** 20:>9.1f}')
+        if result.name in baseline:
+            line += f' {result.change(baseline[result.name]):>+8.0%}'
+        print(line)
+
+
+def machine_info() -> Dict[str, Any]:
+    """Describe the machine and software the benchmarks run on."""
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+    }
+
+
+def load_baseline(baseline_file: str) -> Dict[str, Any]:
+    """Read a baseline file, or return {} if there is none.
+
+    A baseline written in another layout is ignored, as if missing.
+    """
+    if not os.path.isfile(baseline_file):
+        return {}
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('format') != BASELINE_FORMAT_VERSION:
+        print(f'Ignoring a baseline in an older layout: {baseline_file}')
+        return {}
+    return baseline
+
+
+def save_baseline(baseline_file: str, results: List[BenchmarkResult],
+                  repeat: int) -> None:
+    """Write this run's results as a baseline file."""
+    with open(baseline_file, 'w') as f:
+        json.dump({'format': BASELINE_FORMAT_VERSION,
+                   'machine': machine_info(),
+                   'repeat': repeat,
+                   'results': {result.name: asdict(result)
+                               for result in results}}, f, indent=2)
+        f.write('\n')
+
+
+def gate_skipped(baseline: Dict[str, Any], repeat: int) -> Optional[str]:
+    """Return why this run cannot be checked for regressions, if so."""
+    if baseline.get('machine') != machine_info():
+        return 'the baseline was recorded on another machine'
+    if repeat < MIN_GATE_REPEAT:
+        return f'fewer than {MIN_GATE_REPEAT} timed runs per benchmark'
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Benchmark WWARA to CHIRP conversion')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='Comma separated extract sizes, from '
+                             f'{", ".join(SIZES)} (default: {DEFAULT_SIZES})')
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help='Comma separated engines for process_file '
+                             f'(default: {",".join(ENGINES)})')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Timed runs per benchmark; the best is '
+                             'compared with the baseline, and fewer than '
+                             f'{MIN_GATE_REPEAT} are not checked (default: '
+                             f'{DEFAULT_REPEAT})')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc runs')
+    parser.add_argument('--data-dir', default=None,
+                        help='Directory to keep the synthetic extracts in '
+                             '(default: a temporary directory)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline file to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown against the baseline, as a '
+                             f'fraction (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--save', metavar='PATH', default=None,
+                        help='Write the results to this baseline file')
+    args = parser.parse_args(argv)
+
+    labels = args.sizes.lower().split(',')
+    engines = args.engines.split(',')
+    for label in labels:
+        if label not in SIZES:
+            parser.error(f'unknown size: {label}')
+    for engine in engines:
+        if engine not in ENGINES:
+            parser.error(f'unknown engine: {engine}')
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    # Keep rejected-row errors from flooding the console
+    logging.getLogger('wwara_chirp').addHandler(logging.NullHandler())
+    logging.getLogger('wwara_chirp').propagate = False
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = args.data_dir or work_dir
+        os.makedirs(data_dir, exist_ok=True)
+        for label in labels:
+            input_file = os.path.join(
+                data_dir, f'WWARA-rptrlist-synthetic-{label}.csv')
+            if not os.path.isfile(input_file):
+                write_extract(input_file, SIZES[label])
+            benchmarks = ExtractBenchmarks(label, input_file, work_dir)
+            results.extend(benchmarks.run(engines, args.repeat,
+                                          not args.no_memory))
+
+    baseline = load_baseline(args.baseline)
+    if args.save:
+        save_baseline(args.save, results, args.repeat)
+    print_results(results, baseline.get('results', {}))
+    if not baseline:
+        return 0
+
+    reason = gate_skipped(baseline, args.repeat)
+    if reason:
+        print(f'Not checked for regressions: {reason}')
+        return 0
+    if not any(result.size in GATE_SIZES for result in results):
+        print(f'Not checked for regressions: no extract of '
+              f'{", ".join(GATE_SIZES)} records')
+        return 0
+    regressions = compare(results, baseline['results'], args.threshold)
+    if regressions:
+        print(f'Slower than the baseline by more than '
+              f'{args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# benchmarks/startup.py
+
+"""
+Startup benchmark
+
+Measures the wall clock time of short wwara_chirp command lines, the way
+scripted pipelines run them: each one in a fresh interpreter. Every
+command is run several times and the median is reported, together with
+the change against a baseline file of earlier numbers.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 20 --save my-baseline.json
+
+The numbers depend on the machine, so compare runs made on the same one.
+startup_baseline.json holds the numbers from before pandas was imported
+lazily, measured with this script.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SMALL_INPUT = os.path.join(ROOT, 'tests', 'test_files',
+                           'WWARA-rptrlist-TEST.csv')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'startup_baseline.json')
+
+# Benchmark name and command line arguments; OUTPUT is replaced by a
+# fresh output file for every run
+COMMANDS = {
+    'version': ['--version'],
+    'help': ['--help'],
+    'convert_row': [SMALL_INPUT, 'OUTPUT', '--engine', 'row'],
+    'convert_vectorized': [SMALL_INPUT, 'OUTPUT', '--engine', 'vectorized'],
+    'convert_stdlib': [SMALL_INPUT, 'OUTPUT', '--engine', 'stdlib'],
+}
+
+
+def time_command(arguments: List[str], repeat: int, work_dir: str) -> float:
+    """Run the CLI repeat times and return the median wall clock time.
+
+    Args:
+        arguments: Command line arguments for wwara_chirp.
+        repeat: Number of runs.
+        work_dir: Directory for output and log files.
+
+    Returns:
+        The median time of one run, in seconds.
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, 'src'))
+    timings = []
+    for run in range(repeat):
+        output_file = os.path.join(work_dir, f'output-{run}.csv')
+        command = [sys.executable, '-m', 'wwara_chirp.wwara_chirp'] + [
+            output_file if argument == 'OUTPUT' else argument
+            for argument in arguments]
+        start = time.perf_counter()
+        subprocess.run(command, cwd=work_dir, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+        if os.path.exists(output_file):
+            os.remove(output_file)
+    return statistics.median(timings)
+
+
+def run_benchmarks(repeat: int) -> Dict[str, float]:
+    """Time every command in COMMANDS.
+
+    Args:
+        repeat: Number of runs per command.
+
+    Returns:
+        The median time of each command, in seconds.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        return {name: time_command(arguments, repeat, work_dir)
+                for name, arguments in COMMANDS.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Measure wwara_chirp command line startup time')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='Runs per command (default: 10)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='JSON file of earlier timings to compare with')
+    parser.add_argument('--save', metavar='PATH',
+                        help='Write these timings to a JSON file')
+    args = parser.parse_args()
+
+    timings = run_benchmarks(args.repeat)
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['timings']
+
+    print(f'{"command":<20} {"median":>9} {"baseline":>9} {"change":>8}')
+    for name, seconds in timings.items():
+        line = f'{name:<20} {seconds:>8.3f}s'
+        if name in baseline:
+            change = (seconds - baseline[name]) / baseline[name]
+            line += f' {baseline[name]:>8.3f}s {change:>+8.0%}'
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': sys.version.split()[0],
+                       'repeat': args.repeat,
+                       'timings': timings}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# benchmarks/synthetic.py
+
+"""
+Synthetic WWARA extracts
+
+Generates WWARA repeater lists of any size for benchmarking. The files
+follow the layout of the real extract: a DATA_SPEC_VERSION title line,
+the WWARA_COLUMNS header, and every field quoted. The records mix the
+amateur bands, CTCSS tones, DCS codes and digital modes in roughly the
+proportions of the real repeater list, so that every branch of the
+conversion is exercised. The same size and seed always give the same
+file.
+
+Usage:
+    python benchmarks/synthetic.py 100000 WWARA-rptrlist-100k.csv
+"""
+
+import argparse
+import csv
+import datetime
+import os
+import random
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from wwara_chirp.columns import WWARA_COLUMNS  # noqa: E402
+from wwara_chirp.mock_chirp import MockChirp  # noqa: E402
+
+TITLE_LINE = 'DATA_SPEC_VERSION=2015.2.2'
+
+# Band name, share of records, lowest and highest output frequency and
+# channel step in MHz, and the input frequency offset in MHz
+BANDS = [
+    ('10m', 0.02, 29.62, 29.68, 0.02, -0.1),
+    ('6m', 0.05, 52.80, 53.98, 0.02, -1.7),
+    ('2m', 0.45, 145.11, 147.39, 0.02, 0.6),
+    ('1.25m', 0.08, 223.86, 224.98, 0.02, -1.6),
+    ('70cm', 0.35, 440.0, 449.975, 0.025, 5.0),
+    ('33cm', 0.03, 927.0125, 927.9875, 0.025, -25.0),
+    ('23cm', 0.02, 1282.0, 1283.0, 0.025, -12.0),
+]
+
+# Mode flag and share of records; FM_WIDE takes the rest
+MODE_SHARES = [
+    ('FM_NARROW', 0.05),
+    ('DSTAR_DV', 0.07),
+    ('DSTAR_DD', 0.01),
+    ('DMR', 0.09),
+    ('P25_PHASE_1', 0.03),
+    ('ATV', 0.002),
+]
+
+# Share of records with a CTCSS tone and with a DCS code; the rest are
+# carrier squelch
+CTCSS_SHARE = 0.65
+DCS_SHARE = 0.05
+
+STATES = ['WA', 'WA', 'WA', 'OR', 'ID']
+CITIES = ['Seattle', 'Tacoma', 'Everett', 'Olympia', 'Bellingham',
+          'Spokane', 'Yakima', 'Portland', 'Cougar Mtn', 'Baldi Mtn',
+          'Tiger Mtn East', 'Lookout Mtn', 'University Place', 'Issaquah']
+LOCALES = ['PUGET SOUND', 'PUGET SOUND- SOUTH', 'PUGET SOUND- NORTH',
+           'KING COUNTY', 'SNOHOMISH COUNTY', 'WASHINGTON- SW',
+           'WASHINGTON- NORTHWEST', 'WASHINGTON- EAST']
+SPONSORS = ['WWARA', 'Puget Sound Rptr Group', 'Seattle ACS', 'BeachNet',
+            'Federal Way ARC', 'K7TGU', '5CountyEmCommGrp']
+COMMENTS = ['Linked to the Northwest network', 'Net Tue 1900',
+            'Emergency power', 'Open repeater, all welcome']
+
+
+def _frequency_pair(rng: random.Random) -> List[str]:
+    """Pick an output and input frequency on a weighted random band."""
+    band = rng.choices(BANDS, weights=[band[1] for band in BANDS])[0]
+    name, share, low, high, step, offset = band
+    output = low + step * rng.randrange(int(round((high - low) / step)) + 1)
+    if name == '2m' and output < 147.0:
+        offset = -offset
+    return [f'{output:.4f}', f'{output + offset:.4f}']
+
+
+def synthetic_record(rng: random.Random, record_id: int) -> Dict[str, str]:
+    """Build one synthetic WWARA record.
+
+    Args:
+        rng: Random number generator to draw the fields from.
+        record_id: FC_RECORD_ID of the record.
+
+    Returns:
+        The record's fields as strings, keyed by WWARA column.
+    """
+    record = dict.fromkeys(WWARA_COLUMNS, '')
+    record.update(dict.fromkeys(
+        ['FM_WIDE', 'FM_NARROW', 'DSTAR_DV', 'DSTAR_DD', 'DMR', 'FUSION',
+         'P25_PHASE_1', 'P25_PHASE_2', 'NXDN_DIGITAL', 'NXDN_MIXED', 'ATV',
+         'DATV', 'RACES', 'ARES', 'WX'], 'N'))
+
+    record['FC_RECORD_ID'] = f' {record_id}'
+    record['SOURCE'] = 'WWARA'
+    record['OUTPUT_FREQ'], record['INPUT_FREQ'] = _frequency_pair(rng)
+    record['STATE'] = rng.choice(STATES)
+    record['CITY'] = rng.choice(CITIES)
+    record['LOCALE'] = rng.choice(LOCALES)
+    record['CALL'] = (rng.choice(['K7', 'W7', 'WA7', 'KE7', 'N7'])
+                      + ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+                                for letter in range(rng.randint(2, 3))))
+    record['SPONSOR'] = rng.choice(SPONSORS)
+
+    squelch = rng.random()
+    if squelch < CTCSS_SHARE:
+        tone = f'{rng.choice(MockChirp.TONES):g}'
+        record['CTCSS_IN'] = tone
+        if rng.random() < 0.6:
+            record['CTCSS_OUT'] = tone
+    elif squelch < CTCSS_SHARE + DCS_SHARE:
+        record['DCS_CDCSS'] = f'{rng.choice(MockChirp.DTCS_CODES):03d}'
+
+    mode = rng.choices(
+        [flag for flag, share in MODE_SHARES] + ['FM_WIDE'],
+        weights=[share for flag, share in MODE_SHARES]
+        + [1 - sum(share for flag, share in MODE_SHARES)])[0]
+    record[mode] = 'Y'
+    if mode == 'DMR':
+        record['DMR_COLOR_CODE'] = f'CC{rng.randint(0, 3)}'
+    elif mode == 'P25_PHASE_1':
+        record['P25_NAC'] = '293'
+    elif mode == 'FM_WIDE' and rng.random() < 0.05:
+        record['FUSION'] = 'Y'
+        record['FUSION_DSQ'] = f'{rng.randint(0, 127):03d}'
+
+    for flag in ('RACES', 'ARES', 'WX'):
+        if rng.random() < 0.03:
+            record[flag] = 'Y'
+    if rng.random() < 0.5:
+        record['URL'] = f'http://www.{record["CALL"].lower()}.org'
+    record['LATITUDE'] = f'{rng.uniform(45.5, 49.0):.{rng.randint(2, 6)}f}'
+    record['LONGITUDE'] = f'{rng.uniform(-124.5, -117.0):.{rng.randint(2, 6)}f}'
+    expiration = (datetime.date(2026, 1, 1)
+                  + datetime.timedelta(days=rng.randrange(5 * 365)))
+    record['EXPIRATION_DATE'] = expiration.isoformat()
+    if rng.random() < 0.05:
+        record['COMMENT'] = rng.choice(COMMENTS)
+    return record
+
+
+def write_extract(output_file: str, rows: int, seed: int = 0) -> None:
+    """Write a synthetic WWARA extract.
+
+    Args:
+        output_file: Path to the CSV file to write.
+        rows: Number of records.
+        seed: Random seed; the same seed gives the same file.
+    """
+    rng = random.Random(seed)
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        f.write(TITLE_LINE + '\n')
+        writer = csv.DictWriter(f, fieldnames=WWARA_COLUMNS,
+                                quoting=csv.QUOTE_ALL, lineterminator='\n')
+        writer.writeheader()
+        for index in range(rows):
+            writer.writerow(synthetic_record(rng, 1000 + index))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Write a synthetic WWARA extract')
+    parser.add_argument('rows', type=int, help='Number of records')
+    parser.add_argument('output_file', help='Path to the CSV file to write')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed (default: 0)')
+    args = parser.parse_args()
+    write_extract(args.output_file, args.rows, args.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# benchmarks/validation.py
+
+"""
+Validation micro-benchmark
+
+Measures the cost of a single ChirpValidator call, for each field
+validator and for validate_row, on the CHIRP rows converted from the
+test extract. Every validator is called on every row's value in turn,
+many times over, and the best of several runs is reported in
+nanoseconds per call, together with the change against a baseline file.
+
+Usage:
+    python benchmarks/validation.py
+    python benchmarks/validation.py --number 200 --save my-baseline.json
+
+The numbers depend on the machine, so compare runs made on the same one.
+validation_baseline.json holds the numbers from before the validators
+used precompiled ValidationRules, measured with this script.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from wwara_chirp.chirpvalidator import ChirpValidator  # noqa: E402
+from wwara_chirp.core import convert_record  # noqa: E402
+from wwara_chirp.stdlib_backend import read_input  # noqa: E402
+
+SMALL_INPUT = os.path.join(ROOT, 'tests', 'test_files',
+                           'WWARA-rptrlist-TEST.csv')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks',
+                                'validation_baseline.json')
+
+# Benchmark name, validator name and the CHIRP column it is called with;
+# a column of None passes the whole row
+VALIDATORS = [
+    ('location', 'validate_location', 'Location'),
+    ('frequency', 'validate_frequency', 'Frequency'),
+    ('duplex', 'validate_duplex', 'Duplex'),
+    ('offset', 'validate_offset', 'Offset'),
+    ('tone', 'validate_tone', 'Tone'),
+    ('tone_value', 'validate_tone', 'rToneFreq'),
+    ('dtcs_code', 'validate_dtcs_code', 'DtcsCode'),
+    ('dtcs_polarity', 'validate_dtcs_polarity', 'DtcsPolarity'),
+    ('mode', 'validate_mode', 'Mode'),
+    ('name', 'validate_name', 'Name'),
+    ('comment', 'validate_comment', 'Comment'),
+    ('row', 'validate_row', None),
+]
+
+
+def chirp_rows() -> List[Dict[str, Any]]:
+    """Convert the test extract to CHIRP rows."""
+    return [convert_record(record, location)
+            for location, record in enumerate(read_input(SMALL_INPUT))]
+
+
+def time_calls(validator: Callable[[Any], bool], values: List[Any],
+               number: int, repeat: int) -> float:
+    """Return the best time of one validator call, in nanoseconds.
+
+    Args:
+        validator: The validator to call.
+        values: Values to call it with, one call each per pass.
+        number: Passes over values per timed run.
+        repeat: Number of timed runs; the best one counts.
+    """
+    def calls():
+        for value in values:
+            validator(value)
+
+    best = min(timeit.repeat(calls, number=number, repeat=repeat))
+    return best / (number * len(values)) * 1e9
+
+
+def run_benchmarks(number: int, repeat: int) -> Dict[str, float]:
+    """Time every validator in VALIDATORS.
+
+    Args:
+        number: Passes over the rows per timed run.
+        repeat: Number of timed runs per validator.
+
+    Returns:
+        Nanoseconds per call of each benchmark.
+    """
+    rows = chirp_rows()
+    timings = {}
+    for name, method, column in VALIDATORS:
+        validator = getattr(ChirpValidator, method)
+        values = rows if column is None else [row[column] for row in rows]
+        timings[name] = time_calls(validator, values, number, repeat)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Measure the per-call cost of the CHIRP validators')
+    parser.add_argument('--number', type=int, default=50,
+                        help='Passes over the test rows per run '
+                             '(default: 50)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timed runs per validator (default: 5)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='JSON file of earlier timings to compare with')
+    parser.add_argument('--save', metavar='PATH',
+                        help='Write these timings to a JSON file')
+    args = parser.parse_args()
+
+    # Invalid test rows would log an error on every call
+    logging.getLogger('wwara_chirp').addHandler(logging.NullHandler())
+    logging.getLogger('wwara_chirp').propagate = False
+    logging.getLogger('wwara_chirp').setLevel(logging.CRITICAL)
+
+    timings = run_benchmarks(args.number, args.repeat)
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['timings']
+
+    print(f'{"validator":<16} {"ns/call":>9} {"baseline":>9} {"change":>8}')
+    for name, nanoseconds in timings.items():
+        line = f'{name:<16} {nanoseconds:>9.0f}'
+        if name in baseline:
+            change = (nanoseconds - baseline[name]) / baseline[name]
+            line += f' {baseline[name]:>9.0f} {change:>+8.0%}'
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': sys.version.split()[0],
+                       'number': args.number,
+                       'timings': timings}, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
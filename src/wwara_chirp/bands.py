@@ -0,0 +1,300 @@
+# src/wwara_chirp/bands.py
+
+"""
+Amateur bands
+
+The amateur band plan as far as repeaters are concerned: the edges of
+each band that has repeaters and its standard repeater offsets. Bands
+are looked up with bisect on their sorted lower edges, so classifying a
+frequency costs a few comparisons however many bands there are.
+
+FrequencyFilter selects the records of the bands and ranges given with
+--band and --freq-range before they are converted, so that records
+outside them are never converted at all. A single conversion selects
+with one scan: a numpy mask over a DataFrame, or a loop over stdlib
+records. A FrequencyIndex sorts the output frequencies of a repeater
+list once, after which the repeaters of any band or frequency range are
+found with two bisections; a long-lived extract, such as the one the
+conversion service holds, keeps one for all of its queries.
+
+Example:
+    >>> band_of(146.96).name
+    '2m'
+    >>> FrequencyFilter.from_args(['2m', '70cm']).select(
+    ...     [146.96, 224.5, 442.1])
+    [0, 2]
+"""
+
+import math
+import numbers
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, List, Mapping,
+                    Optional, Sequence, Tuple)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class Band:
+    """An amateur band with repeaters.
+
+    Attributes:
+        name: Band name, e.g. '2m'.
+        lowest: Lower band edge, in MHz.
+        highest: Upper band edge, in MHz.
+        offsets: Standard repeater offsets, in MHz.
+    """
+    name: str
+    lowest: float
+    highest: float
+    offsets: Tuple[float, ...] = ()
+
+    def __contains__(self, frequency: float) -> bool:
+        return self.lowest <= frequency <= self.highest
+
+
+# The US amateur bands with repeaters, in frequency order
+BANDS = (
+    Band('10m', 28.0, 29.7, (0.1,)),
+    Band('6m', 50.0, 54.0, (0.5, 1.0, 1.7)),
+    Band('2m', 144.0, 148.0, (0.6,)),
+    Band('1.25m', 222.0, 225.0, (1.6,)),
+    Band('70cm', 420.0, 450.0, (5.0,)),
+    Band('33cm', 902.0, 928.0, (12.0, 25.0)),
+    Band('23cm', 1240.0, 1300.0, (12.0, 20.0)),
+)
+
+# Bands by name, for --band
+BANDS_BY_NAME = {band.name: band for band in BANDS}
+
+# Other names users give the bands, usually a frequency in MHz
+BAND_ALIASES = {
+    '28': '10m', '50': '6m', '144': '2m', '146': '2m', '220': '1.25m',
+    '222': '1.25m', '440': '70cm', '902': '33cm', '1296': '23cm',
+}
+
+# Largest difference from a standard offset that still counts as one,
+# in MHz
+OFFSET_TOLERANCE = 0.0005
+
+_BAND_EDGES = [band.lowest for band in BANDS]
+
+
+def band_of(frequency: float) -> Optional[Band]:
+    """Return the amateur band of a frequency.
+
+    Args:
+        frequency: Frequency in MHz.
+
+    Returns:
+        The Band, or None outside the amateur bands.
+    """
+    position = bisect_right(_BAND_EDGES, frequency) - 1
+    if position >= 0 and frequency <= BANDS[position].highest:
+        return BANDS[position]
+    return None
+
+
+def is_standard_offset(band: Band, offset: float) -> bool:
+    """Return True if offset is one of the band's standard offsets.
+
+    A band without standard offsets accepts any offset.
+    """
+    if not band.offsets:
+        return True
+    return any(abs(offset - standard) <= OFFSET_TOLERANCE
+               for standard in band.offsets)
+
+
+def find_band(name: str) -> Band:
+    """Return the band with a name or alias from BAND_ALIASES.
+
+    Raises:
+        ValueError: If there is no such band.
+    """
+    name = name.strip().lower()
+    band = BANDS_BY_NAME.get(BAND_ALIASES.get(name, name))
+    if band is None:
+        raise ValueError(f'Unknown band: {name} (choose from '
+                         f'{", ".join(BANDS_BY_NAME)})')
+    return band
+
+
+def parse_freq_range(text: str) -> Tuple[float, float]:
+    """Parse a frequency range written as LOW-HIGH, in MHz.
+
+    Raises:
+        ValueError: If text is not a range of two numbers, low first.
+    """
+    low, separator, high = text.partition('-')
+    try:
+        lowest, highest = float(low), float(high)
+    except ValueError:
+        raise ValueError(f'Frequency range must be LOW-HIGH in MHz, '
+                         f'not {text}') from None
+    if not lowest <= highest:
+        raise ValueError(f'Frequency range must be LOW-HIGH in MHz, '
+                         f'not {text}')
+    return lowest, highest
+
+
+class FrequencyIndex:
+    """Repeaters sorted by output frequency, for range queries.
+
+    Missing frequencies are left out of the index.
+
+    Attributes:
+        frequencies: The indexed frequencies, in ascending order.
+        positions: The input position of each of frequencies.
+    """
+
+    def __init__(self, frequencies: Sequence[Any]):
+        present = [position for position, frequency in enumerate(frequencies)
+                   if isinstance(frequency, numbers.Real)
+                   and not math.isnan(frequency)]
+        present.sort(key=frequencies.__getitem__)
+        self.positions = present
+        self.frequencies = [float(frequencies[position])
+                            for position in present]
+
+    @classmethod
+    def from_frame(cls, df: 'pd.DataFrame') -> 'FrequencyIndex':
+        """Index the OUTPUT_FREQ column of a WWARA DataFrame.
+
+        Values that are not numbers count as missing.
+        """
+        import pandas as pd
+
+        return cls(pd.to_numeric(df['OUTPUT_FREQ'], errors='coerce').tolist())
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def between(self, lowest: float, highest: float) -> List[int]:
+        """Return the positions of the frequencies from lowest to highest.
+
+        Both ends are included. The positions are in frequency order.
+        """
+        start = bisect_left(self.frequencies, lowest)
+        end = bisect_right(self.frequencies, highest)
+        return self.positions[start:end]
+
+    def select(self, ranges: Iterable[Tuple[float, float]]) -> List[int]:
+        """Return the positions in any of several ranges, in input order."""
+        selected = set()
+        for lowest, highest in ranges:
+            selected.update(self.between(lowest, highest))
+        return sorted(selected)
+
+    def count_by_band(self) -> Dict[str, int]:
+        """Return the number of repeaters in each band."""
+        return {band.name: len(self.between(band.lowest, band.highest))
+                for band in BANDS}
+
+
+@dataclass(frozen=True)
+class FrequencyFilter:
+    """The frequency ranges a conversion is limited to.
+
+    Attributes:
+        ranges: (lowest, highest) output frequencies in MHz, both ends
+            included.
+    """
+    ranges: Tuple[Tuple[float, float], ...]
+
+    @classmethod
+    def from_args(cls, bands: Iterable[str] = (),
+                  freq_ranges: Iterable[str] = ()) -> 'FrequencyFilter':
+        """Build a filter from --band names and --freq-range ranges.
+
+        Each argument may hold several values separated by commas.
+
+        Raises:
+            ValueError: If a band or range is invalid.
+        """
+        ranges = []
+        for argument in bands:
+            for name in argument.split(','):
+                band = find_band(name)
+                ranges.append((band.lowest, band.highest))
+        for argument in freq_ranges:
+            for text in argument.split(','):
+                ranges.append(parse_freq_range(text))
+        return cls(tuple(ranges))
+
+    def __str__(self) -> str:
+        return ', '.join(f'{lowest:g}-{highest:g} MHz'
+                         for lowest, highest in self.ranges)
+
+    def __contains__(self, frequency: Any) -> bool:
+        return isinstance(frequency, numbers.Real) and any(
+            lowest <= frequency <= highest for lowest, highest in self.ranges)
+
+    def select(self, frequencies: Sequence[Any]) -> List[int]:
+        """Return the positions of the frequencies inside the ranges.
+
+        Args:
+            frequencies: Output frequencies in MHz, in input order.
+
+        Returns:
+            The selected positions, in input order.
+        """
+        return [position for position, frequency in enumerate(frequencies)
+                if frequency in self]
+
+    def select_records(self, records: Sequence[Mapping[str, Any]]
+                       ) -> List[Mapping[str, Any]]:
+        """Return the WWARA records whose OUTPUT_FREQ is inside the ranges.
+
+        Args:
+            records: WWARA records keyed by column name.
+
+        Returns:
+            The selected records, in input order.
+        """
+        positions = self.select([record['OUTPUT_FREQ'] for record in records])
+        return [records[position] for position in positions]
+
+    def positions(self, df: 'pd.DataFrame',
+                  index: Optional[FrequencyIndex] = None) -> 'np.ndarray':
+        """Return the positions of the rows of df inside the ranges.
+
+        Without an index the OUTPUT_FREQ column is compared with numpy,
+        which is the fastest way to answer a single query. Values that
+        are not numbers count as missing.
+
+        Args:
+            df: WWARA DataFrame.
+            index: FrequencyIndex.from_frame(df), kept by the caller for
+                repeated queries of the same DataFrame.
+
+        Returns:
+            The selected positions, in input order.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if index is not None:
+            return np.asarray(index.select(self.ranges), dtype=np.intp)
+        frequencies = pd.to_numeric(df['OUTPUT_FREQ'], errors='coerce')
+        keep = np.zeros(len(df), dtype=bool)
+        for lowest, highest in self.ranges:
+            keep |= frequencies.between(lowest, highest).to_numpy()
+        return np.flatnonzero(keep)
+
+    def select_frame(self, df: 'pd.DataFrame',
+                     index: Optional[FrequencyIndex] = None
+                     ) -> 'pd.DataFrame':
+        """Return the rows of a WWARA DataFrame inside the ranges.
+
+        Args:
+            df: WWARA DataFrame.
+            index: FrequencyIndex.from_frame(df), if the caller keeps one.
+
+        Returns:
+            The selected rows, indexed from 0, in input order.
+        """
+        return df.iloc[self.positions(df, index)].reset_index(drop=True)
@@ -0,0 +1,191 @@
+# src/wwara_chirp/banks.py
+
+"""
+Bank splitting
+
+CHIRP memories are numbered from 0 to 499, so a single CHIRP file holds
+at most 500 repeaters, and a full WWARA extract has more. Rather than
+drop every repeater past the last memory, a banked conversion spreads
+the converted memories over several CHIRP files, bank_000.csv,
+bank_001.csv, ..., each numbered from the first memory again.
+
+Memories go to banks in input order. A bank holds at most bank_size of
+them; a full bank is followed by the next. With a bank key, memories
+are first grouped by band, city or mode, and each group fills its own
+banks, named after the group (bank_000_2m.csv, bank_001_70cm.csv).
+
+Each record is converted and validated exactly once. It gets its
+Location when it is added to a bank, so no Location is ever out of
+range and no valid record is dropped.
+
+Example:
+    >>> banks = BankWriter(bank_size=200, bank_by='band')
+    >>> for wwara_row, chirp_row in converted:
+    ...     banks.add(wwara_row, chirp_row)
+    >>> banks.write('chirp-banks')
+    ['chirp-banks/bank_000_2m.csv', 'chirp-banks/bank_001_70cm.csv']
+"""
+
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from wwara_chirp.bands import band_of
+from wwara_chirp.chirpvalidator import ChirpLimits, DEFAULT_LIMITS
+from wwara_chirp.core import is_missing
+
+log = logging.getLogger(__name__)
+
+# How memories are grouped into banks, selectable with --bank-by
+BANK_KEYS = ('count', 'band', 'city', 'mode')
+
+# Bank files are named BANK_PREFIX_NNN.csv, or BANK_PREFIX_NNN_key.csv
+BANK_PREFIX = 'bank'
+
+# The key of memories the bank key has no value for
+OTHER_KEY = 'other'
+
+
+def _count_key(wwara_row: Mapping[str, Any],
+               chirp_row: Mapping[str, Any]) -> str:
+    return ''
+
+
+def _band_key(wwara_row: Mapping[str, Any],
+              chirp_row: Mapping[str, Any]) -> str:
+    band = band_of(wwara_row['OUTPUT_FREQ'])
+    return OTHER_KEY if band is None else band.name
+
+
+def _city_key(wwara_row: Mapping[str, Any],
+              chirp_row: Mapping[str, Any]) -> str:
+    city = wwara_row['CITY']
+    if is_missing(city) or city == '':
+        return OTHER_KEY
+    return str(city)
+
+
+def _mode_key(wwara_row: Mapping[str, Any],
+              chirp_row: Mapping[str, Any]) -> str:
+    return chirp_row['Mode'] or OTHER_KEY
+
+
+# Key functions of BANK_KEYS, called with the WWARA and the CHIRP row
+KEY_FUNCTIONS: Dict[str, Callable[[Mapping[str, Any], Mapping[str, Any]],
+                                  str]] = {
+    'count': _count_key,
+    'band': _band_key,
+    'city': _city_key,
+    'mode': _mode_key,
+}
+
+
+def bank_file_name(number: int, key: str = '') -> str:
+    """Return the file name of a bank.
+
+    Args:
+        number: Bank number, from 0.
+        key: Bank key; '' when banks are split by count only.
+
+    Returns:
+        'bank_007.csv', or 'bank_007_<key>.csv' with the key reduced to
+        lower case letters, digits, dots and dashes.
+    """
+    name = f'{BANK_PREFIX}_{number:03d}'
+    if key:
+        slug = re.sub(r'[^a-z0-9.]+', '-', key.lower()).strip('-')
+        name += f'_{slug or OTHER_KEY}'
+    return name + '.csv'
+
+
+def existing_bank_files(output_dir: str) -> List[str]:
+    """Return the bank files already in output_dir."""
+    if not os.path.isdir(output_dir):
+        return []
+    pattern = re.compile(rf'^{BANK_PREFIX}_\d{{3,}}(_.*)?\.csv$')
+    return sorted(name for name in os.listdir(output_dir)
+                  if pattern.match(name))
+
+
+class BankWriter:
+    """Collects valid CHIRP rows into numbered banks.
+
+    Attributes:
+        limits: CHIRP limits; banks are numbered from channel_min.
+        bank_size: Most memories in one bank.
+        bank_by: One of BANK_KEYS.
+        rows_added: Number of rows added to all banks.
+    """
+
+    def __init__(self, limits: Optional[ChirpLimits] = None,
+                 bank_size: Optional[int] = None, bank_by: str = 'count'):
+        self.limits = limits or DEFAULT_LIMITS
+        capacity = self.limits.channel_max - self.limits.channel_min + 1
+        if bank_size is None:
+            bank_size = capacity
+        if not 0 < bank_size <= capacity:
+            raise ValueError(f'Bank size must be between 1 and {capacity}, '
+                             f'not {bank_size}')
+        if bank_by not in BANK_KEYS:
+            raise ValueError(f'Unknown bank key: {bank_by}')
+        self.bank_size = bank_size
+        self.bank_by = bank_by
+        self._key = KEY_FUNCTIONS[bank_by]
+        self._banks: Dict[str, List[List[Mapping[str, Any]]]] = {}
+        self.rows_added = 0
+
+    def add(self, wwara_row: Mapping[str, Any],
+            chirp_row: Dict[str, Any]) -> Tuple[str, int]:
+        """Add a valid CHIRP row to the next free memory of its bank.
+
+        Sets the row's Location to that memory.
+
+        Args:
+            wwara_row: The WWARA record the row was converted from.
+            chirp_row: The CHIRP row, as a dict.
+
+        Returns:
+            The bank key and the row's Location.
+        """
+        key = self._key(wwara_row, chirp_row)
+        banks = self._banks.setdefault(key, [[]])
+        if len(banks[-1]) == self.bank_size:
+            banks.append([])
+        location = self.limits.channel_min + len(banks[-1])
+        chirp_row['Location'] = location
+        banks[-1].append(chirp_row)
+        self.rows_added += 1
+        return key, location
+
+    def banks(self) -> List[Tuple[str, List[Mapping[str, Any]]]]:
+        """Return the (key, rows) of each bank, in file number order.
+
+        Keys come in the order their first row was added.
+        """
+        return [(key, rows) for key, key_banks in self._banks.items()
+                for rows in key_banks]
+
+    def write(self, output_dir: str) -> List[str]:
+        """Write one CHIRP file per bank.
+
+        Args:
+            output_dir: Directory for the bank files; created if needed.
+
+        Returns:
+            The paths of the files written.
+        """
+        from wwara_chirp.stdlib_backend import write_chirp_csv
+
+        os.makedirs(output_dir, exist_ok=True)
+        output_files = []
+        for number, (key, rows) in enumerate(self.banks()):
+            output_file = os.path.join(output_dir,
+                                       bank_file_name(number, key))
+            write_chirp_csv(output_file, rows)
+            log.info(f'Bank file written: {output_file} ({len(rows)} '
+                     f'memories)')
+            output_files.append(output_file)
+        log.info(f'Number of memory channels written: {self.rows_added} '
+                 f'in {len(output_files)} bank(s)')
+        return output_files
@@ -0,0 +1,327 @@
+# src/wwara_chirp/batch.py
+
+"""
+Batch conversion
+
+Converts many WWARA inputs in one invocation by fanning ``process_file``
+calls out across a ProcessPoolExecutor. Each conversion gets its own
+Converter, and conversion is CPU bound, so separate processes let
+throughput scale with the number of cores. The workers do not write the
+log file themselves: they send their log records through a queue to
+the parent process, which writes them with its own handlers, so that
+the processes never rotate one file at the same time.
+
+Jobs come either from input files on the command line, written to an
+output directory, or from a manifest file with one ``input,output`` pair
+per line:
+
+    # regional variants
+    WWARA-rptrlist-20260201.csv, out/all.csv
+    DataBaseExtract.zip, out/from-zip.csv
+
+Usage:
+    wwara_chirp batch --manifest jobs.txt --workers 4
+    wwara_chirp batch --output-dir out WWARA-*.csv
+"""
+
+import argparse
+import csv
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from dataclasses import dataclass
+from typing import List, Optional
+
+from wwara_chirp.bands import FrequencyFilter
+from wwara_chirp.comment_template import CommentTemplate
+from wwara_chirp.geo import GeoFilter
+
+log = logging.getLogger(__name__)
+
+# Appended to the input file name when jobs are built from --output-dir
+OUTPUT_SUFFIX = '-chirp.csv'
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """One conversion in a batch.
+
+    Attributes:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        output_file: Path to the CHIRP CSV file to write.
+    """
+    input_file: str
+    output_file: str
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome of one BatchJob.
+
+    Attributes:
+        job: The job that was run.
+        ok: True if the output file was written.
+        seconds: Wall clock time of the conversion.
+        error: Why the job failed, or '' if it succeeded.
+    """
+    job: BatchJob
+    ok: bool
+    seconds: float
+    error: str = ''
+
+
+def read_manifest(manifest_file: str) -> List[BatchJob]:
+    """Read batch jobs from a manifest file.
+
+    Each non-blank line that does not start with '#' holds an input and
+    an output path separated by a comma. Relative paths are resolved
+    against the manifest's directory.
+
+    Args:
+        manifest_file: Path to the manifest.
+
+    Returns:
+        The jobs, in manifest order.
+
+    Raises:
+        ValueError: If a line does not have exactly two fields.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    jobs = []
+    with open(manifest_file, 'r', newline='') as f:
+        for line_number, fields in enumerate(csv.reader(f), start=1):
+            if not fields or fields[0].strip().startswith('#'):
+                continue
+            if len(fields) != 2:
+                raise ValueError(f'{manifest_file}:{line_number}: expected '
+                                 f'"input,output", got {fields}')
+            input_file, output_file = (os.path.join(base_dir, path.strip())
+                                       for path in fields)
+            jobs.append(BatchJob(input_file, output_file))
+    return jobs
+
+
+def jobs_from_inputs(input_files: List[str], output_dir: str
+                     ) -> List[BatchJob]:
+    """Build one job per input file, writing into output_dir.
+
+    Args:
+        input_files: Paths to WWARA CSV files or extract archives.
+        output_dir: Directory for the CHIRP files. Each is named after its
+            input, with OUTPUT_SUFFIX in place of the extension.
+
+    Returns:
+        The jobs, in input order.
+    """
+    jobs = []
+    for input_file in input_files:
+        stem = os.path.splitext(os.path.basename(input_file))[0]
+        output_file = os.path.join(output_dir, stem + OUTPUT_SUFFIX)
+        jobs.append(BatchJob(input_file, output_file))
+    return jobs
+
+
+def check_jobs(jobs: List[BatchJob]) -> None:
+    """Check that no two jobs write the same output file.
+
+    Raises:
+        ValueError: If two jobs write the same output file.
+    """
+    outputs = [os.path.abspath(job.output_file) for job in jobs]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError('Two or more batch jobs write the same output file')
+
+
+def _init_worker(records: 'multiprocessing.Queue', level: int) -> None:
+    """Send a worker's log records to the parent process.
+
+    A forked worker inherits the handlers of the parent, including the
+    rotating log file handler; they are replaced by a QueueHandler.
+    """
+    package_log = logging.getLogger('wwara_chirp')
+    for handler in list(package_log.handlers):
+        package_log.removeHandler(handler)
+    package_log.addHandler(QueueHandler(records))
+    package_log.setLevel(level)
+
+
+def run_job(job: BatchJob, engine: str = 'row', member: str = 'rptrlist',
+            comment_template: Optional[CommentTemplate] = None,
+            frequency_filter: Optional[FrequencyFilter] = None,
+            geo_filter: Optional[GeoFilter] = None,
+            parse_cache: Optional[str] = None,
+            reader: str = 'pandas') -> BatchResult:
+    """Run one conversion. This is the function each worker executes.
+
+    Args:
+        job: The job to run.
+        engine: Conversion engine passed to ``process_file``.
+        member: List to read from a ZIP archive.
+        comment_template: Template of the CHIRP comment.
+        frequency_filter: If set, only convert records in its ranges.
+        geo_filter: If set, only convert records inside its area.
+        parse_cache: If set, directory of the parse cache; '' for the
+            input's directory.
+        reader: How the pandas engines read the input, one of READERS.
+
+    Returns:
+        The job's BatchResult. Failures are reported, not raised.
+    """
+    from wwara_chirp.wwara_chirp import process_file
+
+    start = time.perf_counter()
+    try:
+        process_file(job.input_file, job.output_file, engine=engine,
+                     member=member, comment_template=comment_template,
+                     frequency_filter=frequency_filter,
+                     geo_filter=geo_filter, parse_cache=parse_cache,
+                     reader=reader)
+    except SystemExit:
+        # process_file exits when an input or output file check fails
+        return BatchResult(job, False, time.perf_counter() - start,
+                           'input or output file rejected, see the log')
+    except Exception as error:
+        return BatchResult(job, False, time.perf_counter() - start,
+                           f'{type(error).__name__}: {error}')
+    return BatchResult(job, True, time.perf_counter() - start)
+
+
+def run_batch(jobs: List[BatchJob], workers: Optional[int] = None,
+              engine: str = 'row', member: str = 'rptrlist',
+              comment_template: Optional[CommentTemplate] = None,
+              frequency_filter: Optional[FrequencyFilter] = None,
+              geo_filter: Optional[GeoFilter] = None,
+              parse_cache: Optional[str] = None,
+              reader: str = 'pandas') -> List[BatchResult]:
+    """Run jobs in parallel across worker processes.
+
+    Args:
+        jobs: The jobs to run.
+        workers: Number of worker processes; defaults to the CPU count.
+        engine: Conversion engine passed to ``process_file``.
+        member: List to read from ZIP archives.
+        comment_template: Template of the CHIRP comment.
+        frequency_filter: If set, only convert records in its ranges.
+        geo_filter: If set, only convert records inside its area.
+        parse_cache: If set, directory of the parse cache; '' for the
+            input's directory.
+        reader: How the pandas engines read the input, one of READERS.
+
+    The workers' log records are written by the handlers of the
+    package logger of this process.
+
+    Returns:
+        One BatchResult per job, in job order.
+
+    Raises:
+        ValueError: If two jobs write the same output file, or workers
+            is less than 1.
+    """
+    check_jobs(jobs)
+    if workers is not None and workers < 1:
+        raise ValueError(f'Invalid number of workers: {workers}')
+
+    package_log = logging.getLogger('wwara_chirp')
+    records = multiprocessing.Queue()
+    listener = QueueListener(records, *package_log.handlers,
+                             respect_handler_level=True)
+    listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(records,
+                                           package_log.level)) as executor:
+            futures = [executor.submit(run_job, job, engine, member,
+                                       comment_template, frequency_filter,
+                                       geo_filter, parse_cache, reader)
+                       for job in jobs]
+            return [future.result() for future in futures]
+    finally:
+        listener.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for ``wwara_chirp batch``.
+
+    Args:
+        argv: Arguments after the 'batch' subcommand.
+
+    Returns:
+        0 if every job succeeded, 1 otherwise.
+    """
+    from wwara_chirp.wwara_chirp import (ENGINES, add_comment_arguments,
+                                         add_filter_arguments,
+                                         add_parse_cache_arguments,
+                                         add_reader_argument,
+                                         comment_template_from_args,
+                                         frequency_filter_from_args,
+                                         geo_filter_from_args,
+                                         parse_cache_from_args)
+    from wwara_chirp.wwara_extract import EXTRACT_MEMBERS
+
+    parser = argparse.ArgumentParser(
+        prog='wwara_chirp batch',
+        description='Convert many WWARA files in parallel')
+    parser.add_argument('input_files', nargs='*',
+                        help='WWARA CSV files or DataBaseExtract.zip archives '
+                             '(requires --output-dir)')
+    parser.add_argument('--manifest', metavar='PATH',
+                        help='File listing "input,output" pairs, one per line')
+    parser.add_argument('--output-dir', metavar='DIR',
+                        help='Directory for the outputs of input_files')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--engine', choices=ENGINES, default='row',
+                        help='Conversion engine (default: row)')
+    parser.add_argument('--member', choices=sorted(EXTRACT_MEMBERS),
+                        default='rptrlist',
+                        help='List to read from ZIP archives '
+                             '(default: rptrlist)')
+    add_comment_arguments(parser)
+    add_filter_arguments(parser)
+    add_parse_cache_arguments(parser)
+    add_reader_argument(parser)
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    comment_template = comment_template_from_args(parser, args)
+    frequency_filter = frequency_filter_from_args(parser, args)
+    geo_filter = geo_filter_from_args(parser, args)
+
+    jobs = []
+    if args.manifest:
+        try:
+            jobs.extend(read_manifest(args.manifest))
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    if args.input_files:
+        if not args.output_dir:
+            parser.error('input files require --output-dir')
+        os.makedirs(args.output_dir, exist_ok=True)
+        jobs.extend(jobs_from_inputs(args.input_files, args.output_dir))
+    if not jobs:
+        parser.error('nothing to convert: give input files or --manifest')
+    try:
+        check_jobs(jobs)
+    except ValueError as error:
+        parser.error(str(error))
+
+    results = run_batch(jobs, workers=args.workers, engine=args.engine,
+                        member=args.member, comment_template=comment_template,
+                        frequency_filter=frequency_filter,
+                        geo_filter=geo_filter,
+                        parse_cache=parse_cache_from_args(args),
+                        reader=args.reader)
+    failed = 0
+    for result in results:
+        if result.ok:
+            print(f'OK     {result.job.input_file} -> '
+                  f'{result.job.output_file} ({result.seconds:.2f}s)')
+        else:
+            failed += 1
+            print(f'FAILED {result.job.input_file}: {result.error}')
+    print(f'{len(results) - failed} of {len(results)} conversions succeeded')
+    return 1 if failed else 0
@@ -0,0 +1,91 @@
+# src/wwara_chirp/chirp_buffer.py
+
+"""
+ChirpRowBuffer
+
+This module provides an output accumulator for converted CHIRP rows.
+Rows are collected into one Python list per CHIRP column, so appending
+a row costs amortized O(1), and the DataFrame is built once when the
+conversion is finished. This replaces growing the output table with
+``pd.concat`` on every row, which copied the whole table each time.
+
+Example:
+    >>> buffer = ChirpRowBuffer()
+    >>> for index, wwara_row in df.iterrows():
+    ...     buffer.append(process_row(wwara_row))
+    >>> chirp_table = buffer.to_frame()
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import pandas as pd
+
+from wwara_chirp.columns import CHIRP_COLUMNS
+
+
+class ChirpRowBuffer:
+    """Columnar accumulator for CHIRP rows.
+
+    Attributes:
+        columns: Column names, in output order.
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        self.columns = list(columns or CHIRP_COLUMNS)
+        self._data: Dict[str, List[Any]] = {
+            column: [] for column in self.columns}
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def append(self, chirp_row: Mapping[str, Any]) -> None:
+        """Append one CHIRP row.
+
+        Args:
+            chirp_row: A pd.Series or dict keyed by column name, such as
+                the rows returned by ``process_row``. Missing columns are
+                stored as ''.
+        """
+        for column in self.columns:
+            self._data[column].append(chirp_row.get(column, ''))
+        self._rows += 1
+
+    def extend(self, chirp_rows: Iterable[Mapping[str, Any]]) -> None:
+        """Append several CHIRP rows.
+
+        Args:
+            chirp_rows: An iterable of rows accepted by ``append``.
+        """
+        for chirp_row in chirp_rows:
+            self.append(chirp_row)
+
+    def extend_frame(self, chirp_frame: pd.DataFrame) -> None:
+        """Append every row of a CHIRP DataFrame, one column at a time.
+
+        Args:
+            chirp_frame: A DataFrame with (at least) this buffer's columns.
+        """
+        for column in self.columns:
+            self._data[column].extend(chirp_frame[column].tolist())
+        self._rows += len(chirp_frame)
+
+    def clear(self) -> None:
+        """Remove all rows from the buffer."""
+        for values in self._data.values():
+            values.clear()
+        self._rows = 0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Build a DataFrame from the buffered rows.
+
+        Columns keep the object dtype so that values are written exactly
+        as ``process_row`` produced them.
+
+        Returns:
+            A DataFrame with one row per appended row.
+        """
+        return pd.DataFrame(
+            {column: pd.Series(self._data[column], dtype=object)
+             for column in self.columns},
+            columns=self.columns)
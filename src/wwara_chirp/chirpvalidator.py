@@ -8,25 +8,174 @@ The purpose of this class is to validate various fields and data structures used
 
 """
 
+import math
 import os
 import re
 import logging
+from dataclasses import asdict, dataclass, fields
+from typing import TYPE_CHECKING, Any, FrozenSet, Pattern, Tuple
 
+from wwara_chirp.bands import band_of, is_standard_offset
 from wwara_chirp.mock_chirp import MockChirp
 
+# numpy and pandas are only needed by validate_frame and are imported
+# there, so that validating single rows does not load them
+if TYPE_CHECKING:
+    import pandas as pd
+
 TONES = MockChirp.TONES
 DTCS_CODES = MockChirp.DTCS_CODES
 MODES = MockChirp.MODES
 
+# Patterns for numeric strings (frequency, offset) and memory names
+NUMBER_PATTERN = r'^\d+(\.\d+)?$'
+NAME_PATTERN = r'^[\w\s-]+$'
+
+# Columns of the error table returned by ChirpValidator.validate_frame
+FRAME_ERROR_COLUMNS = ['row', 'Location', 'field', 'value', 'reason']
+
 log = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class ValidationRules:
+    """Lookup tables for the validators, built once from MockChirp.
+
+    Membership tests on tuples and lists scan them item by item, and
+    re.match looks its pattern up in the re module's cache on every call.
+    These tables answer the same questions with a single lookup.
+
+    Attributes:
+        number_pattern: Compiled NUMBER_PATTERN.
+        name_pattern: Compiled NAME_PATTERN.
+        tones: CTCSS tones as floats and as strings ('88.5').
+        tone_tenths: CTCSS tones in tenths of a hertz (885 for 88.5).
+        tone_modes: Tone modes, including '' for none.
+        dtcs_codes: The valid DTCS codes. Being a set, it also matches
+            codes read as floats (23.0) or numpy integers.
+        dtcs_polarities: The valid DTCS polarities.
+        duplexes: The valid duplex settings, including '' for simplex.
+        modes: CHIRP modes, including '' for none.
+    """
+    number_pattern: Pattern
+    name_pattern: Pattern
+    tones: FrozenSet[Any]
+    tone_tenths: FrozenSet[int]
+    tone_modes: FrozenSet[str]
+    dtcs_codes: FrozenSet[int]
+    dtcs_polarities: FrozenSet[str]
+    duplexes: FrozenSet[str]
+    modes: FrozenSet[str]
+
+    @classmethod
+    def from_chirp(cls, chirp: type = MockChirp) -> 'ValidationRules':
+        """Build the tables from the CHIRP constants.
+
+        Args:
+            chirp: Class with TONES, DTCS_CODES and MODES; defaults to
+                MockChirp.
+
+        Returns:
+            The ValidationRules.
+        """
+        return cls(
+            number_pattern=re.compile(NUMBER_PATTERN),
+            name_pattern=re.compile(NAME_PATTERN),
+            tones=frozenset(chirp.TONES) | {str(tone) for tone in chirp.TONES},
+            tone_tenths=frozenset(round(tone * 10) for tone in chirp.TONES),
+            tone_modes=frozenset(['Tone', 'DTCS', '']),
+            dtcs_codes=frozenset(chirp.DTCS_CODES),
+            dtcs_polarities=frozenset(['NN', 'NR', 'RN', 'RR']),
+            duplexes=frozenset(['+', '-', '']),
+            modes=frozenset(chirp.MODES) | {''},
+        )
+
+    def is_tone(self, value: Any) -> bool:
+        """Return True if value is a CTCSS tone, however it is written.
+
+        88.5, '88.5' and '88.50' are all the tone 88.5 Hz, and 100,
+        100.0 and '100.0' the tone 100.0 Hz.
+        """
+        if value in self.tones:
+            return True
+        try:
+            tenths = float(value) * 10
+        except (TypeError, ValueError):
+            return False
+        if not math.isfinite(tenths):
+            return False
+        nearest = round(tenths)
+        return abs(tenths - nearest) < 1e-6 and nearest in self.tone_tenths
+
+
+# The rules of the CHIRP constants in MockChirp
+DEFAULT_RULES = ValidationRules.from_chirp()
+
+
+@dataclass(frozen=True)
+class ChirpLimits:
+    """CHIRP memory limits used for conversion and validation.
+
+    Attributes:
+        channel_min: Lowest memory location.
+        channel_max: Highest memory location.
+        frequency_min: Lowest frequency, in MHz.
+        frequency_max: Highest frequency, in MHz.
+        offset_min: Smallest duplex offset, in MHz.
+        offset_max: Largest duplex offset, in MHz.
+        name_length_max: Longest memory name.
+        comment_length_max: Longest memory comment.
+    """
+    channel_min: int = 0
+    channel_max: int = 499
+    frequency_min: float = 10
+    frequency_max: float = 1300
+    offset_min: float = 0
+    offset_max: float = 9999.9
+    name_length_max: int = 16
+    comment_length_max: int = 255
+
+
+# The limits of the latest CHIRP versions
+DEFAULT_LIMITS = ChirpLimits()
+
+
 class ChirpValidator:
-    channel_min = 0
-    channel_max = 499
-    frequency_min = 10
-    frequency_max = 1300
-    offset_min = 0
-    offset_max = 9999.9
+    rules = DEFAULT_RULES
+    channel_min = DEFAULT_LIMITS.channel_min
+    channel_max = DEFAULT_LIMITS.channel_max
+    frequency_min = DEFAULT_LIMITS.frequency_min
+    frequency_max = DEFAULT_LIMITS.frequency_max
+    offset_min = DEFAULT_LIMITS.offset_min
+    offset_max = DEFAULT_LIMITS.offset_max
+    name_length_max = DEFAULT_LIMITS.name_length_max
+    comment_length_max = DEFAULT_LIMITS.comment_length_max
+
+    @classmethod
+    def with_limits(cls, limits: ChirpLimits) -> type:
+        """Return a ChirpValidator class that checks against other limits.
+
+        The validators are class methods, so the limits live on the class.
+        This builds a subclass with the given limits and leaves
+        ChirpValidator itself untouched, so validators with different
+        limits can be used side by side.
+
+        Args:
+            limits: The limits to validate against.
+
+        Returns:
+            A ChirpValidator subclass.
+        """
+        return type(cls.__name__, (cls,), asdict(limits))
+
+    @classmethod
+    def limits(cls) -> ChirpLimits:
+        """Return the limits this validator checks against.
+
+        The inverse of with_limits.
+        """
+        return ChirpLimits(**{item.name: getattr(cls, item.name)
+                              for item in fields(ChirpLimits)})
 
     @staticmethod
     def validate_input_file(input_file):
@@ -42,127 +191,296 @@ class ChirpValidator:
             return False
         return True
 
-    @staticmethod
-    def validate_location(location):
-        if location < ChirpValidator.channel_min or location > ChirpValidator.channel_max:
+    @classmethod
+    def validate_location(cls, location):
+        if location < cls.channel_min or location > cls.channel_max:
             log.error(f'Invalid memory location: {location}')
             return False
         return True
 
-    @staticmethod
-    def validate_frequency(frequency):
-        # TODO setup an optional band parameter to check that the frequency
-        #     #  is standard for that band.  If it isn't, then log a warning.
-
-        if not re.match(r'^\d+(\.\d+)?$', frequency):
+    @classmethod
+    def validate_frequency(cls, frequency):
+        if not cls.rules.number_pattern.match(frequency):
             log.error(f'Invalid frequency: {frequency}')
             return False
         frequency_num = float(frequency)
-        if frequency_num < ChirpValidator.frequency_min or frequency_num > ChirpValidator.frequency_max:
+        if frequency_num < cls.frequency_min or frequency_num > cls.frequency_max:
             log.error(f'Invalid frequency: {frequency}')
             return False
+        if band_of(frequency_num) is None:
+            log.debug(f'Frequency outside the amateur bands: {frequency}')
         return True
 
-    @staticmethod
-    def validate_duplex(duplex):
-        if duplex not in ['+', '-', '']:
+    @classmethod
+    def validate_duplex(cls, duplex):
+        if duplex not in cls.rules.duplexes:
             log.error(f'Invalid duplex setting: {duplex}')
             return False
         return True
 
-    @staticmethod
-    def validate_offset(offset):
-        # TODO setup an optional frequency_out parameter to check that the offset
-        #     #  is standard for that band.  If it isn't, then log a warning.
-        #     #  Also, check for cross band repeaters and log a warning.
+    @classmethod
+    def validate_offset(cls, offset, frequency=None):
+        """Check an offset, and note if it is unusual for its band.
 
+        With the output frequency, a debug message is logged when the
+        input frequency is in another band (a cross band repeater), or
+        else when the offset is not a standard offset of the band.
+        Neither makes the offset invalid, so neither is a warning.
+        """
         if offset == '':
             return True
 
-        if not re.match(r'^\d+(\.\d+)?$', offset):
+        if not cls.rules.number_pattern.match(offset):
             log.error(f'Invalid offset: {offset}')
             return False
 
         offset_num = float(offset)
-        if offset_num < ChirpValidator.offset_min or offset_num > ChirpValidator.offset_max:
+        if offset_num < cls.offset_min or offset_num > cls.offset_max:
             log.error(f'Invalid offset: {offset}')
             return False
+
+        if frequency is not None:
+            cls._check_band_offset(float(frequency), offset_num)
         return True
 
     @staticmethod
-    def validate_tone(tone):
-        if tone not in TONES and tone != 'Tone' and tone != 'DTCS' and tone != '':
+    def _check_band_offset(frequency, offset):
+        """Log non-standard and cross band offsets at debug level."""
+        band = band_of(frequency)
+        if band is None:
+            return
+        if frequency + offset not in band and frequency - offset not in band:
+            log.debug(f'Cross band repeater: {frequency:.6f} MHz with '
+                      f'{offset:.6f} MHz offset')
+        elif not is_standard_offset(band, offset):
+            log.debug(f'Non-standard offset for the {band.name} band: '
+                      f'{offset:.6f} MHz at {frequency:.6f} MHz')
+
+    @classmethod
+    def validate_tone(cls, tone):
+        if tone in cls.rules.tone_modes:
+            return True
+        if not cls.rules.is_tone(tone):
             log.error(f'Invalid tone: {tone}')
             return False
         return True
 
-    @staticmethod
-    def validate_tone_mode(tone_mode):
-        if tone_mode not in ['Tone', 'DTCS'] and tone_mode != '':
+    @classmethod
+    def validate_tone_mode(cls, tone_mode):
+        if tone_mode not in cls.rules.tone_modes:
             log.error(f'Invalid tone mode: {tone_mode}')
             return False
         return True
 
-    @staticmethod
-    def validate_dtcs_code(dtcs_code):
-        if dtcs_code not in DTCS_CODES:
+    @classmethod
+    def validate_dtcs_code(cls, dtcs_code):
+        if dtcs_code not in cls.rules.dtcs_codes:
             log.error(f'Invalid DTCS code: {dtcs_code}')
             return False
         return True
 
-    @staticmethod
-    def validate_dtcs_polarity(dtcs_polarity):
-        if dtcs_polarity not in ['NN', 'NR', 'RN', 'RR']:
+    @classmethod
+    def validate_dtcs_polarity(cls, dtcs_polarity):
+        if dtcs_polarity not in cls.rules.dtcs_polarities:
             log.error(f'Invalid DTCS polarity: {dtcs_polarity}')
             return False
         return True
 
-    @staticmethod
-    def validate_mode(mode):
-        if mode not in MODES and mode != '':
+    @classmethod
+    def validate_mode(cls, mode):
+        if mode not in cls.rules.modes:
             log.error(f'Invalid mode: {mode}')
             return False
         return True
 
-    @staticmethod
-    def validate_name(name):
-        if len(name) > 16:
+    @classmethod
+    def validate_name(cls, name):
+        if len(name) > cls.name_length_max:
             log.error(f'Invalid name length: {name}')
             return False
-        if not re.match(r'^[\w\s-]+$', name):
+        if not cls.rules.name_pattern.match(name):
             log.error(f'Invalid characters in name: {name}')
             return False
         return True
 
-    @staticmethod
-    def validate_comment(comment):
-        if len(comment) > 255:
+    @classmethod
+    def validate_comment(cls, comment):
+        if len(comment) > cls.comment_length_max:
             log.error(f'Invalid comment length: {comment}')
             return False
         return True
 
-    @staticmethod
-    def validate_row(chirp_row):
-        if not ChirpValidator.validate_location(chirp_row['Location']):
+    @classmethod
+    def validate_row(cls, chirp_row):
+        if not cls.validate_location(chirp_row['Location']):
             return False
-        if not ChirpValidator.validate_frequency(chirp_row['Frequency']):
+        if not cls.validate_frequency(chirp_row['Frequency']):
             return False
-        if not ChirpValidator.validate_duplex(chirp_row['Duplex']):
+        if not cls.validate_duplex(chirp_row['Duplex']):
             return False
         if chirp_row['Duplex'] != '':
-            if not ChirpValidator.validate_offset(chirp_row['Offset']):
+            if not cls.validate_offset(chirp_row['Offset'],
+                                       chirp_row['Frequency']):
                 return False
-        if not ChirpValidator.validate_tone(chirp_row['Tone']):
+        if not cls.validate_tone(chirp_row['Tone']):
             return False
         if chirp_row['Tone'] == 'DTCS':
-            if not ChirpValidator.validate_dtcs_code(chirp_row['DTCS Code']):
+            if not cls.validate_dtcs_code(chirp_row['DtcsCode']):
                 return False
-            if not ChirpValidator.validate_dtcs_polarity(chirp_row['DTCS Polarity']):
+            if not cls.validate_dtcs_polarity(chirp_row['DtcsPolarity']):
                 return False
-        if not ChirpValidator.validate_mode(chirp_row['Mode']):
+        if not cls.validate_mode(chirp_row['Mode']):
             return False
-        if not ChirpValidator.validate_name(chirp_row['Name']):
+        if not cls.validate_name(chirp_row['Name']):
             return False
-        if not ChirpValidator.validate_comment(chirp_row['Comment']):
+        if not cls.validate_comment(chirp_row['Comment']):
             return False
-        return True
\ No newline at end of file
+        return True
+
+    @classmethod
+    def validate_frame(cls, chirp_table: 'pd.DataFrame'
+                       ) -> Tuple['pd.Series', 'pd.DataFrame']:
+        """Validate every row of a CHIRP table with column operations.
+
+        Applies the same checks as ``validate_row``, but to whole columns,
+        and reports every failing field rather than stopping at the first
+        one. Nothing is logged; pass the error table to
+        ``log_frame_errors`` to report it in bulk.
+
+        Args:
+            chirp_table: DataFrame with CHIRP columns.
+
+        Returns:
+            A tuple of (mask, errors). mask is a boolean Series aligned
+            with chirp_table that is True for valid rows. errors is a
+            DataFrame with FRAME_ERROR_COLUMNS and one row per failed
+            check, where 'row' is the chirp_table index label.
+
+        Example:
+            >>> mask, errors = ChirpValidator.validate_frame(chirp_table)
+            >>> chirp_table = chirp_table[mask]
+        """
+        import numpy as np
+        import pandas as pd
+
+        checks = []
+
+        def check(field, column, invalid, reason):
+            checks.append((field, column, np.asarray(invalid, dtype=bool),
+                           reason))
+
+        location = pd.to_numeric(chirp_table['Location'], errors='coerce')
+        check('Location', 'Location',
+              ~location.between(cls.channel_min,
+                                cls.channel_max),
+              'Invalid memory location')
+
+        frequency = chirp_table['Frequency'].astype(str)
+        frequency_num = pd.to_numeric(frequency, errors='coerce')
+        check('Frequency', 'Frequency',
+              ~frequency.str.match(NUMBER_PATTERN)
+              | ~frequency_num.between(cls.frequency_min,
+                                       cls.frequency_max),
+              'Invalid frequency')
+
+        duplex = chirp_table['Duplex']
+        check('Duplex', 'Duplex', ~duplex.isin(cls.rules.duplexes),
+              'Invalid duplex setting')
+
+        offset = chirp_table['Offset'].astype(str)
+        offset_num = pd.to_numeric(offset, errors='coerce')
+        check('Offset', 'Offset',
+              (duplex != '') & (offset != '')
+              & (~offset.str.match(NUMBER_PATTERN)
+                 | ~offset_num.between(cls.offset_min,
+                                       cls.offset_max)),
+              'Invalid offset')
+
+        tone = chirp_table['Tone']
+        tone_tenths = pd.to_numeric(tone, errors='coerce') * 10
+        nearest = tone_tenths.round()
+        check('Tone', 'Tone',
+              ~tone.isin(cls.rules.tone_modes)
+              & ~(nearest.isin(cls.rules.tone_tenths)
+                  & ((tone_tenths - nearest).abs() < 1e-6)),
+              'Invalid tone')
+
+        uses_dtcs = tone == 'DTCS'
+        dtcs_code = cls._frame_column(
+            chirp_table, 'DtcsCode', 'DTCS Code')
+        check('DtcsCode', dtcs_code.name,
+              uses_dtcs & ~dtcs_code.isin(cls.rules.dtcs_codes),
+              'Invalid DTCS code')
+        dtcs_polarity = cls._frame_column(
+            chirp_table, 'DtcsPolarity', 'DTCS Polarity')
+        check('DtcsPolarity', dtcs_polarity.name,
+              uses_dtcs & ~dtcs_polarity.isin(cls.rules.dtcs_polarities),
+              'Invalid DTCS polarity')
+
+        check('Mode', 'Mode', ~chirp_table['Mode'].isin(cls.rules.modes),
+              'Invalid mode')
+
+        name = chirp_table['Name']
+        name_is_text = name.map(type) == str
+        name_text = name.where(name_is_text, '').astype(str)
+        name_too_long = name_is_text & (name_text.str.len()
+                                        > cls.name_length_max)
+        check('Name', 'Name', name_too_long, 'Invalid name length')
+        check('Name', 'Name',
+              ~name_is_text
+              | (~name_too_long & ~name_text.str.match(NAME_PATTERN)),
+              'Invalid characters in name')
+
+        check('Comment', 'Comment',
+              chirp_table['Comment'].astype(str).str.len()
+              > cls.comment_length_max,
+              'Invalid comment length')
+
+        invalid = np.zeros(len(chirp_table), dtype=bool)
+        error_frames = []
+        for field, column, failed, reason in checks:
+            invalid |= failed
+            if not failed.any():
+                continue
+            failed_rows = chirp_table[failed]
+            error_frames.append(pd.DataFrame({
+                'row': failed_rows.index,
+                'Location': failed_rows['Location'].to_numpy(),
+                'field': field,
+                'value': failed_rows[column].to_numpy(dtype=object),
+                'reason': reason,
+            }, columns=FRAME_ERROR_COLUMNS))
+
+        if error_frames:
+            errors = pd.concat(error_frames, ignore_index=True)
+        else:
+            errors = pd.DataFrame(columns=FRAME_ERROR_COLUMNS)
+        mask = pd.Series(~invalid, index=chirp_table.index)
+        return mask, errors
+
+    @staticmethod
+    def _frame_column(chirp_table, *names):
+        """Return the first of several alternative columns that exists."""
+        import pandas as pd
+
+        for name in names:
+            if name in chirp_table.columns:
+                return chirp_table[name]
+        return pd.Series('', index=chirp_table.index, name=names[0])
+
+    @staticmethod
+    def log_frame_errors(errors: 'pd.DataFrame') -> None:
+        """Log the error table from ``validate_frame`` in bulk.
+
+        One line is logged per field and reason, with the number of
+        failures and the memory locations affected.
+
+        Args:
+            errors: Error table returned by ``validate_frame``.
+        """
+        for (field, reason), group in errors.groupby(['field', 'reason'],
+                                                     sort=False):
+            locations = ', '.join(str(location)
+                                  for location in group['Location'])
+            log.error(f'{reason}: {len(group)} row(s) rejected on {field} '
+                      f'at locations {locations}')
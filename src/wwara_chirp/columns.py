@@ -0,0 +1,42 @@
+# src/wwara_chirp/columns.py
+
+"""
+Column definitions shared by the WWARA CHIRP conversion modules.
+
+The WWARA extract and the CHIRP import file each have a fixed column
+layout. They are kept here, rather than in the wwara_chirp script, so
+that the conversion engines can use them without importing the CLI.
+"""
+
+# Set up the CSV column names for the wwara input file
+WWARA_COLUMNS = [
+    'FC_RECORD_ID', 'SOURCE', 'OUTPUT_FREQ', 'INPUT_FREQ', 'STATE', 'CITY',
+    'LOCALE', 'CALL', 'SPONSOR', 'CTCSS_IN', 'CTCSS_OUT', 'DCS_CDCSS', 'DTMF',
+    'LINK', 'FM_WIDE', 'FM_NARROW', 'DSTAR_DV', 'DSTAR_DD', 'DMR',
+    'DMR_COLOR_CODE', 'FUSION', 'FUSION_DSQ', 'P25_PHASE_1', 'P25_PHASE_2',
+    'P25_NAC', 'NXDN_DIGITAL', 'NXDN_MIXED', 'NXDN_RAN', 'ATV', 'DATV', 'RACES',
+    'ARES', 'WX', 'URL', 'LATITUDE', 'LONGITUDE', 'EXPIRATION_DATE', 'COMMENT'
+]
+
+# Set up the CSV column names for the chirp output file
+CHIRP_COLUMNS = [
+    'Location', 'Name', 'Frequency', 'Duplex', 'Offset', 'Tone', 'rToneFreq',
+    'cToneFreq', 'DtcsCode', 'DtcsPolarity', 'RxDtcsCode', 'CrossMode', 'Mode',
+    'TStep', 'Skip', 'Power', 'Comment', 'URCALL', 'RPT1CALL', 'RPT2CALL',
+    'DVCODE'
+]
+
+# Values of the CHIRP columns that do not depend on the WWARA record.
+# A radio profile may replace them (see the profiles module).
+CHIRP_DEFAULTS = {
+    'DtcsPolarity': 'NN',
+    'RxDtcsCode': 23,
+    'CrossMode': 'Tone->Tone',
+    'TStep': '5.00',
+    'Skip': '',
+    'Power': '5.0W',
+    'URCALL': '',
+    'RPT1CALL': '',
+    'RPT2CALL': '',
+    'DVCODE': '',
+}
@@ -0,0 +1,492 @@
+# src/wwara_chirp/comment_template.py
+
+"""
+Comment templates
+
+The CHIRP Comment field is assembled from WWARA fields according to a
+CommentTemplate: an ordered list of CommentItems, each a format string
+with {FIELD} placeholders and a condition on the fields it shows. Items
+are added in order while they fit the comment length budget; what
+happens to an item that does not fit is the template's overflow policy:
+
+    skip      leave the item out and try the next one (the default)
+    stop      leave out this item and every item after it
+    truncate  cut the item to the space that is left, then stop
+
+A template is compiled once per conversion into a CompiledTemplate,
+which formats each item a single time per row, or once per column with
+``format_frame``.
+
+Templates can be loaded from JSON files:
+
+    {
+        "max_length": 40,
+        "overflow": "truncate",
+        "items": [
+            {"text": "{LOCATION}", "when": "present"},
+            {"text": " ARES", "when": "yes", "fields": ["ARES"]}
+        ]
+    }
+
+Besides the WWARA_COLUMNS, the placeholders can use these fields:
+
+    COMMENT      the WWARA comment, or '' if there is none
+    COMMENT_GAP  ' ' if there is a WWARA comment, else ''
+    LOCATION     CITY, STATE and LOCALE joined as "City, ST Locale"
+
+Example:
+    >>> template = load_template('short').compile(max_length=32)
+    >>> template.format_row(wwara_row)
+    'Seattle ARES'
+"""
+
+import hashlib
+import json
+import os
+import string
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+
+from wwara_chirp.chirpvalidator import DEFAULT_LIMITS
+from wwara_chirp.columns import WWARA_COLUMNS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# What happens to an item that does not fit the length budget
+OVERFLOW_POLICIES = ('skip', 'stop', 'truncate')
+
+# Conditions on an item's fields: 'set' is true for any value but '',
+# including missing values, as in the original comment rules; 'present'
+# is also false for missing values; 'yes' is true for the Y/N flag 'Y'
+CONDITIONS = ('always', 'set', 'present', 'yes')
+
+# Fields computed from the WWARA record, usable in templates
+VIRTUAL_FIELDS = ('COMMENT', 'COMMENT_GAP', 'LOCATION')
+
+# CITY, STATE and LOCALE with the separator put before each of them
+LOCATION_PARTS = (('CITY', ''), ('STATE', ', '), ('LOCALE', ' '))
+
+
+@dataclass(frozen=True)
+class CommentItem:
+    """One piece of a comment.
+
+    Attributes:
+        text: Format string; {FIELD} placeholders take WWARA or virtual
+            fields, with an optional format spec ({LATITUDE:.3f}).
+        when: One of CONDITIONS, tested on each of fields.
+        fields: Fields the condition tests; defaults to the fields
+            named in text.
+        measure: Format string whose length is counted against the
+            budget, if it differs from text.
+        fixed: Add the item without checking the budget.
+    """
+    text: str
+    when: str = 'set'
+    fields: Tuple[str, ...] = ()
+    measure: Optional[str] = None
+    fixed: bool = False
+
+
+@dataclass(frozen=True)
+class CommentTemplate:
+    """An ordered list of comment items and how to fit them.
+
+    Attributes:
+        items: The comment items, in output order.
+        overflow: One of OVERFLOW_POLICIES.
+        max_length: Longest comment to build; None uses the CHIRP limit.
+    """
+    items: Tuple[CommentItem, ...]
+    overflow: str = 'skip'
+    max_length: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any]) -> 'CommentTemplate':
+        """Build a template from a dict, as read from a JSON file.
+
+        Raises:
+            ValueError: If the configuration is not a valid template.
+        """
+        try:
+            items = tuple(
+                CommentItem(**dict(item,
+                                   fields=tuple(item.get('fields', ()))))
+                for item in config['items'])
+        except (KeyError, TypeError) as error:
+            raise ValueError(f'Invalid comment template: {error}') from None
+        template = cls(items, config.get('overflow', 'skip'),
+                       config.get('max_length'))
+        template.compile()
+        return template
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the template as a JSON-serializable dict."""
+        return asdict(self)
+
+    @classmethod
+    def load(cls, template_file: str) -> 'CommentTemplate':
+        """Load a template from a JSON file."""
+        with open(template_file, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def compile(self, max_length: Optional[int] = None
+                ) -> 'CompiledTemplate':
+        """Compile the template for formatting.
+
+        Args:
+            max_length: The CHIRP comment limit. The template's own
+                max_length, if shorter, takes precedence.
+
+        Returns:
+            A CompiledTemplate.
+
+        Raises:
+            ValueError: If the template is invalid.
+        """
+        budget = (DEFAULT_LIMITS.comment_length_max if max_length is None
+                  else max_length)
+        if self.max_length is not None:
+            budget = min(budget, self.max_length)
+        return CompiledTemplate(self, budget)
+
+
+class _CompiledItem:
+    """A CommentItem split into literals and field references."""
+
+    def __init__(self, item: CommentItem):
+        if item.when not in CONDITIONS:
+            raise ValueError(f'Unknown comment condition: {item.when}')
+        self.item = item
+        self.parts = _parse(item.text)
+        self.measure_parts = (None if item.measure is None
+                              else _parse(item.measure))
+        self.fields = item.fields or tuple(
+            field for literal, field, spec in self.parts if field)
+        if item.when != 'always' and not self.fields:
+            raise ValueError(f'Comment item "{item.text}" needs fields for '
+                             f'the condition "{item.when}"')
+        _check_fields(self.fields)
+
+    def applies(self, values: Mapping[str, Any]) -> bool:
+        when = self.item.when
+        if when == 'always':
+            return True
+        if when == 'set':
+            return all(values[field] != '' for field in self.fields)
+        if when == 'yes':
+            return all(values[field] == 'Y' for field in self.fields)
+        return all(_is_present(values[field]) for field in self.fields)
+
+
+def _parse(text: str) -> List[Tuple[str, Optional[str], str]]:
+    """Split a format string into (literal, field, format spec) parts."""
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(text):
+        if conversion or field == '':
+            raise ValueError(f'Comment placeholders must name a field, '
+                             f'without a conversion: {text}')
+        parts.append((literal, field, spec or ''))
+    _check_fields(field for literal, field, spec in parts if field)
+    return parts
+
+
+def _check_fields(fields) -> None:
+    """Raise ValueError for a field that is neither WWARA nor virtual."""
+    for field in fields:
+        if field not in WWARA_COLUMNS and field not in VIRTUAL_FIELDS:
+            raise ValueError(f'Unknown field in comment template: {field}')
+
+
+def _is_present(value: Any) -> bool:
+    """Return False for '', None and NaN."""
+    if value is None or value == '':
+        return False
+    return not (isinstance(value, float) and value != value)
+
+
+def _render(parts, values: Mapping[str, Any]) -> str:
+    return ''.join(literal + ('' if field is None
+                              else format(values[field], spec))
+                   for literal, field, spec in parts)
+
+
+class _RowValues:
+    """Mapping over a WWARA record that adds the virtual fields."""
+
+    def __init__(self, wwara_row: Mapping[str, Any]):
+        self.wwara_row = wwara_row
+        self._location = None
+
+    def __getitem__(self, field: str) -> Any:
+        if field == 'COMMENT':
+            comment = self.wwara_row['COMMENT']
+            return comment if isinstance(comment, str) else ''
+        if field == 'COMMENT_GAP':
+            return ' ' if self['COMMENT'] else ''
+        if field == 'LOCATION':
+            if self._location is None:
+                self._location = self._join_location()
+            return self._location
+        return self.wwara_row[field]
+
+    def _join_location(self) -> str:
+        location = ''
+        for field, separator in LOCATION_PARTS:
+            value = self.wwara_row[field]
+            if value != '':
+                location += (separator if location else '') + str(value)
+        return location
+
+
+class CompiledTemplate:
+    """A CommentTemplate ready to format comments.
+
+    Attributes:
+        template: The source template.
+        max_length: The length budget of each comment.
+        key: Digest that changes whenever the output could change.
+    """
+
+    def __init__(self, template: CommentTemplate, max_length: int):
+        if template.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy: {template.overflow}')
+        self.template = template
+        self.max_length = max_length
+        self.items = [_CompiledItem(item) for item in template.items]
+        settings = json.dumps([template.to_dict(), max_length],
+                              sort_keys=True)
+        self.key = hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+    def format_row(self, wwara_row: Mapping[str, Any]) -> str:
+        """Build the comment of one WWARA record.
+
+        Args:
+            wwara_row: A WWARA record keyed by column name.
+
+        Returns:
+            The comment.
+        """
+        values = _RowValues(wwara_row)
+        overflow = self.template.overflow
+        pieces = []
+        used = 0
+        for item in self.items:
+            if not item.applies(values):
+                continue
+            text = _render(item.parts, values)
+            if not item.item.fixed:
+                size = (len(text) if item.measure_parts is None
+                        else len(_render(item.measure_parts, values)))
+                if used + size > self.max_length:
+                    if overflow == 'skip':
+                        continue
+                    if overflow == 'truncate':
+                        pieces.append(text[:max(self.max_length - used, 0)])
+                    break
+            pieces.append(text)
+            used += len(text)
+        return ''.join(pieces)
+
+    def format_frame(self, df: 'pd.DataFrame') -> 'pd.Series':
+        """Build the comment of every row of a WWARA DataFrame.
+
+        Gives the same comments as ``format_row``, but works one item at
+        a time over whole columns.
+
+        Args:
+            df: WWARA DataFrame, as read by ``pd.read_csv``.
+
+        Returns:
+            A Series of comments aligned with df.
+        """
+        import numpy as np
+        import pandas as pd
+
+        columns = _FrameValues(df)
+        overflow = self.template.overflow
+        comment = pd.Series('', index=df.index, dtype=object)
+        used = np.zeros(len(df), dtype=int)
+        open_rows = np.ones(len(df), dtype=bool)
+
+        for item in self.items:
+            applies = open_rows & columns.applies(item)
+            if not applies.any():
+                continue
+            text = columns.render(item.parts)
+            length = text.str.len().to_numpy()
+            add = applies
+            if not item.item.fixed:
+                size = (length if item.measure_parts is None
+                        else columns.render(item.measure_parts)
+                        .str.len().to_numpy())
+                fits = used + size <= self.max_length
+                add = applies & fits
+                overflowing = applies & ~fits
+                if overflow != 'skip':
+                    open_rows &= ~overflowing
+                if overflow == 'truncate' and overflowing.any():
+                    room = np.maximum(self.max_length - used, 0)
+                    cut = pd.Series(
+                        [value[:limit] for value, limit
+                         in zip(text[overflowing], room[overflowing])],
+                        index=text.index[overflowing], dtype=object)
+                    comment[overflowing] = comment[overflowing] + cut
+            comment = comment.where(~add, comment + text)
+            used = used + np.where(add, length, 0)
+        return comment
+
+
+class _FrameValues:
+    """Column access for format_frame, adding the virtual fields."""
+
+    def __init__(self, df: 'pd.DataFrame'):
+        self.df = df
+        self._text: Dict[Tuple[str, str], 'pd.Series'] = {}
+        self._virtual: Dict[str, 'pd.Series'] = {}
+
+    def column(self, field: str) -> 'pd.Series':
+        if field not in VIRTUAL_FIELDS:
+            return self.df[field]
+        if field not in self._virtual:
+            self._virtual[field] = self._compute(field)
+        return self._virtual[field]
+
+    def _compute(self, field: str) -> 'pd.Series':
+        import numpy as np
+        import pandas as pd
+
+        df = self.df
+        if field == 'COMMENT':
+            return df['COMMENT'].where(
+                df['COMMENT'].map(type) == str, '').astype(object)
+        if field == 'COMMENT_GAP':
+            return self.column('COMMENT').where(
+                self.column('COMMENT') == '', ' ')
+        location = pd.Series('', index=df.index, dtype=object)
+        for name, separator in LOCATION_PARTS:
+            present = (df[name] != '').to_numpy()
+            joiner = np.where(location != '', separator, '')
+            joined = location + joiner + df[name].astype(str)
+            location = location.where(~present, joined)
+        return location
+
+    def text(self, field: str, spec: str) -> 'pd.Series':
+        """Format every value of a field, as format(value, spec) would."""
+        import pandas as pd
+
+        key = (field, spec)
+        if key not in self._text:
+            column = self.column(field)
+            if spec:
+                self._text[key] = pd.Series(
+                    [format(value, spec) for value in column],
+                    index=column.index, dtype=object)
+            else:
+                self._text[key] = column.astype(str).astype(object)
+        return self._text[key]
+
+    def render(self, parts) -> 'pd.Series':
+        import pandas as pd
+
+        rendered = pd.Series('', index=self.df.index, dtype=object)
+        for literal, field, spec in parts:
+            rendered = rendered + literal
+            if field is not None:
+                rendered = rendered + self.text(field, spec)
+        return rendered
+
+    def applies(self, item: _CompiledItem):
+        import numpy as np
+
+        when = item.item.when
+        mask = np.ones(len(self.df), dtype=bool)
+        if when == 'always':
+            return mask
+        for field in item.fields:
+            column = self.column(field)
+            if when == 'set':
+                mask &= (column != '').to_numpy()
+            elif when == 'yes':
+                mask &= (column == 'Y').to_numpy()
+            else:
+                mask &= (column.notna() & (column != '')).to_numpy()
+        return mask
+
+
+def _flag(field: str, label: str) -> CommentItem:
+    return CommentItem(f' {label}', when='yes', fields=(field,))
+
+
+# The comment of the original export script: the WWARA comment, the
+# location and every other field that fits in 255 characters. The
+# original spacing is kept: three spaces before the location after a
+# comment, and RACES appended without a space.
+LEGACY_TEMPLATE = CommentTemplate((
+    CommentItem('{COMMENT}{COMMENT_GAP}', when='always', fixed=True),
+    CommentItem('{COMMENT_GAP} {LOCATION}', when='always',
+                measure='{LOCATION}'),
+    CommentItem(' Sponsor: {SPONSOR}'),
+    CommentItem(' Link: {LINK}'),
+    CommentItem(' URL: {URL}'),
+    CommentItem(' Expiration: {EXPIRATION_DATE}'),
+    CommentItem(' Lat: {LATITUDE}, Lon: {LONGITUDE}'),
+    _flag('ARES', 'ARES'),
+    CommentItem('RACES', when='yes', fields=('RACES',), measure=' RACES'),
+    _flag('WX', 'WX'),
+    CommentItem(' DMR Color Code: {DMR_COLOR_CODE}'),
+    CommentItem(' Fusion DSQ: {FUSION_DSQ}'),
+    _flag('NXDN_DIGITAL', 'NXDN Digital'),
+    _flag('NXDN_MIXED', 'NXDN Mixed'),
+    CommentItem(' NXDN RAN: {NXDN_RAN}'),
+    _flag('ATV', 'ATV'),
+    _flag('DATV', 'DATV'),
+))
+
+# A comment for radios with small displays: the city and the services
+# the repeater supports
+SHORT_TEMPLATE = CommentTemplate((
+    CommentItem('{CITY}', when='present'),
+    _flag('ARES', 'ARES'),
+    _flag('RACES', 'RACES'),
+    _flag('WX', 'WX'),
+    CommentItem(' {DMR_COLOR_CODE}', when='present'),
+), overflow='truncate')
+
+# No comment at all
+EMPTY_TEMPLATE = CommentTemplate(())
+
+# Templates selectable by name with --comment-template
+BUILTIN_TEMPLATES = {
+    'legacy': LEGACY_TEMPLATE,
+    'short': SHORT_TEMPLATE,
+    'none': EMPTY_TEMPLATE,
+}
+
+
+def load_template(name_or_file: str,
+                  max_length: Optional[int] = None) -> CommentTemplate:
+    """Get a built-in template by name, or load one from a JSON file.
+
+    Args:
+        name_or_file: A BUILTIN_TEMPLATES key or a path to a JSON file.
+        max_length: If set, replaces the template's max_length.
+
+    Returns:
+        The CommentTemplate.
+
+    Raises:
+        ValueError: If the name is unknown or the file is not a valid
+            template.
+    """
+    if name_or_file in BUILTIN_TEMPLATES:
+        template = BUILTIN_TEMPLATES[name_or_file]
+    elif os.path.isfile(name_or_file):
+        template = CommentTemplate.load(name_or_file)
+    else:
+        raise ValueError(f'Unknown comment template: {name_or_file}')
+    if max_length is not None:
+        template = replace(template, max_length=max_length)
+    return template
+
@@ -0,0 +1,696 @@
+# src/wwara_chirp/converter.py
+
+"""
+Converter
+
+This module provides the Converter class, which owns all the state of a
+WWARA to CHIRP conversion: the channel counter that numbers memory
+locations, the CHIRP limits used for conversion and validation, and the
+output buffer. Every conversion gets its own Converter, so any number of
+conversions can run concurrently in one process, from threads or from a
+long-lived service, without locks and without mixing up Location
+numbers.
+
+The functions in the wwara_chirp module (process_row, process_file, ...)
+are thin wrappers around a Converter. The pandas-free parts of the
+conversion live in the core and stdlib_backend modules.
+
+Example:
+    >>> converter = Converter(engine='vectorized')
+    >>> result = converter.convert_file('WWARA-rptrlist-20260201.csv',
+    ...                                 'chirp.csv')
+    >>> result.rows_written
+    434
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, replace
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from wwara_chirp.bands import FrequencyFilter, FrequencyIndex
+from wwara_chirp.banks import BankWriter, existing_bank_files
+from wwara_chirp.chirp_buffer import ChirpRowBuffer
+from wwara_chirp.chirpvalidator import ChirpLimits, DEFAULT_LIMITS
+from wwara_chirp.comment_template import CommentTemplate, LEGACY_TEMPLATE
+from wwara_chirp.core import (ENGINES, READERS, ConversionResult,
+                              check_files, convert_record, validator_for)
+from wwara_chirp.geo import GeoFilter, GeoIndex
+from wwara_chirp.incremental import StateCache, convert_incremental
+from wwara_chirp.parse_cache import read_cached
+from wwara_chirp.profiles import (ProfileRenderer, RadioProfile,
+                                  profile_outputs)
+from wwara_chirp.profiling import NULL_PROFILER, Profiler
+from wwara_chirp.schema import (RecordAccessor, fill_flags, input_schema,
+                                read_typed_frame, validate_schema)
+from wwara_chirp import stdlib_backend
+from wwara_chirp.vectorized import convert_frame
+from wwara_chirp.writers import DEFAULT_BUFFER_SIZE, ChirpOutputs
+from wwara_chirp.wwara_extract import open_input, validate_extract
+
+log = logging.getLogger(__name__)
+
+def write_output_file(output_file, chirp_table_out,
+                      buffer_size=DEFAULT_BUFFER_SIZE, extra_outputs=()):
+    """Write a CHIRP DataFrame, replacing output_file atomically.
+
+    The same rows are also written to each of extra_outputs, in the
+    format of its extension (see writers.OUTPUT_FORMATS).
+    """
+    with ChirpOutputs(output_file, extra_outputs, chirp_table_out.columns,
+                      buffer_size) as output:
+        output.write_frame(chirp_table_out)
+
+    log.info(f'Output file written: {output_file}')
+    log.info(f'Number of memory channels written: {len(chirp_table_out)}')
+
+
+def read_wwara_frame(input_file, member='rptrlist'):
+    """Parse a WWARA CSV file or DataBaseExtract.zip list with pandas."""
+    with open_input(input_file, member) as source:
+        return pd.read_csv(source, skiprows=[0])
+
+
+def write_change_report(change_report, summary):
+    """Write the ChangeSummary of an incremental run as JSON."""
+    with open(change_report, 'w') as f:
+        json.dump(summary.to_dict(), f, indent=2)
+    log.info(f'Change report written: {change_report}')
+
+
+def infer_chunked_dtypes(input_file, chunksize, member='rptrlist'):
+    """Find the column dtypes pandas would infer for the whole file.
+
+    pandas infers dtypes per chunk, so a chunk without missing values can
+    read a tone column as int64 where the whole file reads float64, which
+    changes how values are written ('100' instead of '100.0'). This scans
+    the file once, chunk by chunk, and combines the per-chunk dtypes the
+    way a single read would.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        chunksize: Number of input rows per chunk.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        A dict mapping column name to dtype, for ``pd.read_csv``.
+    """
+    kinds = {}
+    with open_input(input_file, member) as source:
+        for df in pd.read_csv(source, skiprows=[0], chunksize=chunksize):
+            for column, dtype in df.dtypes.items():
+                kinds.setdefault(column, set()).add(dtype.kind)
+
+    dtypes = {}
+    for column, seen in kinds.items():
+        if len(seen) == 1:
+            continue
+        if seen <= {'i', 'u', 'f'}:
+            dtypes[column] = 'float64'
+        else:
+            dtypes[column] = 'object'
+    return dtypes
+
+
+def check_chunksize(chunksize):
+    """Raise ValueError unless chunksize is None or at least 1."""
+    if chunksize is not None and chunksize < 1:
+        raise ValueError(f'Invalid chunk size: {chunksize}')
+
+
+class Converter:
+    """Converts WWARA records to CHIRP memories.
+
+    A Converter is not meant to be shared between threads; give each
+    concurrent conversion its own instance.
+
+    Attributes:
+        limits: CHIRP limits for conversion and validation.
+        engine: Default conversion engine, one of ENGINES.
+        validator: ChirpValidator class checking against limits.
+        comment_template: CompiledTemplate building the Comment field,
+            compiled once for the Converter's comment length limit.
+        frequency_filter: If set, convert_file and its variants only
+            convert the records inside its frequency ranges.
+        geo_filter: If set, convert_file and its variants only convert
+            the records inside its area, in its order.
+        parse_cache: If set, inputs are read through a parse cache in
+            this directory; '' keeps it next to the input.
+        reader: How the pandas engines read inputs, one of READERS:
+            'pandas' infers the column types, 'typed' applies the
+            WWARA_DTYPES schema.
+        profiler: Profiler timing the stages of the conversions;
+            NULL_PROFILER unless profiling.
+        buffer_size: Size of the write buffer of output files, in bytes.
+        channel: Location of the next converted row.
+        output: ChirpRowBuffer collecting rows added with add_row and
+            add_frame.
+    """
+
+    def __init__(self, limits: Optional[ChirpLimits] = None,
+                 engine: str = 'row',
+                 comment_template: Optional[CommentTemplate] = None,
+                 frequency_filter: Optional[FrequencyFilter] = None,
+                 geo_filter: Optional[GeoFilter] = None,
+                 parse_cache: Optional[str] = None, reader: str = 'pandas',
+                 profiler: Optional[Profiler] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        if engine not in ENGINES:
+            raise ValueError(f'Unknown conversion engine: {engine}')
+        if reader not in READERS:
+            raise ValueError(f'Unknown reader: {reader}')
+        self.limits = limits or DEFAULT_LIMITS
+        self.engine = engine
+        self.profiler = profiler or NULL_PROFILER
+        self.validator = self.profiler.validator(validator_for(self.limits))
+        self.template = comment_template or LEGACY_TEMPLATE
+        self.comment_template = self.template.compile(
+            self.limits.comment_length_max)
+        self.frequency_filter = frequency_filter
+        self.geo_filter = geo_filter
+        self.parse_cache = parse_cache
+        self.reader = reader
+        self.buffer_size = buffer_size
+        self.channel = self.limits.channel_min
+        self.output = ChirpRowBuffer()
+
+    def cache_settings(self) -> str:
+        """Describe the settings that shape converted rows.
+
+        Incremental conversion only reuses cached rows that were
+        converted with the same settings.
+        """
+        return json.dumps({'limits': asdict(self.limits),
+                           'comment_template': self.comment_template.key,
+                           'reader': self.reader},
+                          sort_keys=True)
+
+    def select_frame(self, df: pd.DataFrame,
+                     frequency_index: Optional[FrequencyIndex] = None,
+                     geo_index: Optional[GeoIndex] = None
+                     ) -> pd.DataFrame:
+        """Keep the rows of df inside the frequency and geo filters.
+
+        The rows are selected before any of them is converted: by
+        OUTPUT_FREQ, and by distance or bounding box over LATITUDE and
+        LONGITUDE, in the order of the geo filter. Each filter scans df
+        with numpy unless it is given an index of df.
+
+        Args:
+            df: WWARA DataFrame.
+            frequency_index: FrequencyIndex.from_frame(df), kept by a
+                caller converting the same DataFrame many times.
+            geo_index: GeoIndex.from_frame(df), likewise.
+
+        Returns:
+            The selected rows, indexed from 0, or df itself without
+            filters.
+        """
+        positions = None
+        for record_filter, index in ((self.frequency_filter,
+                                      frequency_index),
+                                     (self.geo_filter, geo_index)):
+            if record_filter is None:
+                continue
+            selected = record_filter.positions(df, index)
+            if positions is not None:
+                selected = selected[np.isin(selected, positions)]
+            log.info(f'Selected {len(selected)} of {len(df)} records in '
+                     f'{record_filter}')
+            positions = selected
+        if positions is None:
+            return df
+        return df.iloc[positions].reset_index(drop=True)
+
+    def read_frame(self, input_file: str,
+                   member: str = 'rptrlist') -> pd.DataFrame:
+        """Read a WWARA input into a DataFrame.
+
+        The reader attribute selects pd.read_csv type inference or the
+        typed reader. With a parse cache, the parsed DataFrame is loaded
+        from the cache file while the input is unchanged, skipping CSV
+        parsing.
+        """
+        if self.reader == 'typed':
+            read, kind = read_typed_frame, 'typed-frame'
+        else:
+            read, kind = read_wwara_frame, 'frame'
+        if self.parse_cache is None:
+            return read(input_file, member)
+        return read_cached(input_file, member, kind, read, self.parse_cache,
+                           f'pandas {pd.__version__}')
+
+    def reset(self) -> None:
+        """Restart Location numbering and empty the output buffer."""
+        self.channel = self.limits.channel_min
+        self.output.clear()
+
+    def convert_row(self, wwara_row) -> pd.Series:
+        """Convert one WWARA row to a CHIRP row.
+
+        The row gets the next Location, whether or not it later passes
+        validation.
+
+        Args:
+            wwara_row: A WWARA record, such as a row from df.iterrows().
+
+        Returns:
+            The CHIRP row as a pd.Series.
+        """
+        chirp_row = pd.Series(convert_record(
+            wwara_row, self.channel, self.comment_template))
+        self.channel += 1
+        return chirp_row
+
+    def convert_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert a WWARA DataFrame with the vectorized engine.
+
+        Args:
+            df: WWARA DataFrame, as read by ``pd.read_csv``.
+
+        Returns:
+            A CHIRP DataFrame with one row per input row, not validated.
+        """
+        converted = convert_frame(
+            df, start_channel=self.channel,
+            comment_template=self.comment_template)
+        self.channel += len(df)
+        return converted
+
+    def process_frame(self, df: pd.DataFrame,
+                      engine: Optional[str] = None) -> pd.DataFrame:
+        """Convert and validate a WWARA DataFrame.
+
+        Locations continue from the channel counter, so consecutive
+        chunks of one input are numbered as one table.
+
+        Args:
+            df: WWARA DataFrame, as read by ``pd.read_csv``.
+            engine: One of ENGINES; defaults to this Converter's engine.
+                A DataFrame is already in pandas, so the stdlib engine
+                converts it row by row, like the row engine.
+
+        Returns:
+            A DataFrame of the valid CHIRP rows.
+        """
+        profiler = self.profiler
+        if (engine or self.engine) == 'vectorized':
+            with profiler.stage('convert'):
+                converted = self.convert_frame(df)
+            with profiler.stage('validate'):
+                valid, errors = self.validator.validate_frame(converted)
+            if not errors.empty:
+                profiler.reject_frame(errors)
+                self.validator.log_frame_errors(errors)
+            with profiler.stage('accumulate'):
+                return converted[valid].reset_index(drop=True)
+
+        output_buffer = ChirpRowBuffer()
+        self._process_rows(df, output_buffer.append)
+        with profiler.stage('accumulate'):
+            return output_buffer.to_frame()
+
+    def _process_rows(self, df: pd.DataFrame, append) -> None:
+        """Convert and validate df row by row, appending the valid rows."""
+        profiler = self.profiler
+        convert = profiler.wrap('convert', convert_record)
+        validate = profiler.wrap('validate', self._validate_row)
+        append = profiler.wrap('accumulate', append)
+        for wwara_row in RecordAccessor(df.columns).records(df):
+            chirp_row = convert(wwara_row, self.channel,
+                                self.comment_template)
+            self.channel += 1
+            if validate(chirp_row):
+                append(chirp_row)
+
+    def _validate_row(self, chirp_row) -> bool:
+        """Validate one CHIRP row, logging its Location if it is invalid."""
+        if not self.validator.validate_row(chirp_row):
+            error_location = chirp_row['Location']
+            log.error(f'Invalid row data: {error_location}')
+            return False
+        return True
+
+    def add_row(self, wwara_row) -> bool:
+        """Convert and validate one WWARA row into the output buffer.
+
+        Args:
+            wwara_row: A WWARA record.
+
+        Returns:
+            True if the row was valid and was added.
+        """
+        chirp_row = self.convert_row(wwara_row)
+        if not self._validate_row(chirp_row):
+            return False
+        self.output.append(chirp_row)
+        return True
+
+    def add_frame(self, df: pd.DataFrame) -> int:
+        """Convert and validate a WWARA DataFrame into the output buffer.
+
+        Args:
+            df: WWARA DataFrame.
+
+        Returns:
+            The number of valid rows added.
+        """
+        chirp_table = self.process_frame(df)
+        self.output.extend_frame(chirp_table)
+        return len(chirp_table)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the rows added with add_row and add_frame."""
+        return self.output.to_frame()
+
+    def convert_file(self, input_file: str, output_file: str,
+                     chunksize: Optional[int] = None,
+                     member: str = 'rptrlist',
+                     state_cache: Optional[str] = None,
+                     change_report: Optional[str] = None,
+                     extra_outputs: Sequence[str] = ()
+                     ) -> ConversionResult:
+        """Convert a WWARA file to a CHIRP file.
+
+        Args:
+            input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+            output_file: Path to the CHIRP CSV file; must not exist.
+            chunksize: If set, stream the input in chunks of this many
+                rows.
+            member: Which list to read from a ZIP archive.
+            state_cache: If set, convert incrementally using this state
+                cache file.
+            change_report: With state_cache, write the ChangeSummary to
+                this JSON file.
+            extra_outputs: Further files to write the same CHIRP rows to,
+                in the format of their extension: newline-delimited JSON,
+                Parquet or Arrow IPC (see writers.ChirpOutputs). The
+                conversion is not repeated for them.
+
+        The stdlib engine reads and writes the files without pandas. It
+        does not stream or convert incrementally, so with chunksize or
+        state_cache it converts with the row engine instead. Incremental
+        conversion always converts a row at a time, so with state_cache
+        the vectorized engine converts with the row engine too.
+
+        The output is written through a ChirpCsvWriter, so output_file
+        only appears once it is complete. The row and stdlib engines
+        write each valid row as soon as it is converted.
+
+        Returns:
+            A ConversionResult; ok is False if a file check failed.
+
+        Raises:
+            ValueError: If chunksize is less than 1.
+        """
+        check_chunksize(chunksize)
+        log.debug('Script started')
+        log.debug(f'Input file: {input_file}')
+        log.debug(f'Output file: {output_file}')
+        log.debug(f'Conversion engine: {self.engine}')
+
+        self.channel = self.limits.channel_min
+
+        if self.engine == 'stdlib' and not (chunksize or state_cache):
+            return stdlib_backend.convert_file(input_file, output_file,
+                                               self.limits, member,
+                                               self.template,
+                                               self.frequency_filter,
+                                               self.geo_filter,
+                                               self.parse_cache,
+                                               self.profiler,
+                                               self.buffer_size,
+                                               extra_outputs)
+
+        if not check_files(input_file, output_file, member, self.validator):
+            return ConversionResult(False)
+
+        if state_cache and self.engine != 'row':
+            log.info(f'Incremental conversion converts a row at a time, '
+                     f'ignoring the {self.engine} engine')
+        if chunksize and state_cache:
+            log.warning('Incremental conversion reads the whole input, '
+                        'ignoring the chunk size')
+        elif chunksize:
+            return self.convert_file_chunked(input_file, output_file,
+                                             chunksize, member,
+                                             extra_outputs)
+
+        profiler = self.profiler
+        log.debug(f'Reading input file: {input_file}')
+        with profiler.stage('read'):
+            df = self.read_frame(input_file, member)
+        log.debug(f'Number of memory channels read: {len(df)}')
+        rows_read = len(df)
+        with profiler.stage('select'):
+            df = self.select_frame(df)
+
+        if not state_cache and self.engine == 'vectorized':
+            chirp_table = self.process_frame(df)
+            with profiler.stage('write'):
+                write_output_file(output_file, chirp_table,
+                                  self.buffer_size, extra_outputs)
+            return ConversionResult(True, rows_read, len(chirp_table))
+        if not state_cache:
+            with ChirpOutputs(output_file, extra_outputs,
+                              buffer_size=self.buffer_size) as output:
+                self._process_rows(df, output.write_row)
+                with profiler.stage('write'):
+                    output.commit()
+            log.info(f'Output file written: {output_file}')
+            log.info(f'Number of memory channels written: '
+                     f'{output.rows_written}')
+            return ConversionResult(True, rows_read, output.rows_written)
+
+        chirp_table, cache, summary = convert_incremental(
+            df, StateCache.load(state_cache, self.cache_settings()),
+            profiler.wrap('convert', self.convert_row), self.validator)
+        with profiler.stage('write'):
+            write_output_file(output_file, chirp_table, self.buffer_size,
+                              extra_outputs)
+        cache.save(state_cache)
+        if change_report:
+            write_change_report(change_report, summary)
+        return ConversionResult(True, rows_read, len(chirp_table), summary)
+
+    def convert_file_chunked(self, input_file: str, output_file: str,
+                             chunksize: int, member: str = 'rptrlist',
+                             extra_outputs: Sequence[str] = ()
+                             ) -> ConversionResult:
+        """Convert a WWARA file in bounded chunks, writing as it goes.
+
+        At most ``chunksize`` input rows are held in memory at a time, so
+        peak memory does not grow with the size of the extract. Each chunk
+        is converted, validated and appended to the output file before the
+        next one is read. With the pandas reader the file is scanned
+        twice: once to settle the column dtypes and once to convert it.
+        The typed reader knows the dtypes beforehand and scans it once.
+        The files are not checked; convert_file checks them before it
+        calls this.
+
+        Args:
+            input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+            output_file: Path to the CHIRP CSV file to write.
+            chunksize: Number of input rows per chunk.
+            member: Which list to read from a ZIP archive.
+            extra_outputs: Further files to write the rows to. Their
+                rows are held in memory until the last chunk.
+
+        Returns:
+            A ConversionResult.
+
+        Raises:
+            ValueError: If chunksize is less than 1.
+        """
+        check_chunksize(chunksize)
+        profiler = self.profiler
+        rows_read = 0
+        typed = self.reader == 'typed'
+        with profiler.stage('read'):
+            if typed:
+                dtypes = input_schema(input_file, member).dtypes
+            else:
+                dtypes = infer_chunked_dtypes(input_file, chunksize, member)
+
+        log.debug(f'Reading input file in chunks of {chunksize} rows: '
+                  f'{input_file}')
+        read_chunk = profiler.wrap('read', next)
+        with open_input(input_file, member) as source, \
+                ChirpOutputs(output_file, extra_outputs,
+                             buffer_size=self.buffer_size) as output:
+            chunks = pd.read_csv(source, skiprows=[0], chunksize=chunksize,
+                                 dtype=dtypes)
+            while True:
+                df = read_chunk(chunks, None)
+                if df is None:
+                    break
+                if typed:
+                    df = fill_flags(df)
+                rows_read += len(df)
+                with profiler.stage('select'):
+                    df = self.select_frame(df)
+                chirp_chunk = self.process_frame(df)
+                with profiler.stage('write'):
+                    output.write_frame(chirp_chunk)
+            with profiler.stage('write'):
+                output.commit()
+        rows_written = output.rows_written
+
+        log.debug(f'Number of memory channels read: {rows_read}')
+        log.info(f'Output file written: {output_file}')
+        log.info(f'Number of memory channels written: {rows_written}')
+        return ConversionResult(True, rows_read, rows_written)
+
+    def convert_file_banked(self, input_file: str, output_dir: str,
+                            bank_size: Optional[int] = None,
+                            bank_by: str = 'count',
+                            member: str = 'rptrlist') -> ConversionResult:
+        """Convert a WWARA file to several CHIRP files, one per bank.
+
+        Every valid record is written: when a bank is full, the next one
+        starts again from the first memory location. Each record is
+        converted and validated once, and gets its Location as it is
+        added to its bank. See the banks module.
+
+        Args:
+            input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+            output_dir: Directory for the bank files; must not hold bank
+                files already.
+            bank_size: Most memories per bank; defaults to every memory
+                location of the limits.
+            bank_by: One of BANK_KEYS: 'count' fills banks in input
+                order, 'band', 'city' and 'mode' give each group its own
+                banks.
+            member: Which list to read from a ZIP archive.
+
+        Returns:
+            A ConversionResult listing the bank files in output_files;
+            ok is False if a file check failed.
+
+        Raises:
+            ValueError: If bank_size or bank_by is invalid.
+        """
+        log.debug(f'Input file: {input_file}')
+        log.debug(f'Output directory: {output_dir}')
+        log.debug(f'Conversion engine: {self.engine}')
+
+        banks = BankWriter(self.limits, bank_size, bank_by)
+        if not (self.validator.validate_input_file(input_file)
+                and validate_extract(input_file, member)
+                and validate_schema(input_file, member)):
+            return ConversionResult(False)
+        existing = existing_bank_files(output_dir)
+        if existing:
+            log.warning(f'Bank files already exist in {output_dir}: '
+                        f'{", ".join(existing)}')
+            return ConversionResult(False)
+
+        log.debug(f'Reading input file: {input_file}')
+        if self.engine == 'stdlib':
+            records = stdlib_backend.read_records(input_file, member,
+                                                  self.parse_cache)
+            rows_read = len(records)
+            records = stdlib_backend.select_records(
+                records, self.frequency_filter, self.geo_filter)
+        else:
+            df = self.read_frame(input_file, member)
+            rows_read = len(df)
+            df = self.select_frame(df)
+            records = df.to_dict('records')
+        log.debug(f'Number of memory channels read: {rows_read}')
+
+        if self.engine == 'vectorized':
+            self.channel = 0
+            converted = self.convert_frame(df)
+            # Locations are input positions until the rows join a bank
+            position_limits = replace(
+                self.limits, channel_min=0,
+                channel_max=max(len(df) - 1, self.limits.channel_max))
+            valid, errors = validator_for(position_limits).validate_frame(
+                converted)
+            if not errors.empty:
+                self.validator.log_frame_errors(errors)
+            for wwara_row, chirp_row, is_valid in zip(
+                    records, converted.to_dict('records'), valid):
+                if is_valid:
+                    banks.add(wwara_row, chirp_row)
+        else:
+            for position, wwara_row in enumerate(records):
+                chirp_row = convert_record(wwara_row,
+                                           self.limits.channel_min,
+                                           self.comment_template)
+                if self.validator.validate_row(chirp_row):
+                    banks.add(wwara_row, chirp_row)
+                else:
+                    log.error(f'Invalid row data: input record {position}')
+
+        output_files = banks.write(output_dir)
+        return ConversionResult(True, rows_read, banks.rows_added,
+                                output_files=tuple(output_files))
+
+    def convert_file_profiles(self, input_file: str, output_path: str,
+                              profiles: Sequence[RadioProfile],
+                              member: str = 'rptrlist') -> ConversionResult:
+        """Convert a WWARA file to one CHIRP file per radio profile.
+
+        The input is read, selected and converted once; each profile is
+        rendered from that conversion with its own columns, defaults,
+        limits and modes (see the profiles module). The Converter's own
+        limits are not used, and the conversion is always vectorized,
+        which gives the same rows as the row engine.
+
+        Args:
+            input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+            output_path: Path to the CHIRP CSV file of a single profile,
+                or the directory receiving <name>.csv for several.
+            profiles: The RadioProfiles to render.
+            member: Which list to read from a ZIP archive.
+
+        Returns:
+            A ConversionResult listing the files in output_files, with
+            the rows written to all of them; ok is False if a file check
+            failed.
+
+        Raises:
+            ValueError: If two profiles have the same name.
+        """
+        log.debug(f'Input file: {input_file}')
+        log.debug(f'Radio profiles: '
+                  f'{", ".join(profile.name for profile in profiles)}')
+
+        outputs = profile_outputs(output_path, profiles)
+        if not (self.validator.validate_input_file(input_file)
+                and all(self.validator.validate_output_file(output_file)
+                        for profile, output_file in outputs)
+                and validate_extract(input_file, member)
+                and validate_schema(input_file, member)):
+            return ConversionResult(False)
+        if len(outputs) > 1:
+            os.makedirs(output_path, exist_ok=True)
+
+        profiler = self.profiler
+        log.debug(f'Reading input file: {input_file}')
+        with profiler.stage('read'):
+            df = self.read_frame(input_file, member)
+        log.debug(f'Number of memory channels read: {len(df)}')
+        rows_read = len(df)
+        with profiler.stage('select'):
+            df = self.select_frame(df)
+
+        renderer = ProfileRenderer(df, self.template,
+                                   self.limits.comment_length_max, profiler)
+        rows_written = 0
+        for profile, output_file in outputs:
+            chirp_table = renderer.render(profile)
+            with profiler.stage('write'):
+                write_output_file(output_file, chirp_table,
+                                  self.buffer_size)
+            rows_written += len(chirp_table)
+        return ConversionResult(True, rows_read, rows_written,
+                                output_files=tuple(
+                                    output_file
+                                    for profile, output_file in outputs))
@@ -0,0 +1,207 @@
+# src/wwara_chirp/core.py
+
+"""
+Conversion core
+
+The parts of a WWARA to CHIRP conversion that do not need pandas: the
+list of conversion engines, the result of a file conversion, the input
+and output file checks, and the conversion of a single WWARA record.
+Keeping them free of pandas lets the command line start quickly and lets
+the stdlib engine convert small files without importing pandas at all.
+
+Example:
+    >>> chirp_row = convert_record(wwara_row, location=0)
+    >>> chirp_row['Frequency']
+    '145.130000'
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple
+
+from wwara_chirp.chirpvalidator import (ChirpLimits, ChirpValidator,
+                                        DEFAULT_LIMITS)
+from wwara_chirp.columns import CHIRP_DEFAULTS
+from wwara_chirp.comment_template import CompiledTemplate, LEGACY_TEMPLATE
+from wwara_chirp.schema import validate_schema
+from wwara_chirp.wwara_extract import validate_extract
+
+if TYPE_CHECKING:
+    from wwara_chirp.incremental import ChangeSummary
+
+log = logging.getLogger(__name__)
+
+# Conversion engines selectable with --engine
+ENGINES = ('row', 'vectorized', 'stdlib')
+
+# How the pandas engines read the input, selectable with --reader: with
+# type inference ('pandas') or with the WWARA schema ('typed')
+READERS = ('pandas', 'typed')
+
+# The comment template of convert_record, compiled for the default limits
+DEFAULT_COMMENT_TEMPLATE = LEGACY_TEMPLATE.compile(
+    DEFAULT_LIMITS.comment_length_max)
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of a file conversion.
+
+    Attributes:
+        ok: False if the input or output file was rejected.
+        rows_read: Number of WWARA records read.
+        rows_written: Number of CHIRP memories written.
+        summary: ChangeSummary of an incremental conversion, else None.
+        output_files: The bank files of a banked conversion, else ().
+    """
+    ok: bool
+    rows_read: int = 0
+    rows_written: int = 0
+    summary: Optional['ChangeSummary'] = None
+    output_files: Tuple[str, ...] = ()
+
+
+def check_files(input_file: str, output_file: str, member: str = 'rptrlist',
+                validator: type = ChirpValidator) -> bool:
+    """Check the input and output files before a conversion.
+
+    Failures are logged by the validator, ``validate_extract`` and
+    ``validate_schema``. Only the first two lines of the input are read,
+    so an input of an unknown DATA_SPEC_VERSION is rejected before any
+    of its records is converted.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        output_file: Path to the CHIRP CSV file; must not exist.
+        member: Which list to read from a ZIP archive.
+        validator: ChirpValidator class to check the files with.
+
+    Returns:
+        True if the conversion can go ahead.
+    """
+    return (validator.validate_input_file(input_file)
+            and validator.validate_output_file(output_file)
+            and validate_extract(input_file, member)
+            and validate_schema(input_file, member))
+
+
+def validator_for(limits: ChirpLimits) -> type:
+    """Return the ChirpValidator class that checks against limits."""
+    if limits == DEFAULT_LIMITS:
+        return ChirpValidator
+    return ChirpValidator.with_limits(limits)
+
+
+def is_missing(value: Any) -> bool:
+    """Return True for None and NaN, the values pandas reads as missing."""
+    if value is None:
+        return True
+    return isinstance(value, float) and math.isnan(value)
+
+
+def convert_record(wwara_row: Mapping[str, Any], location: int,
+                   comment_template: Optional[CompiledTemplate] = None
+                   ) -> Dict[str, Any]:
+    """Convert one WWARA record to a CHIRP row.
+
+    Args:
+        wwara_row: A WWARA record keyed by column name, such as a row
+            from df.iterrows(), a PositionalRecord or a dict from the
+            stdlib reader. Missing values are NaN, as pandas reads them.
+        location: Memory location of the CHIRP row.
+        comment_template: Builds the Comment field; defaults to
+            DEFAULT_COMMENT_TEMPLATE.
+
+    Returns:
+        The CHIRP row as a dict keyed by CHIRP column.
+    """
+    if comment_template is None:
+        comment_template = DEFAULT_COMMENT_TEMPLATE
+
+    # Set up the default CHIRP memory parameters
+    tone = ''
+    c_tone_freq = '88.5'
+    r_tone_freq = '88.5'
+    # dtcs_code = '023'
+    dtcs_code = 23
+    dtcs_polarity = CHIRP_DEFAULTS['DtcsPolarity']
+    mode = ''
+
+    name = wwara_row['CALL']
+
+    # wwara_row['OUTPUT_FREQ'] and wwara_row['INPUT_FREQ'] are in MHz
+    # Convert to Hz for chirp
+    frequency_out = wwara_row['OUTPUT_FREQ']
+    frequency_in = wwara_row['INPUT_FREQ']
+
+    if frequency_out > frequency_in:
+        duplex = '+'
+        offset = (frequency_out - frequency_in)
+    else:
+        duplex = '-'
+        offset = (frequency_in - frequency_out)
+
+    if wwara_row['CTCSS_IN'] != '':
+        tone = 'Tone'
+        r_tone_freq = wwara_row['CTCSS_IN']
+
+    if r_tone_freq != '':
+        tone = 'Tone'
+        if wwara_row['CTCSS_OUT'] != '':
+            c_tone_freq = wwara_row['CTCSS_OUT']
+    elif wwara_row['DCS_CDCSS'] != '':
+        tone = 'DTCS'
+        dtcs_code = wwara_row['DCS_CDCSS']
+
+
+
+    if wwara_row['FM_WIDE'] == 'Y':
+        mode = 'FM'
+    elif wwara_row['FM_NARROW'] == 'Y':
+        mode = 'NFM'
+    elif wwara_row['DSTAR_DV'] == 'Y':
+        mode = 'DV'
+    elif wwara_row['DSTAR_DD'] == 'Y':
+        # TODO: Check if this is the correct mode for DSTAR_DD
+        mode = 'DIG'
+    elif wwara_row['DMR'] == 'Y':
+        mode = 'DMR'
+    elif wwara_row['P25_PHASE_1'] == 'Y' or wwara_row['P25_PHASE_2'] == 'Y':
+        mode = 'P25'
+    elif wwara_row['ATV'] == 'Y':
+        # TODO: Check if this is the correct mode for ATV
+        mode = 'DIG'
+
+
+    comment = comment_template.format_row(wwara_row)
+
+    # check if c_tone_freq or r_tone_freq are NaN and set them to 88.5 if they are
+    if is_missing(c_tone_freq):
+        c_tone_freq = '88.5'
+    if is_missing(r_tone_freq):
+        r_tone_freq = '88.5'
+
+    return {
+        'Location': location,
+        'Name': name,
+        'Frequency': f'{frequency_out:.6f}',
+        'Duplex': duplex,
+        'Offset': f'{offset:.6f}',
+        'Tone': tone,
+        'rToneFreq': r_tone_freq,
+        'cToneFreq': c_tone_freq,
+        'DtcsCode': dtcs_code,
+        'DtcsPolarity': dtcs_polarity,
+        'RxDtcsCode': CHIRP_DEFAULTS['RxDtcsCode'],
+        'CrossMode': CHIRP_DEFAULTS['CrossMode'],
+        'Mode': mode,
+        'TStep': CHIRP_DEFAULTS['TStep'],
+        'Skip': CHIRP_DEFAULTS['Skip'],
+        'Power': CHIRP_DEFAULTS['Power'],
+        'Comment': comment,
+        'URCALL': CHIRP_DEFAULTS['URCALL'],
+        'RPT1CALL': CHIRP_DEFAULTS['RPT1CALL'],
+        'RPT2CALL': CHIRP_DEFAULTS['RPT2CALL'],
+        'DVCODE': CHIRP_DEFAULTS['DVCODE']
+    }
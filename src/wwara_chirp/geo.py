@@ -0,0 +1,428 @@
+# src/wwara_chirp/geo.py
+
+"""
+Geographic selection
+
+Selects repeaters by the LATITUDE and LONGITUDE of the WWARA extract:
+those within a radius of a point (--near LAT,LON --radius-km N) and
+those inside a bounding box (--bbox SOUTH,WEST,NORTH,EAST). Selected
+repeaters can be put in order of distance, so that the closest ones get
+the lowest memory locations.
+
+Distances are great circle distances from the haversine formula. For a
+DataFrame they are computed with numpy over the whole coordinate
+columns at once; the stdlib engine computes them record by record with
+the math module, so that it still never imports numpy.
+
+A GeoIndex buckets the repeaters into a grid of cells a fraction of a
+degree across. A radius query then only measures the distance to the
+repeaters in the cells that the circle overlaps, which makes repeated
+queries over the same extract cheap. A single conversion scans its
+DataFrame once instead, while a long-lived extract, such as the one the
+conversion service holds, keeps a GeoIndex for all of its queries.
+
+Example:
+    >>> geo_filter = GeoFilter.from_args(near='47.61,-122.33',
+    ...                                  radius_km=25, sort=True)
+    >>> chirp_df = geo_filter.select_frame(df)
+"""
+
+import math
+import numbers
+from dataclasses import dataclass
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, List, Mapping,
+                    Optional, Sequence, Tuple)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Mean radius of the Earth, in km
+EARTH_RADIUS_KM = 6371.0088
+
+# Size of a GeoIndex cell, in degrees of latitude and longitude
+DEFAULT_CELL_DEGREES = 0.25
+
+
+def haversine_km(latitude1: float, longitude1: float, latitude2: float,
+                 longitude2: float) -> float:
+    """Return the great circle distance between two points, in km."""
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(longitude2 - longitude1) / 2
+    a = (math.sin(half_dphi) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_km_array(latitudes, longitudes, latitude: float,
+                       longitude: float):
+    """Return the distances from many points to one point, in km.
+
+    Args:
+        latitudes: Latitudes of the points, array-like, in degrees.
+        longitudes: Longitudes of the points, array-like, in degrees.
+        latitude: Latitude of the reference point.
+        longitude: Longitude of the reference point.
+
+    Returns:
+        A numpy array of distances; NaN where a coordinate is missing.
+    """
+    import numpy as np
+
+    phi = np.radians(np.asarray(latitudes, dtype=float))
+    phi0 = math.radians(latitude)
+    half_dphi = (phi - phi0) / 2
+    half_dlambda = np.radians(np.asarray(longitudes, dtype=float)
+                              - longitude) / 2
+    a = (np.sin(half_dphi) ** 2
+         + math.cos(phi0) * np.cos(phi) * np.sin(half_dlambda) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def _coordinate(value: Any) -> Optional[float]:
+    """Return a coordinate as a float, or None if it is missing.
+
+    Text is parsed as pd.to_numeric would, so a column the stdlib reader
+    keeps as strings selects the same rows as on the pandas engines.
+    """
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            return None
+    if isinstance(value, numbers.Real) and math.isfinite(value):
+        return float(value)
+    return None
+
+
+def parse_point(text: str) -> Tuple[float, float]:
+    """Parse a point written as LAT,LON in decimal degrees.
+
+    Raises:
+        ValueError: If text is not a valid latitude and longitude.
+    """
+    values = parse_numbers(text, 2, 'LAT,LON')
+    check_point(*values)
+    return values
+
+
+def parse_bbox(text: str) -> Tuple[float, float, float, float]:
+    """Parse a bounding box written as SOUTH,WEST,NORTH,EAST.
+
+    A box whose west edge is east of its east edge crosses the 180th
+    meridian.
+
+    Raises:
+        ValueError: If text is not a valid bounding box.
+    """
+    south, west, north, east = parse_numbers(text, 4,
+                                             'SOUTH,WEST,NORTH,EAST')
+    check_point(south, west)
+    check_point(north, east)
+    if south > north:
+        raise ValueError(f'Bounding box south edge {south:g} is north of '
+                         f'its north edge {north:g}')
+    return south, west, north, east
+
+
+def parse_numbers(text: str, count: int, form: str) -> Tuple[float, ...]:
+    """Parse count comma separated numbers, or raise ValueError."""
+    fields = text.split(',')
+    try:
+        values = tuple(float(field) for field in fields)
+    except ValueError:
+        values = ()
+    if len(values) != count:
+        raise ValueError(f'Expected {form} in decimal degrees, not {text}')
+    return values
+
+
+def check_point(latitude: float, longitude: float) -> None:
+    """Raise ValueError for a latitude or longitude out of range."""
+    if not -90 <= latitude <= 90:
+        raise ValueError(f'Latitude out of range: {latitude:g}')
+    if not -180 <= longitude <= 180:
+        raise ValueError(f'Longitude out of range: {longitude:g}')
+
+
+def in_bbox(latitude: float, longitude: float,
+            bbox: Tuple[float, float, float, float]) -> bool:
+    """Return True if a point lies inside a bounding box."""
+    south, west, north, east = bbox
+    if not south <= latitude <= north:
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east
+
+
+class GeoIndex:
+    """Grid index over repeater coordinates, for repeated queries.
+
+    Repeaters without coordinates are left out of the index.
+
+    Attributes:
+        cell_degrees: Size of a grid cell, in degrees.
+        latitudes: Latitude of each indexed position, None if missing.
+        longitudes: Longitude of each indexed position, None if missing.
+    """
+
+    def __init__(self, latitudes: Sequence[Any], longitudes: Sequence[Any],
+                 cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.latitudes = [_coordinate(value) for value in latitudes]
+        self.longitudes = [_coordinate(value) for value in longitudes]
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, (latitude, longitude) in enumerate(
+                zip(self.latitudes, self.longitudes)):
+            if latitude is not None and longitude is not None:
+                self._cells.setdefault(self._cell(latitude, longitude),
+                                       []).append(position)
+
+    @classmethod
+    def from_frame(cls, df: 'pd.DataFrame',
+                   cell_degrees: float = DEFAULT_CELL_DEGREES) -> 'GeoIndex':
+        """Index the LATITUDE and LONGITUDE columns of a WWARA DataFrame.
+
+        Values that are not numbers count as missing.
+        """
+        import pandas as pd
+
+        return cls(
+            pd.to_numeric(df['LATITUDE'], errors='coerce').tolist(),
+            pd.to_numeric(df['LONGITUDE'], errors='coerce').tolist(),
+            cell_degrees)
+
+    def __len__(self) -> int:
+        return sum(len(positions) for positions in self._cells.values())
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (math.floor(latitude / self.cell_degrees),
+                math.floor(longitude / self.cell_degrees))
+
+    def _candidates(self, south: float, west: float, north: float,
+                    east: float) -> Iterable[int]:
+        """Yield the positions in the cells overlapping a box."""
+        south_row, west_column = self._cell(south, west)
+        north_row, east_column = self._cell(north, east)
+        for row in range(south_row, north_row + 1):
+            for column in range(west_column, east_column + 1):
+                yield from self._cells.get((row, column), ())
+
+    def within_radius(self, latitude: float, longitude: float,
+                      radius_km: float) -> List[Tuple[float, int]]:
+        """Find the repeaters within a distance of a point.
+
+        Args:
+            latitude: Latitude of the point.
+            longitude: Longitude of the point.
+            radius_km: Largest distance, in km.
+
+        Returns:
+            (distance in km, position) pairs, closest first.
+        """
+        degrees = math.degrees(radius_km / EARTH_RADIUS_KM)
+        south = max(latitude - degrees, -90.0)
+        north = min(latitude + degrees, 90.0)
+        polar = max(abs(south), abs(north))
+        if polar >= 90.0:
+            west, east = -180.0, 180.0
+        else:
+            spread = degrees / math.cos(math.radians(polar))
+            west, east = longitude - spread, longitude + spread
+            if west < -180.0 or east > 180.0:
+                west, east = -180.0, 180.0
+
+        found = []
+        for position in self._candidates(south, west, north, east):
+            distance = haversine_km(latitude, longitude,
+                                    self.latitudes[position],
+                                    self.longitudes[position])
+            if distance <= radius_km:
+                found.append((distance, position))
+        found.sort()
+        return found
+
+    def within_bbox(self, bbox: Tuple[float, float, float, float]
+                    ) -> List[int]:
+        """Return the positions inside a bounding box, in input order."""
+        south, west, north, east = bbox
+        if west <= east:
+            boxes = [(south, west, north, east)]
+        else:
+            boxes = [(south, west, north, 180.0),
+                     (south, -180.0, north, east)]
+        found = set()
+        for box in boxes:
+            for position in self._candidates(*box):
+                if in_bbox(self.latitudes[position],
+                           self.longitudes[position], bbox):
+                    found.add(position)
+        return sorted(found)
+
+
+@dataclass(frozen=True)
+class GeoFilter:
+    """The area a conversion is limited to.
+
+    Attributes:
+        center: (latitude, longitude) of the --near point, or None.
+        radius_km: Largest distance from center, in km.
+        bbox: (south, west, north, east) of the --bbox box, or None.
+        sort: Put the selected repeaters in order of distance from
+            center, closest first.
+    """
+    center: Optional[Tuple[float, float]] = None
+    radius_km: Optional[float] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    sort: bool = False
+
+    def __post_init__(self):
+        if (self.center is None) != (self.radius_km is None):
+            raise ValueError('A point and a radius go together')
+        if self.radius_km is not None and not self.radius_km > 0:
+            raise ValueError(f'Radius must be positive, not '
+                             f'{self.radius_km:g}')
+        if self.sort and self.center is None:
+            raise ValueError('Sorting by distance needs a point')
+
+    @classmethod
+    def from_args(cls, near: Optional[str] = None,
+                  radius_km: Optional[float] = None,
+                  bbox: Optional[str] = None,
+                  sort: bool = False) -> 'GeoFilter':
+        """Build a filter from the --near, --radius-km, --bbox and
+        --sort-by-distance options.
+
+        Raises:
+            ValueError: If an option is invalid or missing its partner.
+        """
+        return cls(None if near is None else parse_point(near), radius_km,
+                   None if bbox is None else parse_bbox(bbox), sort)
+
+    def __str__(self) -> str:
+        parts = []
+        if self.center is not None:
+            parts.append(f'{self.radius_km:g} km of {self.center[0]:g},'
+                         f'{self.center[1]:g}')
+        if self.bbox is not None:
+            parts.append('box ' + ','.join(f'{edge:g}'
+                                           for edge in self.bbox))
+        return ' and '.join(parts)
+
+    def _select(self, latitudes: Sequence[Optional[float]],
+                longitudes: Sequence[Optional[float]],
+                distances: Sequence[float]) -> List[int]:
+        """Select positions given their coordinates and distances."""
+        selected = []
+        for position, (latitude, longitude) in enumerate(
+                zip(latitudes, longitudes)):
+            if latitude is None or longitude is None:
+                continue
+            if self.center is not None and not (
+                    distances[position] <= self.radius_km):
+                continue
+            if self.bbox is not None and not in_bbox(latitude, longitude,
+                                                     self.bbox):
+                continue
+            selected.append(position)
+        if self.sort:
+            selected.sort(key=distances.__getitem__)
+        return selected
+
+    def select_records(self, records: Sequence[Mapping[str, Any]]
+                       ) -> List[Mapping[str, Any]]:
+        """Return the WWARA records inside the area.
+
+        Args:
+            records: WWARA records keyed by column name.
+
+        Returns:
+            The selected records, in input order or by distance.
+        """
+        latitudes = [_coordinate(record['LATITUDE']) for record in records]
+        longitudes = [_coordinate(record['LONGITUDE'])
+                      for record in records]
+        distances = [math.inf] * len(records)
+        if self.center is not None:
+            distances = [
+                math.inf if latitude is None or longitude is None
+                else haversine_km(self.center[0], self.center[1],
+                                  latitude, longitude)
+                for latitude, longitude in zip(latitudes, longitudes)]
+        positions = self._select(latitudes, longitudes, distances)
+        return [records[position] for position in positions]
+
+    def positions(self, df: 'pd.DataFrame',
+                  index: Optional[GeoIndex] = None) -> 'np.ndarray':
+        """Return the positions of the rows of df inside the area.
+
+        Without an index the tests run on whole columns with numpy.
+        Coordinates that are not numbers count as missing.
+
+        Args:
+            df: WWARA DataFrame.
+            index: GeoIndex.from_frame(df), kept by the caller for
+                repeated queries of the same DataFrame.
+
+        Returns:
+            The selected positions, in input order or by distance.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if index is not None:
+            return np.asarray(self._index_positions(index), dtype=np.intp)
+
+        latitudes = pd.to_numeric(df['LATITUDE'], errors='coerce').to_numpy(
+            dtype=float, na_value=np.nan)
+        longitudes = pd.to_numeric(df['LONGITUDE'], errors='coerce').to_numpy(
+            dtype=float, na_value=np.nan)
+        keep = np.isfinite(latitudes) & np.isfinite(longitudes)
+        latitudes[~keep] = longitudes[~keep] = np.nan
+        distances = np.full(len(df), np.inf)
+        if self.center is not None:
+            distances = haversine_km_array(latitudes, longitudes,
+                                           *self.center)
+            keep &= distances <= self.radius_km
+        if self.bbox is not None:
+            south, west, north, east = self.bbox
+            keep &= (latitudes >= south) & (latitudes <= north)
+            if west <= east:
+                keep &= (longitudes >= west) & (longitudes <= east)
+            else:
+                keep &= (longitudes >= west) | (longitudes <= east)
+        positions = np.flatnonzero(keep)
+        if self.sort:
+            positions = positions[np.argsort(distances[positions],
+                                              kind='stable')]
+        return positions
+
+    def _index_positions(self, index: GeoIndex) -> List[int]:
+        """Select the positions of a GeoIndex inside the area."""
+        if self.center is None:
+            return index.within_bbox(self.bbox)
+        found = index.within_radius(*self.center, self.radius_km)
+        positions = [position for distance, position in found
+                     if self.bbox is None
+                     or in_bbox(index.latitudes[position],
+                                index.longitudes[position], self.bbox)]
+        if not self.sort:
+            positions.sort()
+        return positions
+
+    def select_frame(self, df: 'pd.DataFrame',
+                     index: Optional[GeoIndex] = None) -> 'pd.DataFrame':
+        """Return the rows of a WWARA DataFrame inside the area.
+
+        Args:
+            df: WWARA DataFrame.
+            index: GeoIndex.from_frame(df), if the caller keeps one.
+
+        Returns:
+            The selected rows, indexed from 0, in input order or by
+            distance.
+        """
+        return df.iloc[self.positions(df, index)].reset_index(drop=True)
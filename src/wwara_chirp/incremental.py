@@ -0,0 +1,253 @@
+# src/wwara_chirp/incremental.py
+
+"""
+Incremental conversion
+
+Only a handful of repeaters change between two nightly WWARA extracts.
+This module keeps a state cache file that maps each FC_RECORD_ID to a
+fingerprint of its WWARA record and the CHIRP row converted from it. An
+ID that occurs more than once keeps one entry per occurrence, matched
+by their order in the extract. On
+the next run only new or changed records go through ``process_row`` and
+``validate_row``; every other CHIRP row is reused from the cache. The
+differences between the two runs are reported as a ChangeSummary, which
+doubles as a change feed.
+
+Memory locations depend on a record's position in the extract, so they
+are assigned afresh on every run and are not part of the cached rows.
+The rows are converted one at a time, with ``process_row``, whichever
+conversion engine is selected.
+
+Example:
+    >>> cache = StateCache.load('wwara-state.json')
+    >>> chirp_table, new_cache, summary = convert_incremental(
+    ...     df, cache, process_row, ChirpValidator())
+    >>> new_cache.save('wwara-state.json')
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from wwara_chirp.chirp_buffer import ChirpRowBuffer
+from wwara_chirp.chirpvalidator import ChirpValidator
+from wwara_chirp.version import __version__
+
+log = logging.getLogger(__name__)
+
+# Version of the state cache file layout
+CACHE_FORMAT_VERSION = 2
+
+# Column that identifies a WWARA record across extracts
+RECORD_ID_COLUMN = 'FC_RECORD_ID'
+
+
+@dataclass
+class ChangeSummary:
+    """Differences between the cached and the current extract.
+
+    Attributes:
+        added: Record IDs that are new in this extract.
+        removed: Record IDs that are no longer in the extract.
+        modified: Record IDs whose WWARA record changed.
+        unchanged: Number of records reused from the cache.
+    """
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the summary as a JSON-serializable dict."""
+        return asdict(self)
+
+    def __str__(self) -> str:
+        return (f'{len(self.added)} added, {len(self.removed)} removed, '
+                f'{len(self.modified)} modified, {self.unchanged} unchanged')
+
+
+@dataclass
+class CachedRecord:
+    """A converted WWARA record, as stored in the state cache.
+
+    Attributes:
+        fingerprint: Fingerprint of the WWARA record.
+        chirp_row: CHIRP row converted from it, without Location.
+        valid: Whether the row passed validation, apart from Location.
+    """
+    fingerprint: str
+    chirp_row: Dict[str, Any]
+    valid: bool
+
+
+class StateCache:
+    """Converted records of the previous run, keyed by FC_RECORD_ID.
+
+    The cache is tied to the package version and the conversion settings
+    (limits, comment template) that wrote it, so a new release or other
+    settings start from an empty cache.
+
+    Attributes:
+        records: CachedRecords per record ID, one per occurrence of the
+            ID in the extract, in order.
+        settings: Conversion settings the records were converted with.
+    """
+
+    def __init__(self,
+                 records: Optional[Dict[str, List[CachedRecord]]] = None,
+                 settings: str = ''):
+        self.records = records or {}
+        self.settings = settings
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self.records.values())
+
+    @classmethod
+    def load(cls, cache_file: str, settings: str = '') -> 'StateCache':
+        """Load a state cache file.
+
+        A missing file, or one written by another package version or with
+        other settings, gives an empty cache.
+
+        Args:
+            cache_file: Path to the cache file.
+            settings: Conversion settings of this run.
+
+        Returns:
+            The loaded StateCache.
+        """
+        if not os.path.isfile(cache_file):
+            log.info(f'State cache not found, converting all records: '
+                     f'{cache_file}')
+            return cls(settings=settings)
+
+        with open(cache_file, 'r') as f:
+            state = json.load(f)
+
+        if (state.get('format') != CACHE_FORMAT_VERSION
+                or state.get('version') != __version__):
+            log.info(f'State cache is from another version, converting all '
+                     f'records: {cache_file}')
+            return cls(settings=settings)
+        if state.get('settings', '') != settings:
+            log.info(f'State cache was written with other settings, '
+                     f'converting all records: {cache_file}')
+            return cls(settings=settings)
+
+        records = {record_id: [CachedRecord(**record) for record in records]
+                   for record_id, records in state['records'].items()}
+        return cls(records, settings)
+
+    def save(self, cache_file: str) -> None:
+        """Write the cache file, replacing it atomically.
+
+        Args:
+            cache_file: Path to the cache file.
+        """
+        state = {
+            'format': CACHE_FORMAT_VERSION,
+            'version': __version__,
+            'settings': self.settings,
+            'records': {record_id: [asdict(record) for record in records]
+                        for record_id, records in self.records.items()},
+        }
+        temp_file = f'{cache_file}.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(state, f, default=_json_value)
+        os.replace(temp_file, cache_file)
+        log.info(f'State cache written: {cache_file} '
+                 f'({len(self)} records)')
+
+
+def _json_value(value: Any) -> Any:
+    """Convert numpy scalars in CHIRP rows to plain Python values."""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f'Cannot store {type(value).__name__} in the state cache')
+
+
+def record_id(value: Any) -> str:
+    """Normalize an FC_RECORD_ID value (e.g. ' 1005' or 1005) to a key."""
+    return str(value).strip()
+
+
+def record_fingerprint(values: Tuple[Any, ...]) -> str:
+    """Fingerprint the field values of one WWARA record.
+
+    Args:
+        values: The record's values, in column order.
+
+    Returns:
+        A hex digest that changes when any value changes.
+    """
+    text = '\x1f'.join(str(value) for value in values)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def convert_incremental(df: pd.DataFrame, cache: StateCache,
+                        convert_row: Callable[[pd.Series], pd.Series],
+                        validator: ChirpValidator
+                        ) -> Tuple[pd.DataFrame, StateCache, ChangeSummary]:
+    """Convert a WWARA DataFrame, reusing unchanged records from a cache.
+
+    Args:
+        df: WWARA DataFrame, as read by ``pd.read_csv``.
+        cache: State cache of the previous run.
+        convert_row: Function that converts one WWARA row, normally
+            ``process_row``.
+        validator: ChirpValidator used to drop invalid rows.
+
+    Returns:
+        A tuple of (chirp_table, new_cache, summary). chirp_table holds
+        the valid CHIRP rows in input order, new_cache holds every record
+        of df, and summary lists what changed since the cached run. A
+        record ID that occurs n times is listed once per added, removed
+        or modified occurrence.
+    """
+    new_cache = StateCache(settings=cache.settings)
+    summary = ChangeSummary()
+    output_buffer = ChirpRowBuffer()
+    id_position = df.columns.get_loc(RECORD_ID_COLUMN)
+
+    for position, values in enumerate(df.itertuples(index=False, name=None)):
+        key = record_id(values[id_position])
+        occurrences = new_cache.records.setdefault(key, [])
+        if occurrences:
+            log.warning(f'Duplicate {RECORD_ID_COLUMN}: {key}')
+        fingerprint = record_fingerprint(values)
+        cached_records = cache.records.get(key, [])
+        cached = (cached_records[len(occurrences)]
+                  if len(occurrences) < len(cached_records) else None)
+
+        if cached is not None and cached.fingerprint == fingerprint:
+            record = cached
+            summary.unchanged += 1
+        else:
+            if cached is None:
+                summary.added.append(key)
+            else:
+                summary.modified.append(key)
+            chirp_row = convert_row(df.iloc[position]).to_dict()
+            del chirp_row['Location']
+            # Location is checked per run below, so validate the other
+            # fields with a location that is always in range
+            chirp_row_fields = dict(chirp_row,
+                                    Location=validator.channel_min)
+            record = CachedRecord(fingerprint, chirp_row,
+                                  validator.validate_row(chirp_row_fields))
+        occurrences.append(record)
+
+        if record.valid and validator.validate_location(position):
+            output_buffer.append(dict(record.chirp_row, Location=position))
+        else:
+            log.error(f'Invalid row data: {position}')
+
+    summary.removed = [key for key, records in cache.records.items()
+                       for _ in records[len(new_cache.records.get(key, [])):]]
+    log.info(f'Incremental conversion: {summary}')
+    return output_buffer.to_frame(), new_cache, summary
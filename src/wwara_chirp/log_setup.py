@@ -0,0 +1,176 @@
+# src/wwara_chirp/log_setup.py
+
+"""
+Logging setup
+
+configure_logging sends the package's log records to a rotating log
+file. Every ChirpValidator check that fails logs an error, so a dirty
+extract with thousands of bad names or locations writes thousands of
+lines, and the conversion waits on each write and on each rotation of
+the file. Two options keep that off the conversion:
+
+    * queue_records=True puts a QueueHandler on the package logger:
+      converting code only appends each record to an in-memory queue,
+      and a QueueListener thread writes the records to the log file.
+    * repeat_limit=N logs only the first N warnings and errors of each
+      reason and counts the others. The reason is the message up to its
+      first colon, which names the field and what is wrong with it,
+      e.g. 'Invalid name length' or 'Invalid memory location'. When
+      logging stops, each reason is logged once more with its count, so
+      the early errors stay in the log file instead of being rotated
+      away by their repeats.
+
+Example:
+    >>> logs = configure_logging('/var/log/wwara-chirp.log', 'INFO',
+    ...                          queue_records=True, repeat_limit=10)
+    >>> ...
+    >>> logs.stop()
+"""
+
+import logging
+import os
+import queue
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional, Tuple, Union
+
+# Default log file, in the current directory
+LOG_FILE = 'wwara-chirp.log'
+
+# Size at which the log file is rotated, and number of rotated files kept
+LOG_MAX_BYTES = 100000
+LOG_BACKUP_COUNT = 5
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Levels selectable on the command line
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+
+def message_reason(message: str) -> str:
+    """Return the reason of a log message: the text before its first colon.
+
+    Example:
+        >>> message_reason('Invalid name length: WW7PSR-Seattle')
+        'Invalid name length'
+    """
+    return message.split(': ', 1)[0]
+
+
+class RepeatFilter(logging.Filter):
+    """Passes the first limit warnings and errors of each reason.
+
+    Records below WARNING always pass.
+
+    Attributes:
+        limit: Number of records of each reason that are logged.
+        counts: Number of records seen, by (level name, reason).
+    """
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self.counts: Counter = Counter()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or getattr(record, 'summary',
+                                                       False):
+            return True
+        key = (record.levelname, message_reason(record.getMessage()))
+        self.counts[key] += 1
+        return self.counts[key] <= self.limit
+
+    def summary(self) -> List[Tuple[int, str]]:
+        """Return a (level, message) pair counting each reason."""
+        lines = []
+        for (level_name, reason), count in self.counts.most_common():
+            logged = min(count, self.limit)
+            lines.append((logging.getLevelName(level_name),
+                          f'{reason}: {count} time(s), {logged} logged'))
+        return lines
+
+
+class LogPipeline:
+    """The handlers configure_logging added to the package logger.
+
+    Attributes:
+        logger: The package logger.
+        handler: The handler on the logger: the file handler, or a
+            QueueHandler feeding it.
+        file_handler: The RotatingFileHandler writing the log file.
+        listener: The QueueListener writing queued records, or None.
+        repeat_filter: The RepeatFilter on handler, or None.
+    """
+
+    def __init__(self, logger: logging.Logger, handler: logging.Handler,
+                 file_handler: logging.Handler,
+                 listener: Optional[QueueListener] = None,
+                 repeat_filter: Optional[RepeatFilter] = None):
+        self.logger = logger
+        self.handler = handler
+        self.file_handler = file_handler
+        self.listener = listener
+        self.repeat_filter = repeat_filter
+
+    def stop(self) -> None:
+        """Log the repeat counts, write out queued records and detach.
+
+        Safe to call more than once.
+        """
+        if self.handler not in self.logger.handlers:
+            return
+        if self.repeat_filter is not None:
+            for level, message in self.repeat_filter.summary():
+                self.logger.log(level, f'Repeated: {message}',
+                                extra={'summary': True})
+        if self.listener is not None:
+            self.listener.stop()
+        self.logger.removeHandler(self.handler)
+        self.file_handler.close()
+
+
+def configure_logging(log_file: str = LOG_FILE,
+                      level: Union[int, str] = logging.DEBUG,
+                      queue_records: bool = False,
+                      repeat_limit: Optional[int] = None) -> LogPipeline:
+    """Send the package's log records to a rotating log file.
+
+    Called by main(), so importing the package creates no log file. The
+    handler goes on the package logger so that records from the
+    converter, validator and other modules reach the log file too.
+
+    Args:
+        log_file: Path of the log file; its directory is created if
+            needed.
+        level: Lowest level logged, e.g. logging.INFO or 'INFO'.
+        queue_records: If True, write the log file from a QueueListener
+            thread instead of from the converting code.
+        repeat_limit: If set, log at most this many warnings and errors
+            of each reason, and their counts when logging stops.
+
+    Returns:
+        The LogPipeline; call its stop() when the conversion ends.
+    """
+    package_log = logging.getLogger('wwara_chirp')
+    package_log.setLevel(level)
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES,
+                                       backupCount=LOG_BACKUP_COUNT)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = None
+    if queue_records:
+        records = queue.SimpleQueue()
+        handler = QueueHandler(records)
+        listener = QueueListener(records, file_handler)
+        listener.start()
+    else:
+        handler = file_handler
+    repeat_filter = None
+    if repeat_limit is not None:
+        repeat_filter = RepeatFilter(repeat_limit)
+        handler.addFilter(repeat_filter)
+    package_log.addHandler(handler)
+    return LogPipeline(package_log, handler, file_handler, listener,
+                       repeat_filter)
@@ -0,0 +1,307 @@
+# src/wwara_chirp/parse_cache.py
+
+"""
+Parse cache
+
+Parsing the WWARA CSV text, quotes, type inference and all, is the
+largest fixed cost of a conversion. Clubs export many programming files,
+with different filters and templates, from the same nightly extract, and
+every one of them parsed the same text again.
+
+With a parse cache, the first run saves the parsed table, a DataFrame
+for the pandas engines or the list of records for the stdlib engine, in
+a binary file next to the input (or in a cache directory). Later runs
+load it instead of reading the CSV. A cache file is only used while it
+matches:
+
+    * the SHA-256 hash of the input file and the list read from it,
+    * the DATA_SPEC_VERSION on the first line of the list,
+    * the cache format, package, Python and reader (pandas) versions.
+
+Otherwise the input is parsed again and the cache file replaced. Cache
+files are never pickles: anyone who can write next to the input could
+otherwise run code in every program that loads them. A DataFrame is
+saved as a NumPy archive with one array per column, loaded with
+allow_pickle=False; text columns keep a mask of their missing values,
+so these come back as NaN rather than None, which would change the CHIRP
+comments. The stdlib records are saved as JSON. Either way the key is
+stored as JSON and checked before the table is decoded, and a file that
+cannot be decoded is parsed again like a missing one.
+
+Example:
+    >>> df = read_cached('DataBaseExtract.zip', 'rptrlist', 'frame',
+    ...                  read_frame, cache_dir='')
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import zipfile
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from wwara_chirp.version import __version__
+from wwara_chirp.wwara_extract import read_spec_version
+
+log = logging.getLogger(__name__)
+
+# Version of the cache file layout
+CACHE_FORMAT_VERSION = 2
+
+# Cache files are named <input file>.<member>.<kind>.CACHE_SUFFIX
+CACHE_SUFFIX = 'wwara-cache'
+
+# Bytes hashed at a time
+HASH_BLOCK_SIZE = 1 << 20
+
+# Errors of reading a cache file that is truncated, corrupt or foreign
+CACHE_ERRORS = (OSError, EOFError, ValueError, TypeError, KeyError,
+                IndexError, zipfile.BadZipFile)
+
+T = TypeVar('T')
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 hash of a file, as hex."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(partial(f.read, HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(input_file: str, member: str, kind: str,
+               cache_dir: str = '') -> str:
+    """Return the path of the cache file of an input.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list is read from a ZIP archive.
+        kind: What is cached, e.g. 'frame' or 'records'.
+        cache_dir: Directory of the cache file; '' for the directory of
+            the input.
+
+    Returns:
+        The path of the cache file.
+    """
+    directory = cache_dir or os.path.dirname(os.path.abspath(input_file))
+    name = f'{os.path.basename(input_file)}.{member}.{kind}.{CACHE_SUFFIX}'
+    return os.path.join(directory, name)
+
+
+def cache_key(input_file: str, member: str, kind: str,
+              reader_version: str = '') -> dict:
+    """Describe everything a cached table depends on.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list is read from a ZIP archive.
+        kind: What is cached.
+        reader_version: Version of the library that parsed the input.
+
+    Returns:
+        A dict that is equal for two runs exactly when the cached table
+        of one can be used by the other.
+    """
+    return {
+        'format': CACHE_FORMAT_VERSION,
+        'version': __version__,
+        'python': list(sys.version_info[:2]),
+        'reader': reader_version,
+        'kind': kind,
+        'member': member,
+        'sha256': file_digest(input_file),
+        'data_spec_version': read_spec_version(input_file, member),
+    }
+
+
+def _encode_column(values: Any) -> Tuple[str, Dict[str, Any]]:
+    """Split a DataFrame column into arrays that load without pickle.
+
+    Returns:
+        A tuple of (kind, arrays): 'values' for a numeric or boolean
+        column, 'text' for strings with missing values, 'category' or
+        'ordered' for a categorical column.
+
+    Raises:
+        TypeError: If the column holds values that cannot be stored.
+    """
+    import pandas as pd
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        if categories.dtype == object:
+            categories = _text_array(categories.to_numpy(),
+                                     categories.isna())
+        kind = 'ordered' if values.cat.ordered else 'category'
+        return kind, {'': values.cat.codes.to_numpy(),
+                      'categories': categories}
+    if values.dtype.kind in 'biuf':
+        return 'values', {'': values.to_numpy()}
+    if values.dtype == object:
+        missing = values.isna().to_numpy()
+        return 'text', {'': _text_array(values.to_numpy(), missing),
+                        'missing': missing}
+    raise TypeError(f'Cannot cache a {values.dtype} column')
+
+
+def _text_array(values: Any, missing: Any) -> Any:
+    """Return strings as a NumPy unicode array, '' where missing.
+
+    Raises:
+        TypeError: If a value that is not missing is not a string.
+    """
+    import numpy as np
+
+    if not all(isinstance(value, str) for value in values[~missing]):
+        raise TypeError('Cannot cache a column of mixed types')
+    return np.where(missing, '', values).astype(str)
+
+
+def _decode_column(kind: str, archive: Any, name: str) -> Any:
+    """Rebuild a DataFrame column from its arrays, see _encode_column."""
+    import numpy as np
+    import pandas as pd
+
+    values = archive[name]
+    if kind == 'values':
+        return values
+    if kind == 'text':
+        values = values.astype(object)
+        values[archive[f'{name}missing']] = np.nan
+        return values
+    if kind in ('category', 'ordered'):
+        categories = archive[f'{name}categories']
+        if categories.dtype.kind == 'U':
+            categories = categories.astype(object)
+        return pd.Categorical.from_codes(values, categories,
+                                         ordered=kind == 'ordered')
+    raise ValueError(f'Unknown column kind: {kind}')
+
+
+def _save_frame(f: Any, key: dict, df: Any) -> None:
+    """Write a DataFrame and its key as a NumPy archive."""
+    import numpy as np
+    import pandas as pd
+
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        raise TypeError('Cannot cache a DataFrame with an index')
+    kinds = []
+    arrays = {}
+    for position, (_, values) in enumerate(df.items()):
+        kind, column_arrays = _encode_column(values)
+        kinds.append(kind)
+        for suffix, array in column_arrays.items():
+            arrays[f'{position}.{suffix}'] = array
+    meta = {'key': key, 'columns': list(df.columns), 'kinds': kinds,
+            'rows': len(df)}
+    np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def _load_frame(cache_file: str, key: dict) -> Optional[Any]:
+    """Return the DataFrame of a NumPy archive, or None if out of date."""
+    import numpy as np
+    import pandas as pd
+
+    with np.load(cache_file, allow_pickle=False) as archive:
+        meta = json.loads(str(archive['meta']))
+        if meta.get('key') != key:
+            return None
+        columns = {column: _decode_column(kind, archive, f'{position}.')
+                   for position, (column, kind)
+                   in enumerate(zip(meta['columns'], meta['kinds']))}
+    return pd.DataFrame(columns, index=pd.RangeIndex(meta['rows']))
+
+
+def _save_records(f: Any, key: dict, records: List[Dict[str, Any]]) -> None:
+    """Write stdlib records and their key as JSON, a row per record."""
+    columns = list(records[0]) if records else []
+    state = {'key': key, 'columns': columns,
+             'rows': [[record[column] for column in columns]
+                      for record in records]}
+    f.write(json.dumps(state).encode('utf-8'))
+
+
+def _load_records(cache_file: str, key: dict
+                  ) -> Optional[List[Dict[str, Any]]]:
+    """Return the records of a JSON cache file, or None if out of date."""
+    with open(cache_file, 'rb') as f:
+        state = json.loads(f.read().decode('utf-8'))
+    if state.get('key') != key:
+        return None
+    columns = state['columns']
+    records = []
+    for row in state['rows']:
+        if len(row) != len(columns):
+            raise ValueError('Cached record does not match its columns')
+        records.append(dict(zip(columns, row)))
+    return records
+
+
+def _load(cache_file: str, key: dict) -> Optional[Any]:
+    """Return the table in a cache file, or None if it does not match."""
+    if not os.path.isfile(cache_file):
+        log.info(f'Parse cache not found, parsing the input: {cache_file}')
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            is_json = f.read(1) == b'{'
+        load = _load_records if is_json else _load_frame
+        table = load(cache_file, key)
+    except CACHE_ERRORS as error:
+        log.warning(f'Parse cache unreadable, parsing the input: '
+                    f'{cache_file} ({error})')
+        return None
+    if table is None:
+        log.info(f'Parse cache is out of date, parsing the input: '
+                 f'{cache_file}')
+    return table
+
+
+def _save(cache_file: str, key: dict, table: Any) -> None:
+    """Write a cache file, replacing it atomically."""
+    temp_file = f'{cache_file}.{os.getpid()}.tmp'
+    save = _save_records if isinstance(table, list) else _save_frame
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, 'wb') as f:
+            save(f, key, table)
+        os.replace(temp_file, cache_file)
+    except (OSError, TypeError, ValueError) as error:
+        log.warning(f'Parse cache not written: {cache_file} ({error})')
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        return
+    log.info(f'Parse cache written: {cache_file}')
+
+
+def read_cached(input_file: str, member: str, kind: str,
+                read: Callable[[str, str], T], cache_dir: str = '',
+                reader_version: str = '') -> T:
+    """Read an input through its parse cache.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+        kind: What is cached, e.g. 'frame' or 'records'.
+        read: Parses the input; called as read(input_file, member) when
+            the cache cannot be used.
+        cache_dir: Directory of the cache file; '' for the directory of
+            the input.
+        reader_version: Version of the library read uses, so that a
+            cache is not loaded by another version of it.
+
+    Returns:
+        The parsed table, from the cache or from read.
+    """
+    cache_file = cache_path(input_file, member, kind, cache_dir)
+    key = cache_key(input_file, member, kind, reader_version)
+    table = _load(cache_file, key)
+    if table is not None:
+        log.info(f'Parse cache used: {cache_file}')
+        return table
+    table = read(input_file, member)
+    _save(cache_file, key, table)
+    return table
@@ -0,0 +1,343 @@
+# src/wwara_chirp/profiles.py
+
+"""
+Radio profiles
+
+A CHIRP file is imported into one model of radio, and radios differ in
+how many memories they have, how long a memory name may be, which modes
+they can use and which columns their CHIRP driver reads. A RadioProfile
+describes one model:
+
+    limits          ChirpLimits for the memory locations, frequencies,
+                    name and comment lengths
+    columns         the CHIRP columns to write, in order
+    defaults        values replacing CHIRP_DEFAULTS, the columns that do
+                    not depend on the repeater (Power, TStep, ...)
+    modes           the modes the radio can use; None for every mode
+    mode_fallbacks  a mode to write instead of one the radio cannot use
+                    ({'NFM': 'FM'}); repeaters of a mode that is neither
+                    supported nor falls back are left out
+
+A ProfileRenderer converts a WWARA DataFrame once, with the vectorized
+engine, and renders that conversion for any number of profiles: each
+profile only costs its mode selection, its validation and, if its
+comment length differs, its comments. The Locations of a profile are
+numbered from its first memory after the repeaters it cannot use have
+been left out, so its memories are filled without gaps; repeaters
+beyond its last memory are left out.
+
+Profiles can be loaded from JSON files:
+
+    {
+        "name": "club-mobile",
+        "limits": {"channel_max": 199, "name_length_max": 8},
+        "columns": ["Location", "Name", "Frequency", "Duplex", "Offset",
+                    "Tone", "rToneFreq", "cToneFreq", "Mode", "Comment"],
+        "defaults": {"Power": "50W"},
+        "modes": ["FM", "NFM"],
+        "mode_fallbacks": {}
+    }
+
+Example:
+    >>> renderer = ProfileRenderer(df)
+    >>> tables = [renderer.render(load_profile(name))
+    ...           for name in ('chirp', 'uv5r')]
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field, fields
+from typing import (TYPE_CHECKING, Any, Dict, FrozenSet, List, Mapping,
+                    Optional, Sequence, Tuple)
+
+from wwara_chirp.chirpvalidator import ChirpLimits, DEFAULT_LIMITS
+from wwara_chirp.columns import CHIRP_COLUMNS, CHIRP_DEFAULTS
+from wwara_chirp.comment_template import (CommentTemplate, CompiledTemplate,
+                                          LEGACY_TEMPLATE)
+from wwara_chirp.mock_chirp import MockChirp
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from wwara_chirp.profiling import Profiler
+
+log = logging.getLogger(__name__)
+
+# Columns every profile must write
+REQUIRED_COLUMNS = ('Location', 'Frequency')
+
+
+@dataclass(frozen=True)
+class RadioProfile:
+    """The CHIRP columns, defaults, limits and modes of a radio model.
+
+    Attributes:
+        name: Name of the profile, used for its output file.
+        limits: CHIRP limits for conversion and validation.
+        columns: CHIRP columns to write, in order. Besides CHIRP_COLUMNS,
+            a column may be one of defaults.
+        defaults: Values replacing CHIRP_DEFAULTS, or of extra columns.
+        modes: The modes the radio can use; None for every CHIRP mode.
+            Repeaters without a mode ('') are always kept.
+        mode_fallbacks: Mode to write instead of a mode the radio cannot
+            use.
+    """
+    name: str
+    limits: ChirpLimits = DEFAULT_LIMITS
+    columns: Tuple[str, ...] = tuple(CHIRP_COLUMNS)
+    defaults: Mapping[str, Any] = field(default_factory=dict)
+    modes: Optional[FrozenSet[str]] = None
+    mode_fallbacks: Mapping[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.name or os.sep in self.name:
+            raise ValueError(f'Invalid radio profile name: {self.name!r}')
+        computed = set(CHIRP_COLUMNS) - set(CHIRP_DEFAULTS)
+        for column in self.defaults:
+            if column in computed:
+                raise ValueError(f'Radio profile {self.name}: {column} '
+                                 f'is computed and has no default')
+        for column in self.columns:
+            if column not in CHIRP_COLUMNS and column not in self.defaults:
+                raise ValueError(f'Radio profile {self.name}: unknown '
+                                 f'column {column}')
+        for column in REQUIRED_COLUMNS:
+            if column not in self.columns:
+                raise ValueError(f'Radio profile {self.name}: the column '
+                                 f'{column} is required')
+        modes = set(self.mode_fallbacks) | set(self.mode_fallbacks.values())
+        if self.modes is not None:
+            modes |= self.modes
+        unknown = sorted(modes - set(MockChirp.MODES))
+        if unknown:
+            raise ValueError(f'Radio profile {self.name}: unknown modes '
+                             f'{", ".join(unknown)}')
+
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any]) -> 'RadioProfile':
+        """Build a profile from a dict, as read from a JSON file.
+
+        Raises:
+            ValueError: If the configuration is not a valid profile.
+        """
+        unknown = set(config) - {item.name for item in fields(cls)}
+        if unknown:
+            raise ValueError(f'Invalid radio profile: unknown settings '
+                             f'{", ".join(sorted(unknown))}')
+        try:
+            settings = dict(config)
+            settings['limits'] = ChirpLimits(**config.get('limits', {}))
+            if 'columns' in config:
+                settings['columns'] = tuple(config['columns'])
+            if config.get('modes') is not None:
+                settings['modes'] = frozenset(config['modes'])
+            return cls(**settings)
+        except (KeyError, TypeError) as error:
+            raise ValueError(f'Invalid radio profile: {error}') from None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the profile as a JSON-serializable dict."""
+        return {
+            'name': self.name,
+            'limits': asdict(self.limits),
+            'columns': list(self.columns),
+            'defaults': dict(self.defaults),
+            'modes': None if self.modes is None else sorted(self.modes),
+            'mode_fallbacks': dict(self.mode_fallbacks),
+        }
+
+    @classmethod
+    def load(cls, profile_file: str) -> 'RadioProfile':
+        """Load a profile from a JSON file."""
+        with open(profile_file, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def default_values(self) -> Dict[str, Any]:
+        """Return CHIRP_DEFAULTS with this profile's defaults applied."""
+        return {**CHIRP_DEFAULTS, **self.defaults}
+
+
+# Every column, mode and memory of the latest CHIRP versions: the
+# output of a conversion without a profile
+CHIRP_PROFILE = RadioProfile('chirp')
+
+# Baofeng UV-5R and its relatives: 128 memories, 7 character names, FM
+# only, 2 m and 70 cm
+UV5R_PROFILE = RadioProfile(
+    'uv5r',
+    limits=ChirpLimits(channel_max=127, frequency_min=136,
+                       frequency_max=520, name_length_max=7),
+    columns=tuple(column for column in CHIRP_COLUMNS
+                  if column not in ('URCALL', 'RPT1CALL', 'RPT2CALL',
+                                    'DVCODE')),
+    defaults={'Power': '4.0W'},
+    modes=frozenset(['FM', 'NFM']),
+)
+
+# Yaesu FT-60: memories 1 to 1000, 6 character names, wide FM only, so
+# narrow FM repeaters are programmed as FM
+FT60_PROFILE = RadioProfile(
+    'ft60',
+    limits=ChirpLimits(channel_min=1, channel_max=1000, frequency_min=108,
+                       frequency_max=520, name_length_max=6),
+    modes=frozenset(['FM', 'AM']),
+    mode_fallbacks={'NFM': 'FM'},
+)
+
+# Icom ID-51: 500 memories with 16 character names, FM and D-STAR
+ID51_PROFILE = RadioProfile(
+    'id51',
+    limits=ChirpLimits(frequency_min=108, frequency_max=480),
+    defaults={'Power': '5.0W'},
+    modes=frozenset(['FM', 'NFM', 'AM', 'DV']),
+)
+
+# Profiles selectable by name with --radio
+BUILTIN_PROFILES = {
+    profile.name: profile
+    for profile in (CHIRP_PROFILE, UV5R_PROFILE, FT60_PROFILE, ID51_PROFILE)
+}
+
+
+def load_profile(name_or_file: str) -> RadioProfile:
+    """Get a built-in profile by name, or load one from a JSON file.
+
+    Args:
+        name_or_file: A BUILTIN_PROFILES key or a path to a JSON file.
+
+    Returns:
+        The RadioProfile.
+
+    Raises:
+        ValueError: If the name is unknown or the file is not a valid
+            profile.
+    """
+    if name_or_file in BUILTIN_PROFILES:
+        return BUILTIN_PROFILES[name_or_file]
+    if os.path.isfile(name_or_file):
+        return RadioProfile.load(name_or_file)
+    raise ValueError(f'Unknown radio profile: {name_or_file}')
+
+
+def profile_outputs(output_path: str, profiles: Sequence[RadioProfile]
+                    ) -> List[Tuple[RadioProfile, str]]:
+    """Pair each profile with its output file.
+
+    A single profile is written to output_path. Several profiles are
+    written to output_path as a directory, as <name>.csv.
+
+    Raises:
+        ValueError: If two profiles have the same name.
+    """
+    names = [profile.name for profile in profiles]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f'Radio profiles given twice: '
+                         f'{", ".join(duplicates)}')
+    if len(profiles) == 1:
+        return [(profiles[0], output_path)]
+    return [(profile, os.path.join(output_path, f'{profile.name}.csv'))
+            for profile in profiles]
+
+
+class ProfileRenderer:
+    """Renders one vectorized conversion for several radio profiles.
+
+    The WWARA DataFrame is converted once, numbered from 0 in input
+    order and not validated. Comments are built once per comment length
+    used by the profiles.
+
+    Attributes:
+        df: The WWARA DataFrame, indexed from 0.
+        template: CommentTemplate building the Comment column.
+        table: The converted CHIRP DataFrame.
+        profiler: Profiler timing the conversion and each rendering.
+    """
+
+    def __init__(self, df: 'pd.DataFrame',
+                 template: Optional[CommentTemplate] = None,
+                 comment_length_max: int = DEFAULT_LIMITS.comment_length_max,
+                 profiler: Optional['Profiler'] = None):
+        from wwara_chirp.profiling import NULL_PROFILER
+        from wwara_chirp.vectorized import convert_frame
+
+        self.df = df.reset_index(drop=True)
+        self.template = template or LEGACY_TEMPLATE
+        self.profiler = profiler or NULL_PROFILER
+        compiled = self.template.compile(comment_length_max)
+        with self.profiler.stage('convert'):
+            self.table = convert_frame(self.df, comment_template=compiled)
+        self._comments = {compiled.key: self.table['Comment']}
+
+    def comments(self, compiled: CompiledTemplate) -> 'pd.Series':
+        """Return the comments built by a compiled template."""
+        if compiled.key not in self._comments:
+            with self.profiler.stage('convert'):
+                self._comments[compiled.key] = compiled.format_frame(
+                    self.df)
+        return self._comments[compiled.key]
+
+    def render(self, profile: RadioProfile) -> 'pd.DataFrame':
+        """Render the conversion for a radio profile.
+
+        Args:
+            profile: The radio profile.
+
+        Returns:
+            A DataFrame of the valid CHIRP rows, with the profile's
+            columns, numbered from the profile's first memory and at
+            most as many as it has memories.
+        """
+        import numpy as np
+        import pandas as pd
+
+        from wwara_chirp.core import validator_for
+
+        profiler = self.profiler
+        with profiler.stage('convert'):
+            mode = self.table['Mode'].to_numpy(dtype=object).copy()
+            for unsupported, fallback in profile.mode_fallbacks.items():
+                mode[mode == unsupported] = fallback
+            keep = np.ones(len(mode), dtype=bool)
+            if profile.modes is not None:
+                keep = (mode == '') | np.isin(mode, list(profile.modes))
+                for dropped, count in zip(*np.unique(mode[~keep],
+                                                     return_counts=True)):
+                    log.info(f'Radio profile {profile.name}: left out '
+                             f'{count} {dropped} repeater(s)')
+            table = self.table[keep].reset_index(drop=True)
+            table['Mode'] = mode[keep]
+            compiled = self.template.compile(
+                profile.limits.comment_length_max)
+            table['Comment'] = self.comments(compiled)[keep].to_numpy()
+            # Locations are numbered once the invalid rows are left out,
+            # so validate the other fields with one that is in range
+            table['Location'] = profile.limits.channel_min
+            for column, value in profile.default_values().items():
+                table[column] = value
+
+        validator = profiler.validator(validator_for(profile.limits))
+        with profiler.stage('validate'):
+            valid, errors = validator.validate_frame(table)
+        if not errors.empty:
+            profiler.reject_frame(errors)
+            validator.log_frame_errors(errors)
+        with profiler.stage('accumulate'):
+            table = table[valid.to_numpy()]
+            memories = (profile.limits.channel_max
+                        - profile.limits.channel_min + 1)
+            if len(table) > memories:
+                overflow = len(table) - memories
+                profiler.reject('location', overflow)
+                log.warning(f'Radio profile {profile.name}: left out '
+                            f'{overflow} repeater(s) beyond its '
+                            f'{memories} memories')
+                table = table.iloc[:memories]
+            table = table.assign(Location=np.arange(
+                profile.limits.channel_min,
+                profile.limits.channel_min + len(table)))
+            return pd.DataFrame(
+                {column: table[column].to_numpy()
+                 for column in profile.columns},
+                columns=list(profile.columns))
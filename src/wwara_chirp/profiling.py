@@ -0,0 +1,277 @@
+# src/wwara_chirp/profiling.py
+
+"""
+Conversion profiling
+
+A Profiler times the stages of a conversion, counts how often each ran,
+counts the rows rejected by each validator check, and reports the
+throughput and the peak resident memory of the process. ``--profile``
+prints the report when the conversion ends; ``--profile-json`` writes it
+as JSON.
+
+The stages are:
+
+    read        parsing the input
+    select      the --band, --freq-range, --near and --bbox filters
+    convert     WWARA records to CHIRP rows
+    validate    ChirpValidator checks, with one validate.<field> stage
+                per field check of validate_row
+    accumulate  collecting the valid rows into the output table
+    write       writing the CHIRP file
+
+Instrumented code asks the profiler for what it runs: ``wrap`` returns a
+timing wrapper around a function, ``stage`` a timing context manager,
+and ``validator`` a ChirpValidator subclass whose field checks are
+timed. Without profiling the code gets NULL_PROFILER, whose ``wrap`` and
+``validator`` return the function and the class unchanged, so a
+conversion that is not profiled runs exactly the code it ran before.
+
+Example:
+    >>> profiler = Profiler()
+    >>> Converter(profiler=profiler).convert_file('in.csv', 'out.csv')
+    >>> print(profiler.format_report())
+"""
+
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+# The field checks of ChirpValidator.validate_row, by rejection reason
+FIELD_CHECKS = {
+    'location': 'validate_location',
+    'frequency': 'validate_frequency',
+    'duplex': 'validate_duplex',
+    'offset': 'validate_offset',
+    'tone': 'validate_tone',
+    'dtcs_code': 'validate_dtcs_code',
+    'dtcs_polarity': 'validate_dtcs_polarity',
+    'mode': 'validate_mode',
+    'name': 'validate_name',
+    'comment': 'validate_comment',
+}
+
+# Reasons of the validate_frame fields whose name is not the reason
+FRAME_FIELD_REASONS = {'DtcsCode': 'dtcs_code',
+                       'DtcsPolarity': 'dtcs_polarity'}
+
+# Stages, in report order
+STAGES = ('read', 'select', 'convert', 'validate', 'accumulate', 'write')
+
+_STAGE_ORDER = {stage: position for position, stage in enumerate(STAGES)}
+
+
+def _stage_key(stage: str):
+    """Sort stages in STAGES order, each followed by its sub-stages."""
+    return _STAGE_ORDER.get(stage.split('.')[0], len(STAGES)), stage
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident memory of this process, in bytes.
+
+    Returns:
+        The peak, or None where the resource module is not available
+        (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    """Collects stage timings and counters of one conversion.
+
+    Attributes:
+        enabled: True; False for NULL_PROFILER.
+        seconds: Total seconds spent in each stage.
+        calls: Number of times each stage ran.
+        rejections: Number of rows rejected, by reason.
+        rows_read: Number of WWARA records read.
+        rows_written: Number of CHIRP memories written.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.rejections: Counter = Counter()
+        self.rows_read = 0
+        self.rows_written = 0
+        self._start = time.perf_counter()
+        self._elapsed: Optional[float] = None
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        """Add time spent in a stage."""
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the code in a with block as a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        """Return function, timing every call as a stage."""
+        perf_counter = time.perf_counter
+        add = self.add
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add(name, perf_counter() - start)
+
+        return timed
+
+    def reject(self, reason: str, rows: int = 1) -> None:
+        """Count rows rejected for a reason."""
+        self.rejections[reason] += rows
+
+    def validator(self, validator: type) -> type:
+        """Return a subclass of validator whose field checks are timed.
+
+        Each check runs as stage validate.<reason>, and a row it rejects
+        is counted under its reason.
+        """
+        namespace = {}
+        for reason, method in FIELD_CHECKS.items():
+            namespace[method] = classmethod(
+                self._timed_check(reason, getattr(validator, method)))
+        return type(f'Profiled{validator.__name__}', (validator,), namespace)
+
+    def _timed_check(self, reason: str, check: Callable) -> Callable:
+        """Wrap a bound field check for Profiler.validator."""
+        stage = f'validate.{reason}'
+        perf_counter = time.perf_counter
+        add = self.add
+        rejections = self.rejections
+
+        def timed_check(cls, *args, **kwargs):
+            start = perf_counter()
+            valid = check(*args, **kwargs)
+            add(stage, perf_counter() - start)
+            if not valid:
+                rejections[reason] += 1
+            return valid
+
+        return timed_check
+
+    def reject_frame(self, errors: Any) -> None:
+        """Count the rows of a validate_frame error table by reason.
+
+        A row failing several checks is counted once, under the first.
+        """
+        first_errors = errors.drop_duplicates('row')
+        for field, rows in first_errors['field'].value_counts().items():
+            self.reject(FRAME_FIELD_REASONS.get(field, field.lower()),
+                        int(rows))
+
+    def finish(self, rows_read: int, rows_written: int) -> None:
+        """Record the row counts and stop the clock."""
+        self.rows_read = rows_read
+        self.rows_written = rows_written
+        self._elapsed = time.perf_counter() - self._start
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds from the profiler's creation to finish, or to now."""
+        if self._elapsed is not None:
+            return self._elapsed
+        return time.perf_counter() - self._start
+
+    def report(self) -> Dict[str, Any]:
+        """Return the profile as a JSON-serializable dict."""
+        elapsed = self.elapsed
+        stages = {}
+        for stage in sorted(self.seconds, key=_stage_key):
+            seconds = self.seconds[stage]
+            stages[stage] = {
+                'seconds': round(seconds, 6),
+                'calls': self.calls[stage],
+                'share': round(seconds / elapsed, 4) if elapsed else 0.0,
+            }
+        return {
+            'elapsed_seconds': round(elapsed, 6),
+            'rows_read': self.rows_read,
+            'rows_written': self.rows_written,
+            'rows_rejected': sum(self.rejections.values()),
+            'rows_per_second': (round(self.rows_read / elapsed, 1)
+                                if elapsed else 0.0),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': stages,
+            'rejections': dict(self.rejections.most_common()),
+        }
+
+    def format_report(self) -> str:
+        """Return the profile as a table for the terminal."""
+        report = self.report()
+        lines = [
+            f'Profile: {report["rows_read"]} rows read, '
+            f'{report["rows_written"]} written, '
+            f'{report["rows_rejected"]} rejected in '
+            f'{report["elapsed_seconds"]:.3f}s '
+            f'({report["rows_per_second"]:,.0f} rows/s)',
+        ]
+        if report['peak_rss_bytes'] is not None:
+            lines.append(f'Peak RSS: '
+                         f'{report["peak_rss_bytes"] / 2 ** 20:.1f} MiB')
+        lines.append(f'{"stage":<24} {"seconds":>10} {"calls":>9} '
+                     f'{"share":>7}')
+        for stage, timing in report['stages'].items():
+            lines.append(f'{stage:<24} {timing["seconds"]:>10.4f} '
+                         f'{timing["calls"]:>9} {timing["share"]:>7.1%}')
+        if report['rejections']:
+            lines.append('Rejected rows by reason:')
+            for reason, rows in report['rejections'].items():
+                lines.append(f'  {reason:<22} {rows:>9}')
+        return '\n'.join(lines)
+
+    def write_json(self, path: str) -> None:
+        """Write the profile to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+class NullProfiler(Profiler):
+    """A Profiler that records nothing and adds no work."""
+
+    enabled = False
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        pass
+
+    def stage(self, name: str) -> ContextManager[None]:
+        return nullcontext()
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        return function
+
+    def reject(self, reason: str, rows: int = 1) -> None:
+        pass
+
+    def validator(self, validator: type) -> type:
+        return validator
+
+    def reject_frame(self, errors: Any) -> None:
+        pass
+
+    def finish(self, rows_read: int, rows_written: int) -> None:
+        pass
+
+
+# The profiler of conversions that are not profiled
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,281 @@
+# src/wwara_chirp/schema.py
+
+"""
+WWARA schema registry and typed reader
+
+The first line of every WWARA list names the data specification it
+follows (DATA_SPEC_VERSION=2015.2.2), and the second names its columns.
+SCHEMAS maps each known specification version to a WwaraSchema: its
+columns, in file order, and their dtypes. An input is checked against
+its schema before any of its rows is read, so a list of an unknown
+version, or one whose columns differ from its version's, is rejected
+up front instead of being converted into wrong memories.
+
+``pd.read_csv`` infers the type of every column from its values. For the
+WWARA extract that means the Y/N flag columns and the few distinct
+states, sources and locales are held as one Python string per cell, and
+the inferred types can change from one extract, or one chunk, to the
+next: an empty column is read as float64, a tone column without missing
+values as int64.
+
+The typed reader reads the extract with the dtypes of its schema
+instead:
+
+    * frequencies, tones, DCS codes, coordinates and the DSQ and RAN
+      codes are float64, as pandas infers them from a complete extract,
+      so the CHIRP output is the same as with the default reader;
+    * the flag columns and the columns with few distinct values are
+      categorical, which stores each distinct string once;
+    * the free text columns are strings (object), even when empty.
+
+Missing flags are read as 'N', which is what the conversion makes of
+them anyway. Plain CSV files are memory mapped while they are parsed.
+
+A RecordAccessor looks up the position of every column once, and then
+presents each row of a table as a PositionalRecord: a read-only mapping
+over the row's tuple of values, so that converting a record costs a
+dict and a tuple lookup per field instead of a label lookup on a
+pd.Series.
+
+pandas is only imported by the typed reader, so the file checks stay
+pandas-free.
+
+Example:
+    >>> schema = input_schema('DataBaseExtract.zip')
+    >>> schema.version
+    '2015.2.2'
+    >>> df = read_typed_frame('DataBaseExtract.zip')
+    >>> df['FM_WIDE'].dtype
+    CategoricalDtype(categories=['N', 'Y'], ordered=False, ...)
+"""
+
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional,
+                    Sequence, Tuple)
+
+from wwara_chirp.columns import WWARA_COLUMNS
+from wwara_chirp.wwara_extract import open_input, read_header
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Y/N columns
+FLAG_COLUMNS = (
+    'FM_WIDE', 'FM_NARROW', 'DSTAR_DV', 'DSTAR_DD', 'DMR', 'FUSION',
+    'P25_PHASE_1', 'P25_PHASE_2', 'NXDN_DIGITAL', 'NXDN_MIXED', 'ATV',
+    'DATV', 'RACES', 'ARES', 'WX',
+)
+
+# Value of a missing flag
+FLAG_DEFAULT = 'N'
+
+# Numeric columns
+FLOAT_COLUMNS = (
+    'OUTPUT_FREQ', 'INPUT_FREQ', 'CTCSS_IN', 'CTCSS_OUT', 'DCS_CDCSS',
+    'FUSION_DSQ', 'NXDN_RAN', 'LATITUDE', 'LONGITUDE',
+)
+
+# Text columns with few distinct values
+CATEGORY_COLUMNS = ('SOURCE', 'STATE', 'LOCALE', 'DMR_COLOR_CODE',
+                    'P25_NAC') + FLAG_COLUMNS
+
+# dtype of each WWARA column of the 2015.2.2 specification; the others
+# are strings
+WWARA_DTYPES: Dict[str, str] = {
+    'FC_RECORD_ID': 'int64',
+    **{column: 'float64' for column in FLOAT_COLUMNS},
+    **{column: 'category' for column in CATEGORY_COLUMNS},
+}
+WWARA_DTYPES.update({column: 'object' for column in WWARA_COLUMNS
+                     if column not in WWARA_DTYPES})
+
+
+@dataclass(frozen=True)
+class WwaraSchema:
+    """The layout of a WWARA list of one data specification version.
+
+    Attributes:
+        version: DATA_SPEC_VERSION, e.g. '2015.2.2'.
+        columns: Column names, in file order.
+        dtypes: dtype of each column, for the typed reader.
+        positions: Position of each column, by name.
+    """
+    version: str
+    columns: Tuple[str, ...]
+    dtypes: Dict[str, str]
+    positions: Dict[str, int] = field(init=False, repr=False,
+                                      compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'positions',
+                           {column: position for position, column
+                            in enumerate(self.columns)})
+
+    def check_columns(self, columns: Sequence[str]) -> None:
+        """Check the column names of a list against the schema.
+
+        Raises:
+            ValueError: If they are not the schema's columns, in order.
+        """
+        if tuple(columns) == self.columns:
+            return
+        missing = [column for column in self.columns
+                   if column not in columns]
+        unknown = [column for column in columns
+                   if column not in self.positions]
+        if missing or unknown:
+            raise ValueError(
+                f'Columns do not match DATA_SPEC_VERSION {self.version}: '
+                f'missing {", ".join(missing) or "none"}, unknown '
+                f'{", ".join(unknown) or "none"}')
+        raise ValueError(f'Columns are not in the order of DATA_SPEC_VERSION '
+                         f'{self.version}')
+
+    def accessor(self) -> 'RecordAccessor':
+        """Return a RecordAccessor for rows in this schema's column order."""
+        return RecordAccessor(self.columns)
+
+
+# Known data specification versions
+SCHEMAS: Dict[str, WwaraSchema] = {
+    '2015.2.2': WwaraSchema('2015.2.2', tuple(WWARA_COLUMNS), WWARA_DTYPES),
+}
+
+
+def schema_for(version: Optional[str]) -> WwaraSchema:
+    """Look up the schema of a data specification version.
+
+    Raises:
+        ValueError: If the version is unknown or missing.
+    """
+    if version is None:
+        raise ValueError('No DATA_SPEC_VERSION line')
+    schema = SCHEMAS.get(version)
+    if schema is None:
+        raise ValueError(f'Unknown DATA_SPEC_VERSION: {version} (known: '
+                         f'{", ".join(SCHEMAS)})')
+    return schema
+
+
+def input_schema(input_file: str, member: str = 'rptrlist') -> WwaraSchema:
+    """Find the schema of a WWARA list and check its columns against it.
+
+    Only the first two lines of the list are read.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        The schema of the list.
+
+    Raises:
+        ValueError: If the list's version is unknown or its columns do
+            not match it.
+    """
+    version, columns = read_header(input_file, member)
+    schema = schema_for(version)
+    schema.check_columns(columns)
+    return schema
+
+
+def validate_schema(input_file: str, member: str = 'rptrlist') -> bool:
+    """Check that a WWARA list follows a known data specification.
+
+    Failures are logged, in the style of the ChirpValidator file checks.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        True if the list matches the schema of its DATA_SPEC_VERSION.
+    """
+    try:
+        schema = input_schema(input_file, member)
+    except ValueError as error:
+        log.error(f'Invalid input file: {input_file}: {error}')
+        return False
+    log.debug(f'DATA_SPEC_VERSION: {schema.version}')
+    return True
+
+
+class PositionalRecord(Mapping):
+    """A WWARA record as a read-only mapping over a tuple of values."""
+
+    __slots__ = ('values', 'positions')
+
+    def __init__(self, values: Sequence[Any], positions: Dict[str, int]):
+        self.values = values
+        self.positions = positions
+
+    def __getitem__(self, column: str) -> Any:
+        return self.values[self.positions[column]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+class RecordAccessor:
+    """Presents rows of one column layout as PositionalRecords.
+
+    Attributes:
+        positions: Position of each column, by name.
+    """
+
+    def __init__(self, columns: Iterable[str]):
+        self.positions = {column: position
+                          for position, column in enumerate(columns)}
+
+    def __call__(self, values: Sequence[Any]) -> PositionalRecord:
+        return PositionalRecord(values, self.positions)
+
+    def records(self, df: 'pd.DataFrame') -> Iterator[PositionalRecord]:
+        """Yield the rows of a DataFrame with these columns as records."""
+        positions = self.positions
+        for values in df.itertuples(index=False, name=None):
+            yield PositionalRecord(values, positions)
+
+
+def read_typed_frame(input_file: str, member: str = 'rptrlist'
+                     ) -> 'pd.DataFrame':
+    """Read a WWARA CSV file or DataBaseExtract.zip list with the dtypes
+    of its schema.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        The WWARA DataFrame, typed by its schema.
+
+    Raises:
+        ValueError: If the list does not match a known schema.
+    """
+    import pandas as pd
+
+    schema = input_schema(input_file, member)
+    with open_input(input_file, member) as source:
+        df = pd.read_csv(source, skiprows=[0], dtype=schema.dtypes,
+                         memory_map=isinstance(source, str))
+    return fill_flags(df)
+
+
+def fill_flags(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Set the missing flags of a typed WWARA DataFrame to FLAG_DEFAULT."""
+    for column in FLAG_COLUMNS:
+        if column not in df:
+            continue
+        flags = df[column]
+        if flags.isna().any():
+            if FLAG_DEFAULT not in flags.cat.categories:
+                flags = flags.cat.add_categories(FLAG_DEFAULT)
+            df[column] = flags.fillna(FLAG_DEFAULT)
+    return df
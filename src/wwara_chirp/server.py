@@ -0,0 +1,512 @@
+# src/wwara_chirp/server.py
+
+"""
+Conversion service
+
+Converts the WWARA extract to CHIRP files over HTTP, for web sites that
+let users download their own programming file. Started once with
+``wwara_chirp serve``, the service reads the extract with the typed
+reader and keeps the table in memory, so a request pays neither Python
+startup, nor the pandas import, nor CSV parsing: only selecting and
+converting its repeaters, with the vectorized engine. The extract is a
+file, or the newest extract of a directory (see the watch module).
+
+Endpoints:
+
+    GET /export    A CHIRP CSV file, sent with chunked encoding as it
+                   is formatted.
+                   Query parameters, all optional:
+                       band=2m,70cm        --band
+                       freq_range=146-147  --freq-range
+                       near=47.61,-122.33  --near, with radius_km=40
+                       bbox=S,W,N,E        --bbox
+                       sort=distance       --sort-by-distance
+                       mode=FM,DV          CHIRP modes (MODES)
+                       channel_min=0       first memory location
+                       channel_max=99      last memory location; only
+                                           the first repeaters that fit
+                                           are exported
+                       comment=short       a BUILTIN_TEMPLATES name
+                       comment_length=32   --comment-length
+    GET /status    The loaded extract and the cache counters, as JSON.
+    POST /reload   Read the extract again.
+
+Each request's parameters are normalized into an ExportQuery (the
+order of bands or modes, spelling of band names and such do not
+matter), and the CSV files built for the most recent queries are kept in
+an LRU cache keyed by query. Before each export the service checks
+whether the extract has changed and, if it has, starts loading it in a
+background thread; with --watch-interval a background thread checks
+periodically instead. Requests keep using the previous extract, and
+never wait, while a new one is read. Once it is swapped in, the cache
+only serves files of the new extract; POST /reload reads the extract
+again and empties the cache.
+
+Usage:
+    wwara_chirp serve DataBaseExtract.zip --port 8080
+    curl 'http://127.0.0.1:8080/export?band=2m&near=47.61,-122.33&radius_km=40'
+"""
+
+import argparse
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (Any, Dict, Iterable, Iterator, List, Mapping,
+                    Optional, Sequence, Tuple)
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from wwara_chirp.bands import FrequencyFilter
+from wwara_chirp.chirpvalidator import DEFAULT_LIMITS
+from wwara_chirp.comment_template import BUILTIN_TEMPLATES, load_template
+from wwara_chirp.converter import Converter
+from wwara_chirp.core import READERS
+from wwara_chirp.geo import GeoFilter
+from wwara_chirp.vectorized import MODE_RULES, convert_mode
+from wwara_chirp.version import __version__
+from wwara_chirp.watch import ExtractSnapshot, WatchedExtract
+from wwara_chirp.writers import csv_blocks
+from wwara_chirp.wwara_extract import EXTRACT_MEMBERS
+
+log = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+
+# Number of exported files kept in the cache
+DEFAULT_CACHE_SIZE = 64
+
+# Bytes written per chunk of a streamed response
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# CHIRP modes the mode parameter accepts
+MODES = tuple(sorted({mode for fields, mode in MODE_RULES}))
+
+# Query parameters of GET /export
+QUERY_PARAMETERS = ('band', 'freq_range', 'near', 'radius_km', 'bbox',
+                    'sort', 'mode', 'channel_min', 'channel_max', 'comment',
+                    'comment_length')
+
+
+def _split(values: Sequence[str]) -> List[str]:
+    """Split repeated, comma separated parameter values."""
+    return [value.strip() for argument in values
+            for value in argument.split(',') if value.strip()]
+
+
+def _last(params: Mapping[str, Sequence[str]],
+          name: str) -> Optional[str]:
+    """Return the last value of a parameter, or None if it is missing."""
+    values = params.get(name)
+    return values[-1] if values else None
+
+
+def _number(params: Mapping[str, Sequence[str]], name: str, convert: type,
+            default: Any = None) -> Any:
+    """Return a numeric parameter.
+
+    Raises:
+        ValueError: If the parameter is not a number.
+    """
+    text = _last(params, name)
+    if text is None:
+        return default
+    try:
+        return convert(text)
+    except ValueError:
+        raise ValueError(f'{name} must be a number: {text}') from None
+
+
+@dataclass(frozen=True)
+class ExportQuery:
+    """A normalized GET /export request, usable as a cache key.
+
+    Attributes:
+        frequency_filter: Bands and frequency ranges, sorted, or None.
+        geo_filter: Area and order, or None.
+        modes: CHIRP modes to export, sorted; () for every mode.
+        channel_min: First memory location.
+        channel_max: Last memory location.
+        comment_template: A BUILTIN_TEMPLATES name.
+        comment_length: Longest comment, or None for the template's.
+    """
+    frequency_filter: Optional[FrequencyFilter] = None
+    geo_filter: Optional[GeoFilter] = None
+    modes: Tuple[str, ...] = ()
+    channel_min: int = DEFAULT_LIMITS.channel_min
+    channel_max: int = DEFAULT_LIMITS.channel_max
+    comment_template: str = 'legacy'
+    comment_length: Optional[int] = None
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, Sequence[str]]
+                    ) -> 'ExportQuery':
+        """Build a query from parsed query string parameters.
+
+        Args:
+            params: Values of each parameter, as from parse_qs.
+
+        Raises:
+            ValueError: If a parameter is unknown or invalid.
+        """
+        unknown = sorted(set(params) - set(QUERY_PARAMETERS))
+        if unknown:
+            raise ValueError(f'Unknown parameter: {", ".join(unknown)}')
+
+        frequency_filter = None
+        bands = _split(params.get('band', ()))
+        freq_ranges = _split(params.get('freq_range', ()))
+        if bands or freq_ranges:
+            ranges = FrequencyFilter.from_args(bands, freq_ranges).ranges
+            frequency_filter = FrequencyFilter(tuple(sorted(set(ranges))))
+
+        geo_filter = None
+        sort = _last(params, 'sort')
+        if sort not in (None, 'distance'):
+            raise ValueError(f'sort must be "distance": {sort}')
+        near, bbox = _last(params, 'near'), _last(params, 'bbox')
+        radius_km = _number(params, 'radius_km', float)
+        if near is not None or bbox is not None:
+            geo_filter = GeoFilter.from_args(near, radius_km, bbox,
+                                             sort is not None)
+        elif radius_km is not None or sort is not None:
+            raise ValueError('radius_km and sort require near')
+
+        modes = sorted({mode.upper()
+                        for mode in _split(params.get('mode', ()))})
+        for mode in modes:
+            if mode not in MODES:
+                raise ValueError(f'Unknown mode: {mode} (known: '
+                                 f'{", ".join(MODES)})')
+
+        channel_min = _number(params, 'channel_min', int,
+                              DEFAULT_LIMITS.channel_min)
+        channel_max = _number(params, 'channel_max', int,
+                              DEFAULT_LIMITS.channel_max)
+        if not (DEFAULT_LIMITS.channel_min <= channel_min <= channel_max
+                <= DEFAULT_LIMITS.channel_max):
+            raise ValueError(f'channel_min and channel_max must be from '
+                             f'{DEFAULT_LIMITS.channel_min} to '
+                             f'{DEFAULT_LIMITS.channel_max}, in order')
+
+        comment_template = _last(params, 'comment') or 'legacy'
+        if comment_template not in BUILTIN_TEMPLATES:
+            raise ValueError(f'Unknown comment template: {comment_template} '
+                             f'(known: {", ".join(BUILTIN_TEMPLATES)})')
+        comment_length = _number(params, 'comment_length', int)
+        if comment_length is not None and not (
+                0 <= comment_length <= DEFAULT_LIMITS.comment_length_max):
+            raise ValueError(f'comment_length must be from 0 to '
+                             f'{DEFAULT_LIMITS.comment_length_max}')
+
+        return cls(frequency_filter, geo_filter, tuple(modes), channel_min,
+                   channel_max, comment_template, comment_length)
+
+    def converter(self) -> Converter:
+        """Return a Converter of this query's limits, filters and comment."""
+        limits = replace(DEFAULT_LIMITS, channel_min=self.channel_min,
+                         channel_max=self.channel_max)
+        return Converter(limits=limits, engine='vectorized',
+                         comment_template=load_template(
+                             self.comment_template, self.comment_length),
+                         frequency_filter=self.frequency_filter,
+                         geo_filter=self.geo_filter)
+
+
+def export_table(snapshot: ExtractSnapshot,
+                 query: ExportQuery) -> pd.DataFrame:
+    """Convert the repeaters a query selects to a CHIRP DataFrame.
+
+    Args:
+        snapshot: The loaded extract; not modified. Its indexes are
+            reused by every query.
+        query: The export request.
+
+    Returns:
+        The valid CHIRP rows, written with csv_blocks.
+    """
+    converter = query.converter()
+    df = snapshot.select(converter)
+    if query.modes:
+        df = df[np.isin(convert_mode(df), query.modes)]
+    capacity = query.channel_max - query.channel_min + 1
+    df = df.head(capacity).reset_index(drop=True)
+    return converter.process_frame(df)
+
+
+def split_blocks(body: bytes,
+                 block_size: int = STREAM_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield a cached file in blocks of block_size bytes."""
+    for start in range(0, len(body), block_size):
+        yield body[start:start + block_size]
+
+
+class ExportCache:
+    """LRU cache of exported CHIRP files of one extract generation.
+
+    Attributes:
+        max_entries: Most files kept.
+        hits: Number of exports served from the cache.
+        misses: Number of exports converted.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._generation: Optional[int] = None
+        self._entries: 'OrderedDict[ExportQuery, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, generation: int, query: ExportQuery) -> Optional[bytes]:
+        """Return the cached file of a query, or None."""
+        with self._lock:
+            if generation != self._generation or query not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(query)
+            self.hits += 1
+            return self._entries[query]
+
+    def put(self, generation: int, query: ExportQuery, body: bytes) -> None:
+        """Cache the file of a query, evicting the least recently used."""
+        with self._lock:
+            if self._generation is not None and generation < self._generation:
+                return
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            self._entries[query] = body
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached file."""
+        with self._lock:
+            self._entries.clear()
+
+
+class ConversionService:
+    """Serves exports of an in-memory extract through an ExportCache.
+
+    Attributes:
+        dataset: The extract.
+        cache: Cache of exported files.
+    """
+
+    def __init__(self, dataset: WatchedExtract,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.dataset = dataset
+        self.cache = ExportCache(cache_size)
+
+    def reload(self) -> bool:
+        """Read the extract again and empty the cache.
+
+        Returns:
+            True if the extract was read.
+        """
+        loaded = self.dataset.load(force=True)
+        if loaded:
+            self.cache.clear()
+        return loaded
+
+    def export(self, query: ExportQuery) -> Tuple[Iterator[bytes], bool]:
+        """Return the CHIRP file of a query, in blocks.
+
+        Unless a background thread watches the extract, a changed
+        extract starts loading in the background; this export and
+        those made until it is swapped in use the loaded one.
+
+        The repeaters are converted before this returns. A file that
+        is not cached is formatted with csv_blocks as the blocks are
+        consumed, and cached once the last block has been.
+
+        Returns:
+            The blocks of the CSV file and whether it came from the
+            cache.
+        """
+        if not self.dataset.watching:
+            self.dataset.refresh()
+        snapshot = self.dataset.current
+        body = self.cache.get(snapshot.generation, query)
+        if body is not None:
+            return split_blocks(body), True
+        chirp_table = export_table(snapshot, query)
+        blocks = csv_blocks(chirp_table, block_size=STREAM_BLOCK_SIZE)
+        return self._caching(snapshot.generation, query, blocks), False
+
+    def _caching(self, generation: int, query: ExportQuery,
+                 blocks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass blocks through, caching the file after the last one."""
+        parts = []
+        for block in blocks:
+            parts.append(block)
+            yield block
+        self.cache.put(generation, query, b''.join(parts))
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the loaded extract and the cache."""
+        snapshot = self.dataset.current
+        return {
+            'version': __version__,
+            'path': self.dataset.path,
+            'member': self.dataset.member,
+            'watching': self.dataset.watching,
+            'input_file': snapshot and snapshot.input_file,
+            'data_spec_version': snapshot and snapshot.version,
+            'records': len(snapshot.frame) if snapshot else 0,
+            'generation': self.dataset.generation,
+            'loaded_at': snapshot and snapshot.loaded_at,
+            'cache': {'entries': len(self.cache),
+                      'max_entries': self.cache.max_entries,
+                      'hits': self.cache.hits,
+                      'misses': self.cache.misses},
+        }
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    """HTTP requests of a ConversionService; see the module docstring."""
+
+    server_version = f'wwara_chirp/{__version__}'
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def service(self) -> ConversionService:
+        return self.server.service
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == '/export':
+            try:
+                query = ExportQuery.from_params(parse_qs(url.query))
+            except ValueError as error:
+                self.send_error(400, explain=str(error))
+                return
+            blocks, cached = self.service.export(query)
+            self._send_csv(blocks, cached)
+        elif url.path == '/status':
+            self._send_json(self.service.status())
+        else:
+            self.send_error(404)
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != '/reload':
+            self.send_error(404)
+            return
+        if not self.service.reload():
+            self.send_error(500, explain='The extract was rejected; see the '
+                                         'log file')
+            return
+        self._send_json(self.service.status())
+
+    def _send_json(self, document: Dict[str, Any]) -> None:
+        body = json.dumps(document, indent=2).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_csv(self, blocks: Iterable[bytes], cached: bool) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        self.send_header('Content-Disposition',
+                         'attachment; filename="wwara-chirp.csv"')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('X-Cache', 'hit' if cached else 'miss')
+        self.end_headers()
+        for block in blocks:
+            if block:
+                self.wfile.write(f'{len(block):X}\r\n'.encode('ascii')
+                                 + block + b'\r\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.info(f'{self.address_string()} {format % args}')
+
+
+def make_server(service: ConversionService, host: str = DEFAULT_HOST,
+                port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Create the HTTP server of a service; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), ExportHandler)
+    server.service = service
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for ``wwara_chirp serve``.
+
+    Args:
+        argv: Arguments after the 'serve' subcommand.
+
+    Returns:
+        0 after the server is interrupted, 1 if the extract is rejected.
+    """
+    from wwara_chirp.wwara_chirp import add_logging_arguments
+    from wwara_chirp.log_setup import configure_logging
+
+    parser = argparse.ArgumentParser(
+        prog='wwara_chirp serve',
+        description='Serve CHIRP files of a WWARA extract over HTTP')
+    parser.add_argument('path',
+                        help='WWARA CSV file or DataBaseExtract.zip archive, '
+                             'or a directory of them to serve the newest '
+                             'of; loaded again whenever it changes')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help=f'Address to listen on (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--member', choices=sorted(EXTRACT_MEMBERS),
+                        default='rptrlist',
+                        help='List to read from a ZIP archive '
+                             '(default: rptrlist)')
+    parser.add_argument('--reader', choices=READERS, default='typed',
+                        help='How the extract is read (default: typed)')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        metavar='FILES',
+                        help='Number of exported files kept in memory '
+                             f'(default: {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--watch-interval', type=float, default=None,
+                        metavar='SECONDS',
+                        help='Look for a new extract from a background '
+                             'thread every SECONDS seconds, instead of '
+                             'before each export')
+    add_logging_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.cache_size < 1:
+        parser.error('--cache-size must be at least 1')
+    if args.watch_interval is not None and args.watch_interval <= 0:
+        parser.error('--watch-interval must be positive')
+
+    logs = configure_logging(args.log_file, args.log_level, args.log_queue,
+                             args.log_repeats)
+    try:
+        dataset = WatchedExtract(args.path, args.member, args.reader)
+        service = ConversionService(dataset, args.cache_size)
+        if not service.reload():
+            print(f'No valid extract in {args.path}; see {args.log_file}')
+            return 1
+        if args.watch_interval is not None:
+            dataset.start(args.watch_interval)
+        server = make_server(service, args.host, args.port)
+        host, port = server.server_address[:2]
+        print(f'Serving {args.path} on http://{host}:{port}/', flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            dataset.stop()
+        return 0
+    finally:
+        logs.stop()
@@ -0,0 +1,279 @@
+# src/wwara_chirp/stdlib_backend.py
+
+"""
+Standard library conversion engine
+
+Converts a WWARA file to a CHIRP file with the csv module alone, without
+importing pandas or numpy. For the few hundred records of a regional
+extract, importing pandas takes longer than the conversion itself, so
+this engine is the fastest way to convert small files from scripts that
+run the command line many times.
+
+The output is the same as that of the pandas engines. To get there, the
+reader gives each column the type ``pd.read_csv`` would infer for it
+(integer, float, boolean or text, with NaN for missing values), and the
+writer formats values the way ``DataFrame.to_csv`` does (see the writers
+module).
+
+Example:
+    >>> result = convert_file('WWARA-rptrlist-20260201.csv', 'chirp.csv')
+    >>> result.rows_written
+    434
+"""
+
+import csv
+import logging
+import math
+import re
+from typing import (IO, Any, Dict, Iterable, List, Mapping, Optional,
+                    Sequence, Union)
+
+from wwara_chirp.bands import FrequencyFilter
+from wwara_chirp.chirpvalidator import ChirpLimits, DEFAULT_LIMITS
+from wwara_chirp.comment_template import CommentTemplate, LEGACY_TEMPLATE
+from wwara_chirp.core import (ConversionResult, check_files, convert_record,
+                              validator_for)
+from wwara_chirp.geo import GeoFilter
+from wwara_chirp.parse_cache import read_cached
+from wwara_chirp.profiling import NULL_PROFILER, Profiler
+from wwara_chirp.writers import (DEFAULT_BUFFER_SIZE, ChirpCsvWriter,
+                                 ChirpOutputs)
+from wwara_chirp.wwara_extract import EXTRACT_ENCODING, open_input
+
+# The filters that select records before conversion
+RecordFilter = Union[FrequencyFilter, GeoFilter]
+
+log = logging.getLogger(__name__)
+
+# Strings that pd.read_csv reads as NaN by default
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+])
+
+# Strings that pd.read_csv reads as booleans by default
+TRUE_VALUES = frozenset(['True', 'TRUE', 'true'])
+FALSE_VALUES = frozenset(['False', 'FALSE', 'false'])
+
+# Numbers as the pandas C parser accepts them, surrounding spaces included
+INT_PATTERN = re.compile(r'^\s*[+-]?\d+\s*$')
+FLOAT_PATTERN = re.compile(
+    r'^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$')
+
+
+def infer_column(values: List[str]) -> List[Any]:
+    """Convert the raw strings of one column as pd.read_csv would.
+
+    A column of integers without missing values holds ints, and one with
+    missing values holds floats. A column of numbers holds floats, a
+    column of booleans holds bools, and any other column keeps its
+    strings. Missing values become NaN in every case.
+
+    Args:
+        values: The column's fields, as read by the csv module.
+
+    Returns:
+        The converted values, in order.
+    """
+    present = [value for value in values if value not in NA_VALUES]
+    has_missing = len(present) < len(values)
+
+    if all(INT_PATTERN.match(value) for value in present):
+        convert = float if has_missing or not present else int
+    elif all(FLOAT_PATTERN.match(value) for value in present):
+        convert = float
+    elif all(value in TRUE_VALUES or value in FALSE_VALUES
+             for value in present):
+        convert = TRUE_VALUES.__contains__
+    else:
+        convert = str
+
+    return [math.nan if value in NA_VALUES else convert(value)
+            for value in values]
+
+
+def read_wwara_csv(source: IO[str]) -> List[Dict[str, Any]]:
+    """Read a WWARA CSV stream into records.
+
+    Like ``pd.read_csv(source, skiprows=[0])``, the first line (the
+    extract title) is skipped, the second holds the column names, and
+    blank lines are ignored.
+
+    Args:
+        source: A text stream opened with newline=''.
+
+    Returns:
+        One dict per record, keyed by column name.
+
+    Raises:
+        ValueError: If a record has more fields than there are columns.
+    """
+    reader = csv.reader(source)
+    next(reader, None)
+    columns = next(reader, [])
+    rows = []
+    for row in reader:
+        if not row:
+            continue
+        if len(row) > len(columns):
+            raise ValueError(f'Expected {len(columns)} fields in line '
+                             f'{reader.line_num}, saw {len(row)}')
+        rows.append(row + [''] * (len(columns) - len(row)))
+
+    values = [infer_column([row[position] for row in rows])
+              for position in range(len(columns))]
+    return [dict(zip(columns, record)) for record in zip(*values)]
+
+
+def read_input(input_file: str, member: str = 'rptrlist'
+               ) -> List[Dict[str, Any]]:
+    """Read the records of a WWARA CSV file or DataBaseExtract.zip.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        One dict per record, keyed by column name.
+    """
+    with open_input(input_file, member) as source:
+        if not isinstance(source, str):
+            return read_wwara_csv(source)
+        with open(source, 'r', encoding=EXTRACT_ENCODING, newline='') as f:
+            return read_wwara_csv(f)
+
+
+def read_records(input_file: str, member: str = 'rptrlist',
+                 parse_cache: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read the records of a WWARA input, through a parse cache if set.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+        parse_cache: Directory of the parse cache, '' for the input's
+            directory, or None to always parse the input.
+
+    Returns:
+        One dict per record, keyed by column name.
+    """
+    if parse_cache is None:
+        return read_input(input_file, member)
+    return read_cached(input_file, member, 'records', read_input,
+                       parse_cache)
+
+
+def select_records(records: List[Dict[str, Any]],
+                   *record_filters: Optional[RecordFilter]
+                   ) -> List[Dict[str, Any]]:
+    """Apply record filters to WWARA records, one after the other.
+
+    Args:
+        records: WWARA records keyed by column name.
+        *record_filters: FrequencyFilter and GeoFilter instances; None
+            entries are skipped.
+
+    Returns:
+        The records passing every filter, in the order of the last.
+    """
+    for record_filter in record_filters:
+        if record_filter is None:
+            continue
+        selected = record_filter.select_records(records)
+        log.info(f'Selected {len(selected)} of {len(records)} records in '
+                 f'{record_filter}')
+        records = selected
+    return records
+
+
+def write_chirp_csv(output_file: str, chirp_rows: Iterable[Mapping[str, Any]],
+                    columns: Optional[List[str]] = None,
+                    buffer_size: int = DEFAULT_BUFFER_SIZE) -> int:
+    """Write CHIRP rows to a CSV file in the format of DataFrame.to_csv.
+
+    The file is replaced atomically; see ChirpCsvWriter.
+
+    Args:
+        output_file: Path to the CHIRP CSV file.
+        chirp_rows: CHIRP rows keyed by column name.
+        columns: Columns to write; defaults to CHIRP_COLUMNS.
+        buffer_size: Size of the write buffer, in bytes.
+
+    Returns:
+        The number of rows written.
+    """
+    with ChirpCsvWriter(output_file, columns, buffer_size) as output:
+        output.write_rows(chirp_rows)
+    return output.rows_written
+
+
+def convert_file(input_file: str, output_file: str,
+                 limits: Optional[ChirpLimits] = None,
+                 member: str = 'rptrlist',
+                 comment_template: Optional[CommentTemplate] = None,
+                 frequency_filter: Optional[FrequencyFilter] = None,
+                 geo_filter: Optional[GeoFilter] = None,
+                 parse_cache: Optional[str] = None,
+                 profiler: Optional[Profiler] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 extra_outputs: Sequence[str] = ()) -> ConversionResult:
+    """Convert a WWARA file to a CHIRP file without pandas.
+
+    Each valid row is written as soon as it is converted, and the output
+    file only appears once it is complete (see ChirpCsvWriter).
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        output_file: Path to the CHIRP CSV file; must not exist.
+        limits: CHIRP limits for conversion and validation; defaults to
+            DEFAULT_LIMITS.
+        member: Which list to read from a ZIP archive.
+        comment_template: Template of the Comment field; defaults to
+            LEGACY_TEMPLATE.
+        frequency_filter: If set, only convert the records inside its
+            frequency ranges.
+        geo_filter: If set, only convert the records inside its area,
+            in its order.
+        parse_cache: If set, read the records through a parse cache in
+            this directory ('' for the input's directory).
+        profiler: If set, time the stages of the conversion.
+        buffer_size: Size of the write buffer, in bytes.
+        extra_outputs: Further files to write the rows to, in the format
+            of their extension (see ChirpOutputs).
+
+    Returns:
+        A ConversionResult; ok is False if a file check failed.
+    """
+    limits = limits or DEFAULT_LIMITS
+    profiler = profiler or NULL_PROFILER
+    validator = profiler.validator(validator_for(limits))
+    compiled_template = (comment_template or LEGACY_TEMPLATE).compile(
+        limits.comment_length_max)
+    if not check_files(input_file, output_file, member, validator):
+        return ConversionResult(False)
+
+    log.debug(f'Reading input file: {input_file}')
+    with profiler.stage('read'):
+        records = read_records(input_file, member, parse_cache)
+    log.debug(f'Number of memory channels read: {len(records)}')
+    rows_read = len(records)
+    with profiler.stage('select'):
+        records = select_records(records, frequency_filter, geo_filter)
+
+    convert = profiler.wrap('convert', convert_record)
+    validate_row = profiler.wrap('validate', validator.validate_row)
+    with ChirpOutputs(output_file, extra_outputs,
+                      buffer_size=buffer_size) as output:
+        append = profiler.wrap('accumulate', output.write_row)
+        for location, record in enumerate(records, start=limits.channel_min):
+            chirp_row = convert(record, location, compiled_template)
+            if validate_row(chirp_row):
+                append(chirp_row)
+            else:
+                log.error(f'Invalid row data: {location}')
+        with profiler.stage('write'):
+            output.commit()
+    rows_written = output.rows_written
+    log.info(f'Output file written: {output_file}')
+    log.info(f'Number of memory channels written: {rows_written}')
+    return ConversionResult(True, rows_read, rows_written)
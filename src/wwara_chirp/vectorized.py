@@ -0,0 +1,190 @@
+# src/wwara_chirp/vectorized.py
+
+"""
+Vectorized WWARA to CHIRP conversion.
+
+This module converts a whole WWARA DataFrame, as returned by
+``pd.read_csv``, into a CHIRP DataFrame using column operations instead
+of the per-row ``process_row`` loop. The rules are the same as in
+``process_row``, including its quirks, so that both engines produce
+identical CHIRP files.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from wwara_chirp.columns import CHIRP_COLUMNS, CHIRP_DEFAULTS
+from wwara_chirp.comment_template import CompiledTemplate, LEGACY_TEMPLATE
+
+# Maximum length of the CHIRP comment field
+COMMENT_MAX_LENGTH = 255
+
+# Mode priority chain, first match wins. Matches process_row.
+MODE_RULES: List[Tuple[Tuple[str, ...], str]] = [
+    (('FM_WIDE',), 'FM'),
+    (('FM_NARROW',), 'NFM'),
+    (('DSTAR_DV',), 'DV'),
+    (('DSTAR_DD',), 'DIG'),
+    (('DMR',), 'DMR'),
+    (('P25_PHASE_1', 'P25_PHASE_2'), 'P25'),
+    (('ATV',), 'DIG'),
+]
+
+
+def _is_set(column: pd.Series) -> np.ndarray:
+    """Return a mask of the rows where a WWARA field is not ''.
+
+    NaN compares unequal to '' just as it does in process_row, so
+    missing values count as set.
+    """
+    return (column != '').to_numpy()
+
+
+def _is_yes(column: pd.Series) -> np.ndarray:
+    """Return a mask of the rows where a WWARA Y/N flag is 'Y'."""
+    return (column == 'Y').to_numpy()
+
+
+def _fixed(values: np.ndarray) -> np.ndarray:
+    """Format floats with six decimals, like f'{value:.6f}'."""
+    return np.char.mod('%.6f', values.astype(float)).astype(object)
+
+
+def convert_duplex(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute the Duplex and Offset columns.
+
+    Args:
+        df: WWARA DataFrame.
+
+    Returns:
+        A tuple of (duplex, offset) object arrays.
+    """
+    frequency_out = df['OUTPUT_FREQ'].to_numpy(dtype=float)
+    frequency_in = df['INPUT_FREQ'].to_numpy(dtype=float)
+    positive = frequency_out > frequency_in
+    duplex = np.where(positive, '+', '-').astype(object)
+    offset = np.where(positive, frequency_out - frequency_in,
+                      frequency_in - frequency_out)
+    return duplex, _fixed(offset)
+
+
+def convert_tones(df: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+    """Compute the Tone, rToneFreq, cToneFreq and DtcsCode columns.
+
+    Args:
+        df: WWARA DataFrame.
+
+    Returns:
+        A tuple of (tone, r_tone_freq, c_tone_freq, dtcs_code) object
+        arrays.
+    """
+    rows = len(df)
+    ctcss_in = df['CTCSS_IN'].to_numpy(dtype=object)
+    ctcss_out = df['CTCSS_OUT'].to_numpy(dtype=object)
+    dcs = df['DCS_CDCSS'].to_numpy(dtype=object)
+
+    tone = np.full(rows, '', dtype=object)
+    r_tone_freq = np.full(rows, '88.5', dtype=object)
+    c_tone_freq = np.full(rows, '88.5', dtype=object)
+    dtcs_code = np.full(rows, 23, dtype=object)
+
+    has_ctcss_in = _is_set(df['CTCSS_IN'])
+    tone[has_ctcss_in] = 'Tone'
+    r_tone_freq[has_ctcss_in] = ctcss_in[has_ctcss_in]
+
+    uses_tone = r_tone_freq != ''
+    tone[uses_tone] = 'Tone'
+    has_ctcss_out = uses_tone & _is_set(df['CTCSS_OUT'])
+    c_tone_freq[has_ctcss_out] = ctcss_out[has_ctcss_out]
+    uses_dtcs = ~uses_tone & _is_set(df['DCS_CDCSS'])
+    tone[uses_dtcs] = 'DTCS'
+    dtcs_code[uses_dtcs] = dcs[uses_dtcs]
+
+    r_tone_freq[pd.isna(r_tone_freq)] = '88.5'
+    c_tone_freq[pd.isna(c_tone_freq)] = '88.5'
+    return tone, r_tone_freq, c_tone_freq, dtcs_code
+
+
+def convert_mode(df: pd.DataFrame) -> np.ndarray:
+    """Compute the Mode column from the WWARA mode flags.
+
+    Args:
+        df: WWARA DataFrame.
+
+    Returns:
+        An object array of CHIRP modes, '' where no flag is set.
+    """
+    conditions = []
+    choices = []
+    for fields, mode in MODE_RULES:
+        condition = np.zeros(len(df), dtype=bool)
+        for field in fields:
+            condition |= _is_yes(df[field])
+        conditions.append(condition)
+        choices.append(mode)
+    return np.select(conditions, choices, default='').astype(object)
+
+
+def convert_comment(df: pd.DataFrame,
+                    comment_length_max: int = COMMENT_MAX_LENGTH,
+                    comment_template: Optional[CompiledTemplate] = None
+                    ) -> pd.Series:
+    """Build the CHIRP comment for every row.
+
+    Args:
+        df: WWARA DataFrame.
+        comment_length_max: Longest comment allowed, for the default
+            template.
+        comment_template: Builds the comments; defaults to the legacy
+            template compiled for comment_length_max.
+
+    Returns:
+        A Series of comment strings.
+    """
+    if comment_template is None:
+        comment_template = LEGACY_TEMPLATE.compile(comment_length_max)
+    return comment_template.format_frame(df)
+
+
+def convert_frame(df: pd.DataFrame, start_channel: int = 0,
+                  comment_length_max: int = COMMENT_MAX_LENGTH,
+                  comment_template: Optional[CompiledTemplate] = None
+                  ) -> pd.DataFrame:
+    """Convert a WWARA DataFrame to a CHIRP DataFrame.
+
+    Locations are numbered consecutively from ``start_channel`` in input
+    order, exactly as repeated ``process_row`` calls would number them.
+    No validation is done here.
+
+    Args:
+        df: WWARA DataFrame, as read by ``pd.read_csv``.
+        start_channel: Location of the first row.
+        comment_length_max: Longest comment allowed.
+        comment_template: Builds the Comment column; defaults to the
+            legacy template compiled for comment_length_max.
+
+    Returns:
+        A DataFrame with CHIRP_COLUMNS, one row per input row.
+    """
+    rows = len(df)
+    duplex, offset = convert_duplex(df)
+    tone, r_tone_freq, c_tone_freq, dtcs_code = convert_tones(df)
+
+    chirp_table = pd.DataFrame({
+        **CHIRP_DEFAULTS,
+        'Location': np.arange(start_channel, start_channel + rows),
+        'Name': df['CALL'].to_numpy(dtype=object),
+        'Frequency': _fixed(df['OUTPUT_FREQ'].to_numpy()),
+        'Duplex': duplex,
+        'Offset': offset,
+        'Tone': tone,
+        'rToneFreq': r_tone_freq,
+        'cToneFreq': c_tone_freq,
+        'DtcsCode': dtcs_code,
+        'Mode': convert_mode(df),
+        'Comment': convert_comment(df, comment_length_max,
+                                   comment_template).to_numpy(),
+    }, columns=CHIRP_COLUMNS)
+    return chirp_table
@@ -0,0 +1,460 @@
+# src/wwara_chirp/watch.py
+
+"""
+Watched extracts
+
+A WatchedExtract holds the latest WWARA extract of a file or of a
+directory in memory, and loads a new one when it appears: a newer
+WWARA-rptrlist-DATE.csv (or other EXTRACT_MEMBERS list) or
+DataBaseExtract.zip in the directory, or a change to the file.
+
+A new extract is read and validated off to the side, while readers keep
+using the table loaded before. Only once it is complete is it swapped
+in, by replacing the ``current`` ExtractSnapshot, a frozen object, with
+one assignment: readers never wait for a load and never see a half
+loaded table. An extract that fails validation is logged and skipped,
+and the previous one stays in use. Files modified less than
+``settle_seconds`` ago are left for a later poll, since they may still
+be being written, and a file that changes while it is read is read
+again at the next poll.
+
+The directory is polled with os.scandir every ``interval`` seconds,
+either from a background thread (``start``), as the conversion service
+does, or in the foreground (``run``), as ``wwara_chirp watch`` does: it
+writes the CHIRP file of every new extract, the same file process_file
+writes, replacing the previous one atomically. A reader that does not
+want a polling thread can call ``refresh``, which starts a load in a
+thread of its own and returns at once. If ``on_swap`` fails for a
+snapshot, it is called again for that snapshot at the next poll.
+
+Usage:
+    wwara_chirp watch /srv/wwara/incoming chirp.csv --interval 60
+"""
+
+import argparse
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, List, Optional, Pattern, Tuple
+
+import pandas as pd
+
+from wwara_chirp.bands import FrequencyIndex
+from wwara_chirp.chirpvalidator import ChirpValidator
+from wwara_chirp.converter import Converter, write_output_file
+from wwara_chirp.core import READERS
+from wwara_chirp.geo import GeoIndex
+from wwara_chirp.schema import input_schema, validate_schema
+from wwara_chirp.wwara_extract import EXTRACT_MEMBERS, validate_extract
+
+log = logging.getLogger(__name__)
+
+# Seconds between two polls of a watched directory
+DEFAULT_INTERVAL = 60.0
+
+# Files modified more recently than this, in seconds, may still be being
+# written and are not loaded yet
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# File names of extract archives in a watched directory
+ARCHIVE_PATTERN = re.compile(r'^DataBaseExtract.*\.zip$', re.IGNORECASE)
+
+FileStamp = Tuple[int, int]
+
+
+def file_stamp(path: str) -> FileStamp:
+    """Return the modification time, in ns, and the size of a file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def find_extracts(directory: str, member: str = 'rptrlist'
+                  ) -> List[str]:
+    """List the extracts in a directory, oldest first.
+
+    Args:
+        directory: Directory to look in.
+        member: Which list's CSV files count as extracts; archives
+            always do.
+
+    Returns:
+        Paths of the member's CSV files and DataBaseExtract*.zip
+        archives, ordered by modification time, then name.
+    """
+    patterns: Tuple[Pattern, ...] = (EXTRACT_MEMBERS[member],
+                                     ARCHIVE_PATTERN)
+    extracts = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if any(pattern.match(entry.name) for pattern in patterns):
+                extracts.append((entry.stat().st_mtime_ns, entry.name,
+                                 entry.path))
+    return [path for mtime, name, path in sorted(extracts)]
+
+
+@dataclass(frozen=True)
+class ExtractSnapshot:
+    """One loaded extract; replaced whole, never modified.
+
+    The indexes of the extract are built once, when first used, and
+    serve every later query of the snapshot.
+
+    Attributes:
+        input_file: Path of the extract.
+        stamp: file_stamp of the extract when it was read.
+        frame: The WWARA DataFrame; treat it as read-only.
+        version: DATA_SPEC_VERSION of the extract.
+        generation: Number of extracts loaded up to this one.
+        loaded_at: When the extract was loaded, as a Unix time.
+    """
+    input_file: str
+    stamp: FileStamp
+    frame: pd.DataFrame
+    version: str
+    generation: int
+    loaded_at: float
+
+    @cached_property
+    def frequency_index(self) -> FrequencyIndex:
+        """FrequencyIndex of frame, built by the first query that needs it."""
+        return FrequencyIndex.from_frame(self.frame)
+
+    @cached_property
+    def geo_index(self) -> GeoIndex:
+        """GeoIndex of frame, built by the first query that needs it."""
+        return GeoIndex.from_frame(self.frame)
+
+    def select(self, converter: Converter) -> pd.DataFrame:
+        """Select the rows of a Converter's filters through the indexes.
+
+        Returns:
+            The selected rows, as Converter.select_frame returns them.
+        """
+        frequency_index = geo_index = None
+        if converter.frequency_filter is not None:
+            frequency_index = self.frequency_index
+        if converter.geo_filter is not None:
+            geo_index = self.geo_index
+        return converter.select_frame(self.frame, frequency_index,
+                                      geo_index)
+
+
+def load_snapshot(input_file: str, member: str = 'rptrlist',
+                  reader: str = 'typed', generation: int = 1
+                  ) -> Optional[ExtractSnapshot]:
+    """Validate and read an extract.
+
+    Args:
+        input_file: Path to the WWARA CSV file or DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+        reader: How the extract is read, one of READERS.
+        generation: Generation of the snapshot.
+
+    Returns:
+        The snapshot, or None if the extract is invalid or changed
+        while it was read.
+    """
+    if not (ChirpValidator.validate_input_file(input_file)
+            and validate_extract(input_file, member)
+            and validate_schema(input_file, member)):
+        return None
+    start = time.perf_counter()
+    stamp = file_stamp(input_file)
+    version = input_schema(input_file, member).version
+    frame = Converter(reader=reader).read_frame(input_file, member)
+    if file_stamp(input_file) != stamp:
+        log.warning(f'Extract changed while it was read: {input_file}')
+        return None
+    log.info(f'Loaded {len(frame)} records of {input_file} in '
+             f'{time.perf_counter() - start:.2f}s')
+    return ExtractSnapshot(input_file, stamp, frame, version, generation,
+                           time.time())
+
+
+class WatchedExtract:
+    """The latest extract of a file or directory, held in memory.
+
+    Attributes:
+        path: The extract file, or the directory of extracts.
+        member: Which list to read.
+        reader: How extracts are read, one of READERS.
+        settle_seconds: Age a file must reach before it is loaded.
+        current: The loaded ExtractSnapshot, or None before the first
+            load. Read it once and use that snapshot throughout.
+        on_swap: Called with each new snapshot after it is swapped in,
+            and again at each poll until it has returned without an
+            exception.
+    """
+
+    def __init__(self, path: str, member: str = 'rptrlist',
+                 reader: str = 'typed',
+                 settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+                 on_swap: Optional[Callable[[ExtractSnapshot],
+                                            None]] = None):
+        self.path = path
+        self.member = member
+        self.reader = reader
+        self.settle_seconds = settle_seconds
+        self.on_swap = on_swap
+        self.current: Optional[ExtractSnapshot] = None
+        self._handled: Optional[ExtractSnapshot] = None
+        self._rejected: Optional[Tuple[str, FileStamp]] = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def generation(self) -> int:
+        current = self.current
+        return 0 if current is None else current.generation
+
+    @property
+    def frame(self) -> Optional[pd.DataFrame]:
+        current = self.current
+        return None if current is None else current.frame
+
+    @property
+    def watching(self) -> bool:
+        """True while a background thread polls for new extracts."""
+        return self._thread is not None
+
+    def latest(self) -> Optional[str]:
+        """Return the newest extract file, or None if there is none."""
+        if not os.path.isdir(self.path):
+            return self.path if os.path.isfile(self.path) else None
+        extracts = find_extracts(self.path, self.member)
+        return extracts[-1] if extracts else None
+
+    def _candidate(self) -> Optional[Tuple[str, FileStamp]]:
+        """Return the newest extract and its stamp if it is not loaded."""
+        input_file = self.latest()
+        if input_file is None:
+            return None
+        try:
+            stamp = file_stamp(input_file)
+        except OSError:
+            return None
+        current = self.current
+        if current is not None and (current.input_file,
+                                    current.stamp) == (input_file, stamp):
+            return None
+        if self._rejected == (input_file, stamp):
+            return None
+        return input_file, stamp
+
+    def changed(self) -> bool:
+        """Return True if a newer extract than the loaded one exists."""
+        return self._candidate() is not None
+
+    def load(self, force: bool = False, blocking: bool = True) -> bool:
+        """Load the newest extract and swap it in.
+
+        Args:
+            force: Read the extract even if it is the one loaded, or
+                was just modified.
+            blocking: Wait for a load in progress to finish; if False,
+                return at once instead.
+
+        Returns:
+            True if a new snapshot was swapped in.
+        """
+        if not self._load_lock.acquire(blocking=blocking):
+            log.debug(f'An extract of {self.path} is already being loaded')
+            return False
+        try:
+            swapped = self._swap_newest(force)
+            self._handle_swap()
+            return swapped
+        finally:
+            self._load_lock.release()
+
+    def _swap_newest(self, force: bool) -> bool:
+        """Read the newest extract and make it current; see load."""
+        candidate = self._candidate()
+        if candidate is None:
+            if not force:
+                return False
+            input_file = self.latest()
+            if input_file is None:
+                log.error(f'No WWARA extract in {self.path}')
+                return False
+        else:
+            input_file, stamp = candidate
+            if (not force and time.time() - stamp[0] / 1e9
+                    < self.settle_seconds):
+                log.debug(f'Waiting for {input_file} to settle')
+                return False
+        snapshot = load_snapshot(input_file, self.member, self.reader,
+                                 self.generation + 1)
+        if snapshot is None:
+            if candidate is not None:
+                self._rejected = candidate
+            return False
+        self.current = snapshot
+        log.info(f'Extract {snapshot.generation} in use: {input_file}')
+        return True
+
+    def _handle_swap(self) -> None:
+        """Call on_swap with the current snapshot, unless it succeeded."""
+        snapshot = self.current
+        if (self.on_swap is None or snapshot is None
+                or snapshot is self._handled):
+            return
+        try:
+            self.on_swap(snapshot)
+        except Exception:
+            log.exception(f'Handling extract {snapshot.generation} failed; '
+                          f'retrying at the next poll')
+            return
+        self._handled = snapshot
+
+    def _poll(self) -> None:
+        """Load the newest extract, logging instead of raising."""
+        try:
+            self.load(blocking=False)
+        except Exception:
+            log.exception(f'Loading an extract of {self.path} failed')
+
+    def refresh(self) -> bool:
+        """Start loading a newer extract, if there is one, and return.
+
+        The extract is loaded by a thread of its own; current keeps the
+        loaded snapshot until then. Nothing is started while a load is
+        in progress.
+
+        Returns:
+            True if a load was started.
+        """
+        if self._load_lock.locked() or not self.changed():
+            return False
+        threading.Thread(target=self._poll, name='wwara-extract-loader',
+                         daemon=True).start()
+        return True
+
+    def run(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """Poll for new extracts until stop() is called."""
+        while not self._stop.is_set():
+            self._poll()
+            self._stop.wait(interval)
+
+    def start(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """Poll for new extracts from a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(interval,),
+                                        name='wwara-extract-watcher',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling, waiting for a load in progress to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class OutputWriter:
+    """Writes the CHIRP file of each snapshot, as process_file would.
+
+    Attributes:
+        output_file: Path to the CHIRP CSV file, replaced atomically.
+        converter: Converter with the conversion settings.
+        written: Number of files written.
+    """
+
+    def __init__(self, output_file: str, converter: Converter):
+        self.output_file = output_file
+        self.converter = converter
+        self.written = 0
+
+    def __call__(self, snapshot: ExtractSnapshot) -> None:
+        converter = self.converter
+        converter.reset()
+        df = snapshot.select(converter)
+        chirp_table = converter.process_frame(df)
+        write_output_file(self.output_file, chirp_table,
+                          converter.buffer_size)
+        self.written += 1
+        log.info(f'Output file replaced: {self.output_file} '
+                 f'({len(chirp_table)} memories from '
+                 f'{snapshot.input_file})')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for ``wwara_chirp watch``.
+
+    Args:
+        argv: Arguments after the 'watch' subcommand.
+
+    Returns:
+        0 after the watch is interrupted, or with --once if an extract
+        was converted; 1 otherwise.
+    """
+    from wwara_chirp.log_setup import configure_logging
+    from wwara_chirp.wwara_chirp import (add_comment_arguments,
+                                         add_filter_arguments,
+                                         add_logging_arguments,
+                                         comment_template_from_args,
+                                         frequency_filter_from_args,
+                                         geo_filter_from_args)
+
+    parser = argparse.ArgumentParser(
+        prog='wwara_chirp watch',
+        description='Convert each new WWARA extract in a directory')
+    parser.add_argument('path',
+                        help='Directory receiving WWARA-rptrlist-DATE.csv '
+                             'or DataBaseExtract.zip files, or one extract '
+                             'file')
+    parser.add_argument('output_file',
+                        help='CHIRP CSV file, replaced for each new extract')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        metavar='SECONDS',
+                        help='Seconds between two polls (default: '
+                             f'{DEFAULT_INTERVAL:g})')
+    parser.add_argument('--once', action='store_true',
+                        help='Convert the newest extract and exit')
+    parser.add_argument('--engine', choices=('row', 'vectorized'),
+                        default='vectorized',
+                        help='Conversion engine (default: vectorized)')
+    parser.add_argument('--member', choices=sorted(EXTRACT_MEMBERS),
+                        default='rptrlist',
+                        help='List to read (default: rptrlist)')
+    parser.add_argument('--reader', choices=READERS, default='typed',
+                        help='How extracts are read (default: typed)')
+    add_comment_arguments(parser)
+    add_filter_arguments(parser)
+    add_logging_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error('--interval must be positive')
+
+    converter = Converter(engine=args.engine,
+                          comment_template=comment_template_from_args(
+                              parser, args),
+                          frequency_filter=frequency_filter_from_args(
+                              parser, args),
+                          geo_filter=geo_filter_from_args(parser, args))
+    writer = OutputWriter(args.output_file, converter)
+    logs = configure_logging(args.log_file, args.log_level, args.log_queue,
+                             args.log_repeats)
+    try:
+        extract = WatchedExtract(args.path, args.member, args.reader,
+                                 on_swap=writer)
+        if args.once:
+            extract.load(force=True)
+            return 0 if writer.written else 1
+        print(f'Watching {args.path}, writing {args.output_file}',
+              flush=True)
+        try:
+            extract.run(args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    finally:
+        logs.stop()
@@ -0,0 +1,470 @@
+# src/wwara_chirp/writers.py
+
+"""
+CHIRP file writer
+
+ChirpCsvWriter writes a CHIRP CSV file row by row, or DataFrame by
+DataFrame, as the rows are converted, so that no output table has to be
+built just to be written. Rows go through a write buffer of a chosen
+size into a temporary file next to the output file, which is renamed
+over the output file once every row is written. A conversion that fails
+or is killed half way leaves no half-written CHIRP file behind for CHIRP
+to import, and an existing file is only replaced by a complete one.
+
+The file is written in the format of ``DataFrame.to_csv(index=False)``:
+minimal quoting, os.linesep line endings and missing values as ''. The
+values themselves are written as str() writes them, which is how
+to_csv writes the values of the CHIRP columns, including the
+frequencies and offsets already formatted as f'{value:.6f}'.
+
+ChirpOutputs writes the same rows to further files as well, for
+programs that would rather not parse the CHIRP file: newline-delimited
+JSON, and Parquet or Arrow IPC when pyarrow is installed. The format
+of each file follows its extension (OUTPUT_FORMATS). The rows are
+converted once and collected a column at a time while the CHIRP file is
+streamed, then each further file is serialized from those columns. In
+these typed formats the memory locations and DTCS codes
+(INTEGER_COLUMNS) are integers, the other columns hold the text of the
+CHIRP file, and missing values are null. Every file of a conversion is
+written to its temporary file before any of them is renamed into place,
+so either all of them are replaced or none is.
+
+csv_blocks formats a CHIRP DataFrame the same way into blocks of bytes,
+for the conversion service to send as they are produced.
+
+Example:
+    >>> with ChirpCsvWriter('chirp.csv') as output:
+    ...     for chirp_row in chirp_rows:
+    ...         output.write_row(chirp_row)
+    >>> output.rows_written
+    434
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import logging
+import os
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, Iterator, List,
+                    Mapping, Optional, Sequence)
+
+from wwara_chirp.columns import CHIRP_COLUMNS
+from wwara_chirp.core import is_missing
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Size of the write buffer, in bytes
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+# Output formats by file extension
+OUTPUT_FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+}
+
+# Formats written with pyarrow, an optional dependency
+ARROW_FORMATS = ('parquet', 'arrow')
+
+# Columns the typed formats write as integers
+INTEGER_COLUMNS = frozenset(['Location', 'DtcsCode', 'RxDtcsCode'])
+
+
+def csv_value(value: Any) -> Any:
+    """Write missing values as '', as DataFrame.to_csv does."""
+    return '' if is_missing(value) else value
+
+
+def output_format(output_file: str) -> str:
+    """Return the format of an output file, from its extension.
+
+    Raises:
+        ValueError: If the extension is not one of OUTPUT_FORMATS, or
+            the format needs pyarrow and it is not installed.
+    """
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f'Unknown output format: {output_file} (use '
+                         f'{", ".join(OUTPUT_FORMATS)})')
+    file_format = OUTPUT_FORMATS[extension]
+    if (file_format in ARROW_FORMATS
+            and importlib.util.find_spec('pyarrow') is None):
+        raise ValueError(f'Writing {extension} files needs pyarrow: '
+                         f'pip install pyarrow')
+    return file_format
+
+
+def _frame_values(series: 'pd.Series', missing: Any) -> List[Any]:
+    """Return the values of a column, with missing values replaced."""
+    values = series.to_numpy(dtype=object).tolist()
+    if series.hasnans:
+        values = [missing if is_na else value for value, is_na
+                  in zip(values, series.isna().tolist())]
+    return values
+
+
+def _csv_writer(stream):
+    """Return a csv.writer writing rows as DataFrame.to_csv does."""
+    return csv.writer(stream, lineterminator=os.linesep)
+
+
+def _frame_rows(chirp_frame: 'pd.DataFrame',
+                columns: Sequence[str]) -> Iterator[tuple]:
+    """Yield the CSV rows of a CHIRP DataFrame, taken a column at a time."""
+    return zip(*(_frame_values(chirp_frame[column], '')
+                 for column in columns))
+
+
+def csv_blocks(chirp_frame: 'pd.DataFrame',
+               columns: Optional[Iterable[str]] = None,
+               block_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[bytes]:
+    """Yield the CHIRP CSV file of a DataFrame in blocks of UTF-8 bytes.
+
+    The blocks join into the bytes ChirpCsvWriter writes for the same
+    rows. Each block but the last holds at least block_size characters.
+
+    Args:
+        chirp_frame: A CHIRP DataFrame.
+        columns: Columns to write, in order; defaults to those of
+            chirp_frame.
+        block_size: Size of a block, in characters.
+    """
+    columns = list(chirp_frame.columns if columns is None else columns)
+    buffer = io.StringIO(newline='')
+    writer = _csv_writer(buffer)
+    writer.writerow(columns)
+    for row in _frame_rows(chirp_frame, columns):
+        writer.writerow(row)
+        if buffer.tell() >= block_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _typed_value(column: str, value: Any) -> Any:
+    """Return a value as the typed formats write it."""
+    if value is None or is_missing(value):
+        return None
+    if column in INTEGER_COLUMNS:
+        return int(float(value))
+    return str(value)
+
+
+def typed_columns(columns: Mapping[str, List[Any]]
+                  ) -> Dict[str, List[Any]]:
+    """Convert collected columns to the values of the typed formats."""
+    return {column: [_typed_value(column, value) for value in values]
+            for column, values in columns.items()}
+
+
+def temp_path(output_file: str) -> str:
+    """Return the temporary file an output file is written to."""
+    return f'{output_file}.{os.getpid()}.tmp'
+
+
+def write_csv(path: str, columns: Mapping[str, List[Any]],
+              buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+    """Write collected columns as a CHIRP CSV file, as ChirpCsvWriter."""
+    with open(path, 'w', encoding='utf-8', newline='',
+              buffering=buffer_size) as f:
+        writer = _csv_writer(f)
+        writer.writerow(list(columns))
+        writer.writerows([csv_value(value) for value in row]
+                         for row in zip(*columns.values()))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_ndjson(path: str, columns: Mapping[str, List[Any]],
+                 buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+    """Write typed columns as newline-delimited JSON, a row per line."""
+    names = list(columns)
+    with open(path, 'w', encoding='utf-8', newline='\n',
+              buffering=buffer_size) as f:
+        for row in zip(*columns.values()):
+            f.write(json.dumps(dict(zip(names, row)), ensure_ascii=False))
+            f.write('\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_arrow(path: str, columns: Mapping[str, List[Any]],
+                file_format: str) -> None:
+    """Write typed columns as a Parquet or Arrow IPC file with pyarrow."""
+    import pyarrow as pa
+
+    table = pa.table({
+        column: pa.array(values, pa.int64() if column in INTEGER_COLUMNS
+                         else pa.string())
+        for column, values in columns.items()})
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path)
+
+
+def write_temp(output_file: str, columns: Mapping[str, List[Any]],
+               buffer_size: int = DEFAULT_BUFFER_SIZE) -> str:
+    """Write collected columns to the temporary file of output_file.
+
+    The caller renames the file over output_file. If writing fails, the
+    temporary file is removed.
+
+    Args:
+        output_file: Path to the file; its extension selects the format.
+        columns: Values by column, in order, None for missing values.
+        buffer_size: Size of the write buffer, in bytes.
+
+    Returns:
+        The path of the temporary file.
+    """
+    file_format = output_format(output_file)
+    temp_file = temp_path(output_file)
+    try:
+        if file_format == 'csv':
+            write_csv(temp_file, columns, buffer_size)
+        elif file_format == 'ndjson':
+            write_ndjson(temp_file, typed_columns(columns), buffer_size)
+        else:
+            write_arrow(temp_file, typed_columns(columns), file_format)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    return temp_file
+
+
+def write_columns(output_file: str, columns: Mapping[str, List[Any]],
+                  buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+    """Write collected columns in the format of output_file, atomically.
+
+    Args:
+        output_file: Path to the file; its extension selects the format.
+        columns: Values by column, in order, None for missing values.
+        buffer_size: Size of the write buffer, in bytes.
+    """
+    os.replace(write_temp(output_file, columns, buffer_size), output_file)
+    log.info(f'Output file written: {output_file}')
+
+
+class ChirpCsvWriter:
+    """Writes a CHIRP CSV file atomically, as its rows are produced.
+
+    The header is written when the writer is opened. commit() renames
+    the finished file over output_file; abort() removes it. finish()
+    completes the file without renaming it, for a caller that commits
+    several files together. Used as a
+    context manager, the writer is opened on entry and committed on
+    exit, or aborted if the block raised.
+
+    Attributes:
+        output_file: Path to the CHIRP CSV file.
+        columns: Columns to write, in order.
+        buffer_size: Size of the write buffer, in bytes.
+        temp_file: File the rows are written to until commit().
+        rows_written: Number of rows written so far.
+    """
+
+    def __init__(self, output_file: str,
+                 columns: Optional[Iterable[str]] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        if buffer_size < 1:
+            raise ValueError(f'Invalid write buffer size: {buffer_size}')
+        self.output_file = output_file
+        self.columns = list(CHIRP_COLUMNS if columns is None else columns)
+        self.buffer_size = buffer_size
+        self.temp_file = temp_path(output_file)
+        self.rows_written = 0
+        self._file = None
+        self._finished = False
+        self._writer = None
+
+    def open(self) -> 'ChirpCsvWriter':
+        """Create the temporary file and write the header."""
+        self._file = open(self.temp_file, 'w', encoding='utf-8',
+                          newline='', buffering=self.buffer_size)
+        self._writer = _csv_writer(self._file)
+        self._writer.writerow(self.columns)
+        return self
+
+    def write_row(self, chirp_row: Mapping[str, Any]) -> None:
+        """Write one CHIRP row.
+
+        Args:
+            chirp_row: A dict or pd.Series keyed by column name. Missing
+                columns are written as ''.
+        """
+        self._writer.writerow([csv_value(chirp_row.get(column, ''))
+                               for column in self.columns])
+        self.rows_written += 1
+
+    def write_rows(self, chirp_rows: Iterable[Mapping[str, Any]]) -> None:
+        """Write several CHIRP rows, as write_row would."""
+        for chirp_row in chirp_rows:
+            self.write_row(chirp_row)
+
+    def write_frame(self, chirp_frame: 'pd.DataFrame') -> None:
+        """Write every row of a CHIRP DataFrame.
+
+        The values are taken a column at a time, without DataFrame.to_csv
+        or a row per Series.
+
+        Args:
+            chirp_frame: A DataFrame with (at least) this writer's
+                columns.
+        """
+        self._writer.writerows(_frame_rows(chirp_frame, self.columns))
+        self.rows_written += len(chirp_frame)
+
+    def finish(self) -> None:
+        """Flush the rows to disk and close the temporary file."""
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except BaseException:
+            self.abort()
+            raise
+        self._file.close()
+        self._file = None
+        self._finished = True
+
+    def commit(self) -> None:
+        """Finish the file and rename it to output_file."""
+        self.finish()
+        if self._finished:
+            self._finished = False
+            os.replace(self.temp_file, self.output_file)
+
+    def abort(self) -> None:
+        """Close and remove the temporary file, keeping output_file."""
+        if self._file is None and not self._finished:
+            return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._finished = False
+        if os.path.exists(self.temp_file):
+            os.remove(self.temp_file)
+        log.warning(f'Output file not written: {self.output_file}')
+
+    def __enter__(self) -> 'ChirpCsvWriter':
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class ChirpOutputs:
+    """Writes a CHIRP file and the same rows to further files.
+
+    Has the interface of ChirpCsvWriter. The CHIRP file is streamed as
+    rows arrive; for the extra outputs the rows are also collected, a
+    column at a time, and each extra file is written from them on
+    commit(). The files are only renamed into place once all of them
+    are written, so either every file is replaced or none is.
+
+    Attributes:
+        output_file: Path to the CHIRP CSV file.
+        extra_outputs: Paths of the further files, in OUTPUT_FORMATS.
+        columns: Columns to write, in order.
+        rows_written: Number of rows written so far.
+    """
+
+    def __init__(self, output_file: str, extra_outputs: Sequence[str] = (),
+                 columns: Optional[Iterable[str]] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        for extra_output in extra_outputs:
+            output_format(extra_output)
+        self.csv = ChirpCsvWriter(output_file, columns, buffer_size)
+        self.output_file = output_file
+        self.extra_outputs = tuple(extra_outputs)
+        self.columns = self.csv.columns
+        self._collected = None
+
+    @property
+    def rows_written(self) -> int:
+        return self.csv.rows_written
+
+    def open(self) -> 'ChirpOutputs':
+        """Open the CHIRP file; see ChirpCsvWriter.open."""
+        self.csv.open()
+        self._collected = ({column: [] for column in self.columns}
+                           if self.extra_outputs else None)
+        return self
+
+    def write_row(self, chirp_row: Mapping[str, Any]) -> None:
+        """Write one CHIRP row; see ChirpCsvWriter.write_row."""
+        self.csv.write_row(chirp_row)
+        if self._collected is not None:
+            for column, values in self._collected.items():
+                value = chirp_row.get(column, '')
+                values.append(None if is_missing(value) else value)
+
+    def write_rows(self, chirp_rows: Iterable[Mapping[str, Any]]) -> None:
+        """Write several CHIRP rows, as write_row would."""
+        for chirp_row in chirp_rows:
+            self.write_row(chirp_row)
+
+    def write_frame(self, chirp_frame: 'pd.DataFrame') -> None:
+        """Write a CHIRP DataFrame; see ChirpCsvWriter.write_frame."""
+        self.csv.write_frame(chirp_frame)
+        if self._collected is not None:
+            for column, values in self._collected.items():
+                values.extend(_frame_values(chirp_frame[column], None))
+
+    def commit(self) -> None:
+        """Write every file, then rename them all into place.
+
+        If any file cannot be written, every temporary file is removed,
+        no output is replaced and the error is raised.
+        """
+        collected, self._collected = self._collected, None
+        if collected is None:
+            self.csv.commit()
+            return
+        written = []
+        try:
+            self.csv.finish()
+            for extra_output in self.extra_outputs:
+                written.append((write_temp(extra_output, collected,
+                                           self.csv.buffer_size),
+                                extra_output))
+        except BaseException:
+            self.csv.abort()
+            for temp_file, extra_output in written:
+                os.remove(temp_file)
+            raise
+        self.csv.commit()
+        for temp_file, extra_output in written:
+            os.replace(temp_file, extra_output)
+            log.info(f'Output file written: {extra_output}')
+
+    def abort(self) -> None:
+        """Remove the unfinished CHIRP file; see ChirpCsvWriter.abort."""
+        self.csv.abort()
+        self._collected = None
+
+    def __enter__(self) -> 'ChirpOutputs':
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
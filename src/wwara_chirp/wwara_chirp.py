@@ -11,7 +11,9 @@ The script reads a CSV file exported from the WWARA database and writes
 a new CSV file in the format required by more recent versions of CHIRP.
 
 The script requires the pandas library, which can be installed with the
-command: pip install pandas
+command: pip install pandas. pandas is only imported once a conversion
+runs, so --version and --help return quickly, and the stdlib engine
+(--engine stdlib) converts without it.
 
 Author: Tom Sayles, KE4HET, with assistance from GitHub Copilot
 
@@ -20,15 +22,19 @@ License: MIT License (see LICENSE file)
 """
 import argparse
 import logging
-import os
-import re
 import sys
-from contextlib import nullcontext
-from logging.handlers import RotatingFileHandler
-import pandas as pd
 
 from wwara_chirp.version import __version__
-from wwara_chirp.chirpvalidator import ChirpValidator
+from wwara_chirp.bands import BANDS_BY_NAME, FrequencyFilter
+from wwara_chirp.banks import BANK_KEYS
+from wwara_chirp.chirpvalidator import DEFAULT_LIMITS
+from wwara_chirp.comment_template import BUILTIN_TEMPLATES, load_template
+from wwara_chirp.core import ENGINES, READERS
+from wwara_chirp.geo import GeoFilter
+from wwara_chirp.log_setup import LOG_FILE, LOG_LEVELS, configure_logging
+from wwara_chirp.profiles import BUILTIN_PROFILES, load_profile
+from wwara_chirp.writers import output_format
+from wwara_chirp.wwara_extract import EXTRACT_MEMBERS
 
 from wwara_chirp.mock_chirp import MockChirp
 
@@ -40,36 +46,8 @@ MODES = MockChirp.MODES
 INPUT_FILE = '../../sample_files/WWARA-rptrlist-SAMPLE.csv'
 OUTPUT_FILE = '../../sample_files/wwara-chirp.csv'
 
-# Set up the CSV column names for the wwara input file
-WWARA_COLUMNS = [
-    'FC_RECORD_ID', 'SOURCE', 'OUTPUT_FREQ', 'INPUT_FREQ', 'STATE', 'CITY',
-    'LOCALE', 'CALL', 'SPONSOR', 'CTCSS_IN', 'CTCSS_OUT', 'DCS_CDCSS', 'DTMF',
-    'LINK', 'FM_WIDE', 'FM_NARROW', 'DSTAR_DV', 'DSTAR_DD', 'DMR',
-    'DMR_COLOR_CODE', 'FUSION', 'FUSION_DSQ', 'P25_PHASE_1', 'P25_PHASE_2',
-    'P25_NAC', 'NXDN_DIGITAL', 'NXDN_MIXED', 'NXDN_RAN', 'ATV', 'DATV', 'RACES',
-    'ARES', 'WX', 'URL', 'LATITUDE', 'LONGITUDE', 'EXPIRATION_DATE', 'COMMENT'
-]
-
-# Set up the CSV column names for the chirp output file
-
-CHIRP_COLUMNS = [
-    'Location', 'Name', 'Frequency', 'Duplex', 'Offset', 'Tone', 'rToneFreq',
-    'cToneFreq', 'DtcsCode', 'DtcsPolarity', 'RxDtcsCode', 'CrossMode', 'Mode',
-    'TStep', 'Skip', 'Power', 'Comment', 'URCALL', 'RPT1CALL', 'RPT2CALL',
-    'DVCODE'
-]
-
 # Set up logging
 log = logging.getLogger(__name__)
-log.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-# handler = RotatingFileHandler('../../tests/wwara-chirp.log', maxBytes=100000, backupCount=5)
-handler = RotatingFileHandler('wwara-chirp.log', maxBytes=100000, backupCount=5)
-handler.setFormatter(formatter)
-log.addHandler(handler)
-
-# create a pandas dataframe for the chirp output file
-chirp_table = pd.DataFrame(columns=CHIRP_COLUMNS)
 
 """
 The constraints in this script have been revised to match those defined
@@ -80,18 +58,19 @@ with the latest versions of CHIRP.
 These constraints are associated with the latest versions of CHIRP as of
 October 2023.
 """
+# The limits are defined once, in chirpvalidator.ChirpLimits, and are
+# repeated here for code that reads them from this module.
 # Set up the CHIRP memory channel limits
-channel_min = 0
-channel_max = 499
+channel_min = DEFAULT_LIMITS.channel_min
+channel_max = DEFAULT_LIMITS.channel_max
 
-# Set up the CHIRP frequency limits
-frequency_min = 10  # 1 MHz
-frequency_max = 1300  # 1.3 GHz
+# Set up the CHIRP frequency limits, in MHz
+frequency_min = DEFAULT_LIMITS.frequency_min
+frequency_max = DEFAULT_LIMITS.frequency_max
 
-# Set up the CHIRP offset limits, in kHz
-# TODO: Check if these are the correct limits
-offset_min = 0
-offset_max = 99.9  # 99.999999 MHz
+# Set up the CHIRP offset limits, in MHz
+offset_min = DEFAULT_LIMITS.offset_min
+offset_max = DEFAULT_LIMITS.offset_max
 
 # Set up the valid CHIRP tones
 # 50 Tones
@@ -106,7 +85,6 @@ MODES = MODES
 
 # Initialize the CHIRP memory parameters
 comment = ''
-channel = 0
 channels = []
 
 # # Set up the CHIRP memory channel dictionary
@@ -115,257 +93,463 @@ channels = []
 # # Set up the CHIRP memory channel list
 # channel_list = []
 
+# The default Converter behind process_row. It keeps numbering Locations
+# across calls, as the old module-level channel counter did. It is created
+# on first use, since the converter module imports pandas.
+_default_converter = None
+
+def _get_default_converter():
+    global _default_converter
+    if _default_converter is None:
+        from wwara_chirp.converter import Converter
+        _default_converter = Converter()
+    return _default_converter
+
 # define function to process a wwara row and return a chirp row
 def process_row(wwara_row):
-    global channel
-
-    chirp_row = pd.Series({
-        'Location': 0,
-        'Name': '',
-        'Frequency': 0,
-        'Duplex': '',
-        'Offset': '',
-        'Tone': '',
-        'rToneFreq': '88.5',
-        'cToneFreq': '88.5',
-        'DtcsCode': 0,
-        'DtcsPolarity': 'NN',
-        'RxDtcsCode': '23',
-        'CrossMode': 'Tone->Tone',
-        'Mode': '',
-        'TStep': '5.00',
-        'Skip': '',
-        'Power': '5.00W',
-        'Comment': '',
-        'URCALL': '',
-        'RPT1CALL': '',
-        'RPT2CALL': '',
-        'DVCODE': ''
-    })
-
-    # Set up the default CHIRP memory parameters
-    tone = ''
-    c_tone_freq = '88.5'
-    r_tone_freq = '88.5'
-    # dtcs_code = '023'
-    dtcs_code = 23
-    dtcs_polarity = 'NN'
-    mode = ''
-
-    location = channel
-    name = wwara_row['CALL']
-
-    # wwara_row['OUTPUT_FREQ'] and wwara_row['INPUT_FREQ'] are in MHz
-    # Convert to Hz for chirp
-    frequency_out = wwara_row['OUTPUT_FREQ']
-    frequency_in = wwara_row['INPUT_FREQ']
-
-    if frequency_out > frequency_in:
-        duplex = '+'
-        offset = (frequency_out - frequency_in)
-    else:
-        duplex = '-'
-        offset = (frequency_in - frequency_out)
-
-    if wwara_row['CTCSS_IN'] != '':
-        tone = 'Tone'
-        r_tone_freq = wwara_row['CTCSS_IN']
-
-    if r_tone_freq != '':
-        tone = 'Tone'
-        if wwara_row['CTCSS_OUT'] != '':
-            c_tone_freq = wwara_row['CTCSS_OUT']
-    elif wwara_row['DCS_CDCSS'] != '':
-        tone = 'DTCS'
-        dtcs_code = wwara_row['DCS_CDCSS']
-
-
-
-    if wwara_row['FM_WIDE'] == 'Y':
-        mode = 'FM'
-    elif wwara_row['FM_NARROW'] == 'Y':
-        mode = 'NFM'
-    elif wwara_row['DSTAR_DV'] == 'Y':
-        mode = 'DV'
-    elif wwara_row['DSTAR_DD'] == 'Y':
-        # TODO: Check if this is the correct mode for DSTAR_DD
-        mode = 'DIG'
-    elif wwara_row['DMR'] == 'Y':
-        mode = 'DMR'
-    elif wwara_row['P25_PHASE_1'] == 'Y' or wwara_row['P25_PHASE_2'] == 'Y':
-        mode = 'P25'
-    elif wwara_row['ATV'] == 'Y':
-        # TODO: Check if this is the correct mode for ATV
-        mode = 'DIG'
-
-
-    comment = wwara_row['COMMENT']
-    #check that the comment is a string or empty string
-    if not isinstance(comment, str):
-        comment = ''
-
-    comment_len = len(comment)
-    if comment_len > 0:
-        aux_comment = ' '
-    else:
-        aux_comment = ''
-
-    # construct meaningful comment from wwara data
-    geographic_location = ''
-    if wwara_row['CITY'] != '':
-        geographic_location = wwara_row['CITY']
-    if wwara_row['STATE'] != '':
-        if geographic_location != '':
-            geographic_location += ', '
-        geographic_location += wwara_row['STATE']
-    if wwara_row['LOCALE'] != '':
-        if geographic_location != '':
-            geographic_location += ' '
-        geographic_location += wwara_row['LOCALE']
-
-    if (comment_len + len(aux_comment) + len(geographic_location)) <= 255:
-        if len(comment) > 0:
-            aux_comment += ' '
-        aux_comment += f' {geographic_location}'
-
-    if wwara_row['SPONSOR'] != '' and (comment_len + len(aux_comment) + len(
-            f' Sponsor: {wwara_row["SPONSOR"]}')) <= 255:
-        aux_comment += f' Sponsor: {wwara_row["SPONSOR"]}'
-    if wwara_row['LINK'] != '' and (comment_len + len(aux_comment) + len(
-            f' Link: {wwara_row["LINK"]}')) <= 255:
-        aux_comment += f' Link: {wwara_row["LINK"]}'
-    if wwara_row['URL'] != '' and (comment_len + len(aux_comment) + len(
-            f' URL: {wwara_row["URL"]}')) <= 255:
-        aux_comment += f' URL: {wwara_row["URL"]}'
-    if wwara_row['EXPIRATION_DATE'] != '' and (
-            comment_len + len(aux_comment) + len(
-            f' Expiration: {wwara_row["EXPIRATION_DATE"]}')) <= 255:
-        aux_comment += f' Expiration: {wwara_row["EXPIRATION_DATE"]}'
-    if wwara_row['LATITUDE'] != '' and wwara_row['LONGITUDE'] != '' and (
-            comment_len + len(aux_comment) + len(
-            f' Lat: {wwara_row["LATITUDE"]}, Lon: {wwara_row["LONGITUDE"]}')) <= 255:
-        aux_comment += f' Lat: {wwara_row["LATITUDE"]}, Lon: {wwara_row["LONGITUDE"]}'
-    if wwara_row['ARES'] == 'Y' and (comment_len + len(aux_comment) + len(
-            ' ARES')) <= 255:
-        aux_comment += ' ARES'
-    if wwara_row['RACES'] == 'Y' and (comment_len + len(aux_comment) + len(
-            ' RACES')) <= 255:
-        aux_comment += 'RACES'
-    if wwara_row['WX'] == 'Y' and (comment_len + len(aux_comment) + len(
-            ' WX')) <= 255:
-        aux_comment += ' WX'
-    if wwara_row['DMR_COLOR_CODE'] != '' and (comment_len + len(aux_comment) + len(
-            f' DMR Color Code: {wwara_row["DMR_COLOR_CODE"]}')) <= 255:
-        aux_comment += f' DMR Color Code: {wwara_row["DMR_COLOR_CODE"]}'
-    if wwara_row['FUSION_DSQ'] != '' and (comment_len + len(aux_comment) + len(
-            f' Fusion DSQ: {wwara_row["FUSION_DSQ"]}')) <= 255:
-        aux_comment += f' Fusion DSQ: {wwara_row["FUSION_DSQ"]}'
-    if wwara_row['NXDN_DIGITAL'] == 'Y' and (comment_len + len(aux_comment) + len(
-            ' NXDN Digital')) <= 255:
-        aux_comment += ' NXDN Digital'
-    if wwara_row['NXDN_MIXED'] == 'Y' and (comment_len + len(aux_comment) + len(
-            ' NXDN Mixed')) <= 255:
-        aux_comment += ' NXDN Mixed'
-    if wwara_row['NXDN_RAN'] != '' and (comment_len + len(aux_comment) + len(
-            f' NXDN RAN: {wwara_row["NXDN_RAN"]}')) <= 255:
-        aux_comment += f' NXDN RAN: {wwara_row["NXDN_RAN"]}'
-    if wwara_row['ATV'] == 'Y' and (comment_len + len(aux_comment) + len(
-            ' ATV')) <= 255:
-        aux_comment += ' ATV'
-    if wwara_row['DATV'] == 'Y' and (comment_len + len(aux_comment) + len(
-            ' DATV')) <= 255:
-        aux_comment += ' DATV'
-
-    comment += aux_comment
-
-    # check if c_tone_freq or r_tone_freq are NaN and set them to 88.5 if they are
-    if pd.isna(c_tone_freq):
-        c_tone_freq = '88.5'
-    if pd.isna(r_tone_freq):
-        r_tone_freq = '88.5'
-
-    chirp_row = pd.Series({
-        'Location': location,
-        'Name': name,
-        'Frequency': f'{frequency_out:.6f}',
-        'Duplex': duplex,
-        'Offset': f'{offset:.6f}',
-        'Tone': tone,
-        'rToneFreq': r_tone_freq,
-        'cToneFreq': c_tone_freq,
-        'DtcsCode': dtcs_code,
-        'DtcsPolarity': dtcs_polarity,
-        'RxDtcsCode': 23,
-        'CrossMode': 'Tone->Tone',
-        'Mode': mode,
-        'TStep': '5.00',
-        'Skip': '',
-        'Power': '5.0W',
-        'Comment': comment,
-        'URCALL': '',
-        'RPT1CALL': '',
-        'RPT2CALL': '',
-        'DVCODE': ''
-    })
-
-    channel += 1
-
-    return chirp_row
+    return _get_default_converter().convert_row(wwara_row)
 
 def write_output_file(output_file, chirp_table_out):
-    chirp_table_out.to_csv(output_file, index=False)
-
-    log.info(f'Output file written: {output_file}')
-    log.info(f'Number of memory channels written: {len(chirp_table_out)}')
-
-def process_file(input_file, output_file):
-    log.debug('Script started')
-    log.debug(f'Input file: {input_file}')
-    log.debug(f'Output file: {output_file}')
-
-    global chirp_table
-    global channel
-
-    # Initialize the channel number
-    channel = 0
-    chirp_table = pd.DataFrame()
-
-    validator = ChirpValidator()
-
-    if not validator.validate_input_file(input_file):
-        sys.exit(1)
-    if not validator.validate_output_file(output_file):
+    from wwara_chirp.converter import write_output_file as write_table
+    write_table(output_file, chirp_table_out)
+
+def _converter_for(validator):
+    """Return a Converter of the validator's limits.
+
+    That is the default Converter, unless the validator checks against
+    other limits; a new Converter is then numbered from their
+    channel_min.
+    """
+    converter = _get_default_converter()
+    if validator is None or validator.limits() == converter.limits:
+        return converter
+    from wwara_chirp.converter import Converter
+    return Converter(limits=validator.limits())
+
+def process_frame_vectorized(df, validator=None):
+    """Convert and validate a WWARA DataFrame with the vectorized engine.
+
+    Wrapper around Converter.process_frame using the default Converter,
+    so Locations continue from previous process_row calls. A validator,
+    such as ChirpValidator.with_limits(limits), converts and validates
+    with its limits.
+    """
+    return _converter_for(validator).process_frame(df, engine='vectorized')
+
+def process_frame(df, validator=None, engine='row'):
+    """Convert and validate a WWARA DataFrame with the selected engine.
+
+    Wrapper around Converter.process_frame using the default Converter,
+    or one of the validator's limits, as process_frame_vectorized.
+    """
+    return _converter_for(validator).process_frame(df, engine=engine)
+
+def process_file_chunked(input_file, output_file, chunksize, engine='row',
+                         member='rptrlist', comment_template=None,
+                         frequency_filter=None, geo_filter=None,
+                         reader='pandas'):
+    """Convert a WWARA file in bounded chunks, writing as it goes.
+
+    Wrapper around process_file with a chunk size, so the input, output
+    and schema checks of Converter.convert_file run first; exits with
+    status 1 if a file is rejected.
+    """
+    process_file(input_file, output_file, engine=engine,
+                 chunksize=chunksize, member=member,
+                 comment_template=comment_template,
+                 frequency_filter=frequency_filter, geo_filter=geo_filter,
+                 reader=reader)
+
+def process_file(input_file, output_file, engine='row', chunksize=None,
+                 member='rptrlist', state_cache=None, change_report=None,
+                 comment_template=None, bank_size=None, bank_by=None,
+                 frequency_filter=None, geo_filter=None,
+                 parse_cache=None, reader='pandas', profiler=None,
+                 profiles=None, buffer_size=None, extra_outputs=()):
+    """Convert a WWARA file to a CHIRP file with a new Converter.
+
+    Exits with status 1 if the input or output file is rejected. The
+    stdlib engine is run directly, so that pandas is never imported.
+    comment_template is a CommentTemplate; None uses the legacy comment.
+    With bank_size or bank_by, output_file is a directory that receives
+    one CHIRP file per bank (see Converter.convert_file_banked). With a
+    FrequencyFilter, only the records inside its ranges are converted;
+    with a GeoFilter, only those inside its area, in its order. With
+    parse_cache, the parsed input is cached in that directory ('' for the
+    input's directory) and reused while the input is unchanged. reader
+    selects how the pandas engines read the input (see READERS). A
+    Profiler times the stages of the conversion and is finished with its
+    row counts. With a list of RadioProfiles, the input is converted once
+    and written for each of them; output_file is then a directory if
+    there is more than one (see Converter.convert_file_profiles).
+    buffer_size sets the write buffer of the output files, in bytes.
+    extra_outputs are further files receiving the same rows, as
+    newline-delimited JSON, Parquet or Arrow IPC by their extension.
+
+    Returns:
+        The ChangeSummary of an incremental conversion, else None.
+    """
+    write_settings = {} if buffer_size is None else {
+        'buffer_size': buffer_size}
+    if profiles:
+        from wwara_chirp.converter import Converter
+        converter = Converter(comment_template=comment_template,
+                              frequency_filter=frequency_filter,
+                              geo_filter=geo_filter,
+                              parse_cache=parse_cache, reader=reader,
+                              profiler=profiler, **write_settings)
+        result = converter.convert_file_profiles(input_file, output_file,
+                                                 profiles, member=member)
+    elif bank_size or bank_by:
+        from wwara_chirp.converter import Converter
+        converter = Converter(engine=engine,
+                              comment_template=comment_template,
+                              frequency_filter=frequency_filter,
+                              geo_filter=geo_filter,
+                              parse_cache=parse_cache, reader=reader,
+                              profiler=profiler, **write_settings)
+        result = converter.convert_file_banked(input_file, output_file,
+                                               bank_size=bank_size,
+                                               bank_by=bank_by or 'count',
+                                               member=member)
+    elif engine == 'stdlib' and not (chunksize or state_cache):
+        from wwara_chirp.stdlib_backend import convert_file
+        result = convert_file(input_file, output_file, member=member,
+                              comment_template=comment_template,
+                              frequency_filter=frequency_filter,
+                              geo_filter=geo_filter,
+                              parse_cache=parse_cache, profiler=profiler,
+                              extra_outputs=extra_outputs, **write_settings)
+    else:
+        from wwara_chirp.converter import Converter
+        converter = Converter(engine=engine,
+                              comment_template=comment_template,
+                              frequency_filter=frequency_filter,
+                              geo_filter=geo_filter,
+                              parse_cache=parse_cache, reader=reader,
+                              profiler=profiler, **write_settings)
+        result = converter.convert_file(input_file, output_file,
+                                        chunksize=chunksize, member=member,
+                                        state_cache=state_cache,
+                                        change_report=change_report,
+                                        extra_outputs=extra_outputs)
+    if not result.ok:
         sys.exit(1)
-
-    log.debug(f'Reading input file: {input_file}')
-    df = pd.read_csv(input_file, skiprows=[0])
-    log.debug(f'Number of memory channels read: {len(df)}')
-
-    for index, wwara_row in df.iterrows():
-        chirp_row = process_row(wwara_row)
-
-        if not validator.validate_row(chirp_row):
-            error_location = chirp_row['Location']
-            log.error(f'Invalid row data: {error_location}')
-            continue
-
-        chirp_row_to_frame = chirp_row.to_frame().T
-        if chirp_table.empty:
-            chirp_table = chirp_row_to_frame
-        else:
-            chirp_table = pd.concat([chirp_table, chirp_row_to_frame], ignore_index=True)
-
-    write_output_file(output_file, chirp_table)
+    if profiler is not None:
+        profiler.finish(result.rows_read, result.rows_written)
+    return result.summary
+
+def add_profile_arguments(parser):
+    """Add the profiling options to an argument parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help='Time the read, select, convert, validate, '
+                             'accumulate and write stages and print rows/s, '
+                             'rejected rows by reason and peak memory to '
+                             'stderr')
+    parser.add_argument('--profile-json', metavar='PATH', default=None,
+                        help='Write the profile to this JSON file; implies '
+                             '--profile without printing it')
+
+def add_logging_arguments(parser):
+    """Add the log file options to an argument parser."""
+    parser.add_argument('--log-file', metavar='PATH', default=LOG_FILE,
+                        help=f'Rotating log file (default: {LOG_FILE} in '
+                             f'the current directory)')
+    parser.add_argument('--log-level', choices=LOG_LEVELS, default='DEBUG',
+                        help='Lowest level written to the log file '
+                             '(default: DEBUG)')
+    parser.add_argument('--log-queue', action='store_true',
+                        help='Write the log file from a background thread, '
+                             'so that logging does not slow the conversion')
+    parser.add_argument('--log-repeats', type=int, default=None,
+                        metavar='COUNT',
+                        help='Log only the first COUNT warnings and errors '
+                             'of each kind, e.g. "Invalid name length", and '
+                             'how often each occurred at the end')
+
+def profiler_from_args(args):
+    """Return a Profiler if profiling was requested, else None."""
+    if not (args.profile or args.profile_json):
+        return None
+    from wwara_chirp.profiling import Profiler
+    return Profiler()
+
+def report_profile(args, profiler):
+    """Print or write the profile as requested on the command line."""
+    if profiler is None:
+        return
+    if args.profile:
+        print(profiler.format_report(), file=sys.stderr)
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+
+def add_parse_cache_arguments(parser):
+    """Add the parse cache options to an argument parser."""
+    parser.add_argument('--parse-cache', action='store_true',
+                        help='Keep the parsed input in a binary cache file '
+                             'next to the input and reuse it while the '
+                             'input is unchanged, skipping CSV parsing')
+    parser.add_argument('--parse-cache-dir', metavar='DIR', default=None,
+                        help='Keep the parse cache files in DIR; implies '
+                             '--parse-cache')
+
+def add_reader_argument(parser):
+    """Add the --reader option to an argument parser."""
+    parser.add_argument('--reader', choices=READERS, default='pandas',
+                        help='How the row and vectorized engines read the '
+                             'input: "pandas" infers the column types, '
+                             '"typed" applies the WWARA schema, using less '
+                             'memory (default: pandas)')
+
+def parse_cache_from_args(args):
+    """Return the parse cache directory selected on the command line.
+
+    Returns:
+        The directory, '' for the input's directory, or None without a
+        parse cache.
+    """
+    if args.parse_cache_dir is not None:
+        return args.parse_cache_dir
+    return '' if args.parse_cache else None
+
+def add_comment_arguments(parser):
+    """Add the comment template options to an argument parser."""
+    parser.add_argument('--comment-template', metavar='NAME|PATH',
+                        default='legacy',
+                        help='How to build the CHIRP comment: a built-in '
+                             f'template ({", ".join(BUILTIN_TEMPLATES)}) or '
+                             'a JSON template file (default: legacy)')
+    parser.add_argument('--comment-length', type=int, default=None,
+                        metavar='CHARS',
+                        help='Longest comment to build, for radios with '
+                             'small displays (default: the template\'s '
+                             'max_length, else 255)')
+
+def comment_template_from_args(parser, args):
+    """Load the CommentTemplate selected on the command line."""
+    try:
+        return load_template(args.comment_template, args.comment_length)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+def add_radio_argument(parser):
+    """Add the --radio option to an argument parser."""
+    parser.add_argument('--radio', action='append', default=[],
+                        metavar='NAME|PATH',
+                        help='Write the columns, defaults, memory count, '
+                             'name length and modes of a radio: a built-in '
+                             f'profile ({", ".join(BUILTIN_PROFILES)}) or a '
+                             'JSON profile file. May be repeated to convert '
+                             'once for several radios; output_file is then '
+                             'a directory receiving NAME.csv for each')
+
+def radio_profiles_from_args(parser, args):
+    """Load the RadioProfiles selected on the command line."""
+    try:
+        return [load_profile(radio) for radio in args.radio]
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+def add_filter_arguments(parser):
+    """Add the frequency and geo filter options to an argument parser."""
+    parser.add_argument('--band', action='append', default=[],
+                        metavar='BAND[,BAND...]',
+                        help='Only convert repeaters in these amateur bands '
+                             f'({", ".join(BANDS_BY_NAME)}, or a frequency '
+                             'such as 222); may be repeated')
+    parser.add_argument('--freq-range', action='append', default=[],
+                        metavar='LOW-HIGH',
+                        help='Only convert repeaters with an output '
+                             'frequency from LOW to HIGH MHz; may be '
+                             'repeated, and combines with --band')
+    parser.add_argument('--near', metavar='LAT,LON', default=None,
+                        help='Only convert repeaters within --radius-km of '
+                             'this point, in decimal degrees')
+    parser.add_argument('--radius-km', type=float, default=None,
+                        metavar='KM',
+                        help='Distance from the --near point, in km')
+    parser.add_argument('--bbox', metavar='SOUTH,WEST,NORTH,EAST',
+                        default=None,
+                        help='Only convert repeaters inside this box, in '
+                             'decimal degrees')
+    parser.add_argument('--sort-by-distance', action='store_true',
+                        help='Number the repeaters by distance from the '
+                             '--near point, closest first')
+
+def frequency_filter_from_args(parser, args):
+    """Build the FrequencyFilter selected on the command line, if any."""
+    if not (args.band or args.freq_range):
+        return None
+    try:
+        return FrequencyFilter.from_args(args.band, args.freq_range)
+    except ValueError as error:
+        parser.error(str(error))
+
+def geo_filter_from_args(parser, args):
+    """Build the GeoFilter selected on the command line, if any."""
+    if args.near is None and args.bbox is None:
+        if args.radius_km is not None or args.sort_by_distance:
+            parser.error('--radius-km and --sort-by-distance require --near')
+        return None
+    if (args.near is None) != (args.radius_km is None):
+        parser.error('--near and --radius-km go together')
+    try:
+        return GeoFilter.from_args(args.near, args.radius_km, args.bbox,
+                                   args.sort_by_distance)
+    except ValueError as error:
+        parser.error(str(error))
 
 def main():
-    parser = argparse.ArgumentParser(description='WWARA CHIRP Export Script Update')
-    parser.add_argument('input_file', help='Path to the input CSV file')
+    if sys.argv[1:2] == ['batch']:
+        from wwara_chirp.batch import main as batch_main
+        logs = configure_logging()
+        try:
+            status = batch_main(sys.argv[2:])
+        finally:
+            logs.stop()
+        sys.exit(status)
+    if sys.argv[1:2] == ['serve']:
+        from wwara_chirp.server import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['watch']:
+        from wwara_chirp.watch import main as watch_main
+        sys.exit(watch_main(sys.argv[2:]))
+
+    bank_capacity = channel_max - channel_min + 1
+    parser = argparse.ArgumentParser(
+        description='WWARA CHIRP Export Script Update',
+        epilog='To convert many files in parallel, run '
+               '"wwara_chirp batch --help"; to serve CHIRP files over HTTP, '
+               'run "wwara_chirp serve --help"; to convert each new extract '
+               'of a directory, run "wwara_chirp watch --help".')
+    parser.add_argument('input_file',
+                        help='Path to the input CSV file, or to the WWARA '
+                             'DataBaseExtract.zip archive')
     parser.add_argument('output_file', help='Path to the output CSV file')
     parser.add_argument('--version', action='version',
                         version=f'WWARA CHIRP Export Script {__version__}')
+    parser.add_argument('--engine', choices=ENGINES, default='row',
+                        help='Conversion engine: "row" converts one row at a '
+                             'time, "vectorized" converts whole columns, '
+                             '"stdlib" converts without pandas and is fastest '
+                             'for small files (default: row)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        metavar='ROWS',
+                        help='Stream the input in chunks of ROWS rows and '
+                             'write the output as it is converted, keeping '
+                             'memory use flat for very large extracts')
+    parser.add_argument('--member', choices=sorted(EXTRACT_MEMBERS),
+                        default='rptrlist',
+                        help='List to read when input_file is the WWARA '
+                             'DataBaseExtract.zip archive (default: '
+                             'rptrlist)')
+    parser.add_argument('--state-cache', metavar='PATH', default=None,
+                        help='Convert incrementally: reuse the CHIRP rows of '
+                             'records unchanged since the run that wrote '
+                             'this cache file, then update it. New and '
+                             'changed records are converted with the row '
+                             'engine, whatever --engine is')
+    parser.add_argument('--change-report', metavar='PATH', default=None,
+                        help='With --state-cache, write the added, removed '
+                             'and modified FC_RECORD_IDs to this JSON file')
+    add_parse_cache_arguments(parser)
+    add_reader_argument(parser)
+    parser.add_argument('--bank-size', type=int, default=None,
+                        metavar='MEMORIES',
+                        help='Split the output into CHIRP files of at most '
+                             'MEMORIES memories each, numbered from 0; '
+                             'output_file is then a directory (at most '
+                             f'{bank_capacity}, the default with --bank-by)')
+    parser.add_argument('--bank-by', choices=BANK_KEYS, default=None,
+                        help='Split the output into banks by count, band, '
+                             'city or mode, each group filling its own '
+                             'CHIRP files; output_file is then a directory')
+    parser.add_argument('--also-write', action='append', default=[],
+                        metavar='PATH',
+                        help='Also write the converted rows to PATH, as '
+                             'newline-delimited JSON (.ndjson, .jsonl), '
+                             'Parquet (.parquet) or Arrow IPC (.arrow, '
+                             '.feather); the last two need pyarrow. May be '
+                             'repeated')
+    parser.add_argument('--write-buffer', type=int, default=None,
+                        metavar='BYTES',
+                        help='Size of the output file\'s write buffer '
+                             '(default: 65536)')
+    add_radio_argument(parser)
+    add_comment_arguments(parser)
+    add_filter_arguments(parser)
+    add_profile_arguments(parser)
+    add_logging_arguments(parser)
     args = parser.parse_args()
-
-    process_file(args.input_file, args.output_file)
+    if args.chunksize is not None and args.chunksize < 1:
+        parser.error('--chunksize must be at least 1')
+    if args.change_report and not args.state_cache:
+        parser.error('--change-report requires --state-cache')
+    if args.chunksize and args.state_cache:
+        parser.error('--chunksize cannot be combined with --state-cache')
+    if args.bank_size is not None and not 0 < args.bank_size <= bank_capacity:
+        parser.error(f'--bank-size must be between 1 and {bank_capacity}')
+    if (args.bank_size or args.bank_by) and (args.chunksize
+                                             or args.state_cache):
+        parser.error('--bank-size and --bank-by cannot be combined with '
+                     '--chunksize or --state-cache')
+    if args.radio and (args.bank_size or args.bank_by or args.chunksize
+                       or args.state_cache):
+        parser.error('--radio cannot be combined with --bank-size, '
+                     '--bank-by, --chunksize or --state-cache')
+    if args.radio and args.engine == 'stdlib':
+        parser.error('--radio needs the row or vectorized engine')
+    if args.reader != 'pandas' and args.engine == 'stdlib':
+        parser.error('the stdlib engine has its own reader; --reader '
+                     'needs the row or vectorized engine')
+    parse_cache = parse_cache_from_args(args)
+    if parse_cache is not None and args.chunksize:
+        parser.error('--parse-cache cannot be combined with --chunksize')
+    if args.sort_by_distance and args.chunksize:
+        parser.error('--sort-by-distance cannot be combined with '
+                     '--chunksize')
+    if args.also_write and (args.bank_size or args.bank_by or args.radio
+                            or args.chunksize):
+        parser.error('--also-write cannot be combined with --bank-size, '
+                     '--bank-by, --radio or --chunksize')
+    for extra_output in args.also_write:
+        try:
+            output_format(extra_output)
+        except ValueError as error:
+            parser.error(str(error))
+    if args.write_buffer is not None and args.write_buffer < 1:
+        parser.error('--write-buffer must be at least 1')
+    if args.log_repeats is not None and args.log_repeats < 0:
+        parser.error('--log-repeats must not be negative')
+
+    comment_template = comment_template_from_args(parser, args)
+    frequency_filter = frequency_filter_from_args(parser, args)
+    geo_filter = geo_filter_from_args(parser, args)
+    profiler = profiler_from_args(args)
+    profiles = radio_profiles_from_args(parser, args)
+
+    logs = configure_logging(args.log_file, args.log_level, args.log_queue,
+                             args.log_repeats)
+    try:
+        summary = process_file(args.input_file, args.output_file,
+                               engine=args.engine, chunksize=args.chunksize,
+                               member=args.member,
+                               state_cache=args.state_cache,
+                               change_report=args.change_report,
+                               comment_template=comment_template,
+                               bank_size=args.bank_size,
+                               bank_by=args.bank_by,
+                               frequency_filter=frequency_filter,
+                               geo_filter=geo_filter,
+                               parse_cache=parse_cache, reader=args.reader,
+                               profiler=profiler, profiles=profiles,
+                               buffer_size=args.write_buffer,
+                               extra_outputs=args.also_write)
+    finally:
+        logs.stop()
+    if summary is not None:
+        print(f'Changes since last run: {summary}')
+    report_profile(args, profiler)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
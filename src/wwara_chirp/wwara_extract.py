@@ -0,0 +1,174 @@
+# src/wwara_chirp/wwara_extract.py
+
+"""
+WWARA extract access
+
+WWARA publishes its nightly database extract as DataBaseExtract.zip. This
+module finds the repeater list (or the pending, About2Expire or Expired
+list) inside the archive by file name and streams it straight out of the
+ZIP, so the archive never has to be unpacked to disk.
+
+Plain CSV files are passed through unchanged, so callers can use
+``open_input`` for either kind of input.
+
+Example:
+    >>> with open_input('DataBaseExtract.zip') as source:
+    ...     df = pd.read_csv(source, skiprows=[0])
+"""
+
+import csv
+import io
+import logging
+import os
+import re
+import zipfile
+from contextlib import contextmanager, nullcontext
+from typing import (IO, ContextManager, Iterator, List, Optional, Tuple,
+                    Union)
+
+log = logging.getLogger(__name__)
+
+# File name patterns of the CSV members of DataBaseExtract.zip, where the
+# DATE part is the extract date (e.g. WWARA-rptrlist-20260201.csv)
+EXTRACT_MEMBERS = {
+    'rptrlist': re.compile(r'^WWARA-rptrlist-\d+\.csv$', re.IGNORECASE),
+    'pending': re.compile(r'^WWARA-pending-rptrlist-\d+\.csv$',
+                          re.IGNORECASE),
+    'about2expire': re.compile(r'^WWARA-About2Expire-\d+\.csv$',
+                               re.IGNORECASE),
+    'expired': re.compile(r'^WWARA-Expired-\d+\.csv$', re.IGNORECASE),
+}
+
+# Encoding of the CSV files in the extract
+EXTRACT_ENCODING = 'utf-8'
+
+# The first line of every list names the data specification it follows,
+# e.g. DATA_SPEC_VERSION=2015.2.2
+SPEC_VERSION_PREFIX = 'DATA_SPEC_VERSION='
+
+
+def is_zip_extract(input_file: str) -> bool:
+    """Return True if input_file is a ZIP archive rather than a CSV file."""
+    return os.path.isfile(input_file) and zipfile.is_zipfile(input_file)
+
+
+def find_member(archive: zipfile.ZipFile, member: str = 'rptrlist') -> str:
+    """Find a WWARA list inside an extract archive.
+
+    Args:
+        archive: An open DataBaseExtract.zip.
+        member: One of the EXTRACT_MEMBERS keys.
+
+    Returns:
+        The name of the archive member.
+
+    Raises:
+        ValueError: If member is not a known list, or the archive does
+            not contain exactly one file matching it.
+    """
+    if member not in EXTRACT_MEMBERS:
+        raise ValueError(f'Unknown extract member: {member}')
+
+    pattern = EXTRACT_MEMBERS[member]
+    matches = [name for name in archive.namelist()
+               if pattern.match(os.path.basename(name))]
+    if len(matches) != 1:
+        raise ValueError(f'Expected one {member} file in {archive.filename}, '
+                         f'found {len(matches)}')
+    return matches[0]
+
+
+def validate_extract(input_file: str, member: str = 'rptrlist') -> bool:
+    """Check that a ZIP input contains the requested list.
+
+    CSV inputs always pass. Failures are logged, in the style of the
+    ChirpValidator file checks.
+
+    Args:
+        input_file: Path to a WWARA CSV file or to DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        True if the input can be opened with ``open_input``.
+    """
+    if not is_zip_extract(input_file):
+        return True
+    with zipfile.ZipFile(input_file) as archive:
+        try:
+            find_member(archive, member)
+        except ValueError as error:
+            log.error(f'Invalid input archive: {error}')
+            return False
+    return True
+
+
+@contextmanager
+def _open_member(input_file: str, member: str) -> Iterator[IO[str]]:
+    """Open a WWARA list inside an extract archive as a text stream."""
+    with zipfile.ZipFile(input_file) as archive:
+        name = find_member(archive, member)
+        log.debug(f'Reading {name} from {input_file}')
+        with archive.open(name) as raw:
+            yield io.TextIOWrapper(raw, encoding=EXTRACT_ENCODING,
+                                   newline='')
+
+
+def open_input(input_file: str, member: str = 'rptrlist'
+               ) -> ContextManager[Union[str, IO[str]]]:
+    """Open a WWARA input for ``pd.read_csv``.
+
+    Args:
+        input_file: Path to a WWARA CSV file or to DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive; ignored for CSV
+            files.
+
+    Returns:
+        A context manager yielding something ``pd.read_csv`` accepts: the
+        path itself for a CSV file, or a text stream for a ZIP member.
+    """
+    if is_zip_extract(input_file):
+        return _open_member(input_file, member)
+    return nullcontext(input_file)
+
+
+def read_header(input_file: str, member: str = 'rptrlist'
+                ) -> Tuple[Optional[str], List[str]]:
+    """Read the title line and the column names of a WWARA list.
+
+    Args:
+        input_file: Path to a WWARA CSV file or to DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        A tuple of the DATA_SPEC_VERSION, e.g. '2015.2.2', or None if the
+        first line does not name one, and the column names on the
+        second line.
+    """
+    with open_input(input_file, member) as source:
+        if isinstance(source, str):
+            with open(source, 'r', encoding=EXTRACT_ENCODING,
+                      newline='') as f:
+                lines = [f.readline(), f.readline()]
+        else:
+            lines = [source.readline(), source.readline()]
+    title = lines[0].strip().strip('"')
+    version = None
+    if title.startswith(SPEC_VERSION_PREFIX):
+        version = title[len(SPEC_VERSION_PREFIX):].strip()
+    columns = next(csv.reader([lines[1]]), [])
+    return version, columns
+
+
+def read_spec_version(input_file: str, member: str = 'rptrlist'
+                      ) -> Optional[str]:
+    """Read the DATA_SPEC_VERSION from the first line of a WWARA list.
+
+    Args:
+        input_file: Path to a WWARA CSV file or to DataBaseExtract.zip.
+        member: Which list to read from a ZIP archive.
+
+    Returns:
+        The version, e.g. '2015.2.2', or None if the first line does not
+        name one.
+    """
+    return read_header(input_file, member)[0]
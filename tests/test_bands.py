@@ -0,0 +1,142 @@
+# tests/test_bands.py
+
+"""
+Unit Tests for the amateur band plan and frequency filters
+
+Purpose:
+    To ensure that frequencies are classified into the right bands, that
+    the FrequencyIndex answers range queries correctly, and that the
+    --band and --freq-range filters select the same records with every
+    engine before they are converted.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_bands.py
+
+Test Cases:
+    - test_band_of: Tests band classification, including the band edges.
+    - test_find_band: Tests band names and aliases.
+    - test_parse_freq_range: Tests parsing LOW-HIGH ranges.
+    - test_frequency_index: Tests range queries over a frequency list.
+    - test_frequency_filter: Tests building and applying filters, with
+      and without an index.
+    - test_process_file_filter: Tests the filter on every engine.
+"""
+
+import math
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.bands import (BANDS, FrequencyFilter, FrequencyIndex,
+                               band_of, find_band, is_standard_offset,
+                               parse_freq_range)
+from wwara_chirp.core import ENGINES
+from wwara_chirp.wwara_chirp import process_file
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+
+
+class TestBands(unittest.TestCase):
+
+    def test_band_of(self):
+        self.assertEqual(band_of(146.96).name, '2m')
+        self.assertEqual(band_of(144.0).name, '2m')
+        self.assertEqual(band_of(148.0).name, '2m')
+        self.assertEqual(band_of(224.5).name, '1.25m')
+        self.assertEqual(band_of(1299.0).name, '23cm')
+        self.assertIsNone(band_of(148.01))
+        self.assertIsNone(band_of(162.55))
+        self.assertIsNone(band_of(10.0))
+        self.assertIsNone(band_of(2400.0))
+        for band in BANDS:
+            self.assertIs(band_of((band.lowest + band.highest) / 2), band)
+            self.assertTrue(is_standard_offset(band, band.offsets[0]))
+        self.assertFalse(is_standard_offset(band_of(146.96), 1.0))
+
+    def test_find_band(self):
+        self.assertEqual(find_band('70CM').name, '70cm')
+        self.assertEqual(find_band('222').name, '1.25m')
+        self.assertEqual(find_band(' 2m ').name, '2m')
+        with self.assertRaises(ValueError):
+            find_band('3m')
+
+    def test_parse_freq_range(self):
+        self.assertEqual(parse_freq_range('146-147.5'), (146.0, 147.5))
+        self.assertEqual(parse_freq_range('146.52-146.52'), (146.52, 146.52))
+        for text in ('146', '147-146', 'a-b', '146-'):
+            with self.assertRaises(ValueError):
+                parse_freq_range(text)
+
+    def test_frequency_index(self):
+        frequencies = [442.1, 146.96, math.nan, 224.5, 146.52, 1292.0]
+        index = FrequencyIndex(frequencies)
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.between(144, 148), [4, 1])
+        self.assertEqual(index.between(146.52, 146.52), [4])
+        self.assertEqual(index.between(150, 160), [])
+        self.assertEqual(index.select([(420, 450), (144, 148)]), [0, 1, 4])
+        self.assertEqual(index.select([(144, 147), (146, 148)]), [1, 4])
+        counts = index.count_by_band()
+        self.assertEqual(counts['2m'], 2)
+        self.assertEqual(counts['23cm'], 1)
+        self.assertEqual(counts['6m'], 0)
+
+        df = pd.DataFrame({'OUTPUT_FREQ': ['442.1', '146.96', 'unknown']})
+        index = FrequencyIndex.from_frame(df)
+        self.assertEqual((index.positions, index.frequencies),
+                         ([1, 0], [146.96, 442.1]))
+
+    def test_frequency_filter(self):
+        frequency_filter = FrequencyFilter.from_args(['2m,70cm'],
+                                                     ['222-223'])
+        self.assertEqual(frequency_filter.ranges,
+                         ((144.0, 148.0), (420.0, 450.0), (222.0, 223.0)))
+        self.assertEqual(frequency_filter.select([146.96, 224.5, 222.1]),
+                         [0, 2])
+        records = [{'OUTPUT_FREQ': 442.1}, {'OUTPUT_FREQ': 53.0}]
+        self.assertEqual(frequency_filter.select_records(records),
+                         records[:1])
+        with self.assertRaises(ValueError):
+            FrequencyFilter.from_args(['2m', 'vhf'])
+
+        df = pd.read_csv(TEST_CSV, skiprows=[0])
+        index = FrequencyIndex.from_frame(df)
+        for ranges in ((), ((144, 148),), ((420, 450), (440, 441))):
+            frequency_filter = FrequencyFilter(ranges)
+            selected = frequency_filter.select_frame(df)
+            self.assertEqual(selected['FC_RECORD_ID'].tolist(),
+                             [record['FC_RECORD_ID'] for record in
+                              frequency_filter.select_records(
+                                  df.to_dict('records'))])
+            self.assertTrue(selected.equals(
+                frequency_filter.select_frame(df, index)))
+
+    def test_process_file_filter(self):
+        df = pd.read_csv(TEST_CSV, skiprows=[0])
+        expected = df[df['OUTPUT_FREQ'].between(144, 148)
+                      | df['OUTPUT_FREQ'].between(222, 225)]
+        frequency_filter = FrequencyFilter.from_args(['2m', '222'])
+        outputs = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for engine in ENGINES:
+                output_file = os.path.join(temp_dir, f'{engine}.csv')
+                process_file(TEST_CSV, output_file, engine=engine,
+                             frequency_filter=frequency_filter)
+                with open(output_file, 'r') as f:
+                    outputs.append(f.read())
+                chirp_table = pd.read_csv(output_file)
+                self.assertEqual(chirp_table['Name'].tolist(),
+                                 expected['CALL'].tolist())
+                self.assertEqual(chirp_table['Location'].tolist(),
+                                 list(range(len(expected))))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# tests/test_banks.py
+
+"""
+Unit Tests for bank splitting
+
+Purpose:
+    To ensure that a banked conversion writes every valid memory, split
+    into CHIRP files that are each numbered from the first memory, and
+    that every engine splits the same way.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_banks.py
+
+Test Cases:
+    - test_single_bank_matches_reference: Tests one bank of every memory.
+    - test_bank_size: Tests splitting by count and renumbering.
+    - test_bank_by_band: Tests grouping memories by band.
+    - test_bank_file_name: Tests the bank file names.
+    - test_invalid_banks: Tests rejecting bad sizes, keys and outputs.
+"""
+
+import filecmp
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.bands import band_of
+from wwara_chirp.banks import BankWriter, bank_file_name
+from wwara_chirp.chirpvalidator import ChirpLimits
+from wwara_chirp.converter import Converter
+from wwara_chirp.core import ENGINES
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+
+class TestBanks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.reference = pd.read_csv(REFERENCE_CSV)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def convert(self, engine, name, **kwargs):
+        output_dir = os.path.join(self.temp_dir.name, name)
+        result = Converter(engine=engine).convert_file_banked(
+            TEST_CSV, output_dir, **kwargs)
+        self.assertTrue(result.ok)
+        return result
+
+    def test_single_bank_matches_reference(self):
+        for engine in ENGINES:
+            result = self.convert(engine, engine)
+            self.assertEqual(len(result.output_files), 1)
+            self.assertTrue(result.output_files[0].endswith('bank_000.csv'))
+            self.assertEqual(result.rows_written, len(self.reference))
+            self.assertTrue(filecmp.cmp(result.output_files[0],
+                                        REFERENCE_CSV, shallow=False),
+                            engine)
+
+    def test_bank_size(self):
+        outputs = {}
+        for engine in ENGINES:
+            result = self.convert(engine, engine, bank_size=100)
+            self.assertEqual(len(result.output_files), 5)
+            banks = [pd.read_csv(output_file)
+                     for output_file in result.output_files]
+            for bank in banks:
+                self.assertEqual(bank['Location'].tolist(),
+                                 list(range(len(bank))))
+            combined = pd.concat(banks, ignore_index=True)
+            pd.testing.assert_frame_equal(
+                combined.drop(columns='Location'),
+                self.reference.drop(columns='Location'))
+            outputs[engine] = [os.path.basename(output_file)
+                               for output_file in result.output_files]
+        self.assertEqual(outputs['row'], outputs['vectorized'])
+        self.assertEqual(outputs['row'], outputs['stdlib'])
+
+    def test_bank_by_band(self):
+        result = self.convert('row', 'band', bank_by='band', bank_size=100)
+        names = [os.path.basename(output_file)
+                 for output_file in result.output_files]
+        self.assertIn('bank_003_2m.csv', names)
+        self.assertEqual(result.rows_written, len(self.reference))
+        for output_file in result.output_files:
+            band = output_file[:-len('.csv')].split('_')[-1]
+            bank = pd.read_csv(output_file)
+            self.assertLessEqual(len(bank), 100)
+            self.assertEqual(bank['Location'].tolist(),
+                             list(range(len(bank))))
+            self.assertEqual({band_of(frequency).name
+                              for frequency in bank['Frequency']}, {band})
+
+    def test_bank_file_name(self):
+        self.assertEqual(bank_file_name(0), 'bank_000.csv')
+        self.assertEqual(bank_file_name(12, '1.25m'), 'bank_012_1.25m.csv')
+        self.assertEqual(bank_file_name(3, 'Mt Vernon'),
+                         'bank_003_mt-vernon.csv')
+
+    def test_invalid_banks(self):
+        with self.assertRaises(ValueError):
+            BankWriter(bank_size=501)
+        with self.assertRaises(ValueError):
+            BankWriter(bank_size=0)
+        with self.assertRaises(ValueError):
+            BankWriter(bank_by='callsign')
+        self.assertEqual(
+            BankWriter(ChirpLimits(channel_min=1, channel_max=99)).bank_size,
+            99)
+
+        self.convert('stdlib', 'again')
+        result = Converter().convert_file_banked(
+            TEST_CSV, os.path.join(self.temp_dir.name, 'again'))
+        self.assertFalse(result.ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# tests/test_batch.py
+
+"""
+Unit Tests for batch conversion
+
+Purpose:
+    To ensure that batch jobs are built correctly from manifests and input
+    lists, and that parallel conversions each produce the same output as a
+    single conversion.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_batch.py
+
+Test Cases:
+    - test_read_manifest: Tests parsing a manifest file.
+    - test_jobs_from_inputs: Tests naming outputs in an output directory.
+    - test_run_batch: Tests parallel conversions against the reference.
+    - test_run_batch_reports_failures: Tests that a bad job does not stop
+      the batch.
+    - test_run_batch_duplicate_outputs: Tests rejecting clashing outputs.
+    - test_worker_logging: Tests that the parent writes worker records.
+    - test_main_errors: Tests reporting invalid arguments and manifests.
+"""
+
+import os
+import tempfile
+import unittest
+
+from wwara_chirp.batch import (BatchJob, jobs_from_inputs, main,
+                               read_manifest, run_batch)
+from wwara_chirp.log_setup import configure_logging
+
+TEST_CSV = os.path.abspath('test_files/WWARA-rptrlist-TEST.csv')
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open('test_files/reference_output.csv', 'r') as f:
+            self.reference_output = f.read()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def temp_path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_read_manifest(self):
+        manifest = self.temp_path('jobs.txt')
+        with open(manifest, 'w') as f:
+            f.write('# comment\n\n')
+            f.write(f'{TEST_CSV}, out/a.csv\n')
+            f.write('input.csv,b.csv\n')
+        jobs = read_manifest(manifest)
+        self.assertEqual(jobs, [
+            BatchJob(TEST_CSV, self.temp_path('out/a.csv')),
+            BatchJob(self.temp_path('input.csv'), self.temp_path('b.csv')),
+        ])
+
+        with open(manifest, 'w') as f:
+            f.write('only-one-field.csv\n')
+        with self.assertRaises(ValueError):
+            read_manifest(manifest)
+
+    def test_jobs_from_inputs(self):
+        jobs = jobs_from_inputs([TEST_CSV], 'out')
+        self.assertEqual(jobs, [BatchJob(
+            TEST_CSV, os.path.join('out', 'WWARA-rptrlist-TEST-chirp.csv'))])
+
+    def test_run_batch(self):
+        jobs = [BatchJob(TEST_CSV, self.temp_path(f'out{index}.csv'))
+                for index in range(3)]
+        results = run_batch(jobs, workers=2)
+        self.assertEqual([result.job for result in results], jobs)
+        for result in results:
+            self.assertTrue(result.ok, result.error)
+            with open(result.job.output_file, 'r') as f:
+                self.assertEqual(f.read(), self.reference_output)
+
+    def test_run_batch_reports_failures(self):
+        jobs = [BatchJob(self.temp_path('missing.csv'),
+                         self.temp_path('missing-out.csv')),
+                BatchJob(TEST_CSV, self.temp_path('out.csv'))]
+        results = run_batch(jobs, workers=2)
+        self.assertEqual([result.ok for result in results], [False, True])
+        self.assertNotEqual(results[0].error, '')
+
+    def test_run_batch_duplicate_outputs(self):
+        jobs = [BatchJob(TEST_CSV, self.temp_path('out.csv'))] * 2
+        with self.assertRaises(ValueError):
+            run_batch(jobs)
+        with self.assertRaises(ValueError):
+            run_batch(jobs[:1], workers=0)
+
+    def test_worker_logging(self):
+        log_file = self.temp_path('batch.log')
+        jobs = [BatchJob(TEST_CSV, self.temp_path(f'out{index}.csv'))
+                for index in range(3)]
+        logs = configure_logging(log_file, 'INFO')
+        try:
+            results = run_batch(jobs, workers=2)
+        finally:
+            logs.stop()
+        self.assertTrue(all(result.ok for result in results))
+        with open(log_file, 'r') as f:
+            lines = f.read().splitlines()
+        for job in jobs:
+            self.assertIn(f'Output file written: {job.output_file}',
+                          [line.split(' - ', 2)[2] for line in lines])
+
+    def test_main_errors(self):
+        manifest = self.temp_path('jobs.txt')
+        with open(manifest, 'w') as f:
+            f.write('only-one-field.csv\n')
+        duplicates = self.temp_path('duplicates.txt')
+        with open(duplicates, 'w') as f:
+            f.write(f'{TEST_CSV},out.csv\n{TEST_CSV},out.csv\n')
+        for argv in (['--manifest', manifest],
+                     ['--manifest', duplicates],
+                     ['--manifest', self.temp_path('missing.txt')],
+                     ['--manifest', duplicates, '--workers', '0']):
+            with self.assertRaises(SystemExit) as error:
+                main(argv)
+            self.assertEqual(error.exception.code, 2, argv)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# tests/test_chirp_buffer.py
+
+"""
+Unit Tests for ChirpRowBuffer
+
+Purpose:
+    To ensure that the CHIRP output accumulator keeps rows in order and
+    builds the same table as the old pd.concat accumulation.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_chirp_buffer.py
+
+Test Cases:
+    - test_append: Tests appending pd.Series and dict rows.
+    - test_extend_frame: Tests appending a whole CHIRP DataFrame.
+    - test_to_frame_matches_concat: Compares the CSV output with pd.concat.
+    - test_clear: Tests emptying the buffer.
+"""
+
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.chirp_buffer import ChirpRowBuffer
+from wwara_chirp.columns import CHIRP_COLUMNS
+from wwara_chirp.vectorized import convert_frame
+
+
+class TestChirpRowBuffer(unittest.TestCase):
+
+    def setUp(self):
+        df = pd.read_csv('test_files/WWARA-rptrlist-TEST.csv', skiprows=[0])
+        self.converted = convert_frame(df.head(20))
+
+    def test_append(self):
+        buffer = ChirpRowBuffer()
+        buffer.append(self.converted.iloc[0])
+        buffer.append({'Location': 1, 'Name': 'K7LED'})
+        self.assertEqual(len(buffer), 2)
+        chirp_table = buffer.to_frame()
+        self.assertEqual(list(chirp_table.columns), CHIRP_COLUMNS)
+        self.assertEqual(chirp_table['Name'].tolist(), ['W7RNB', 'K7LED'])
+        self.assertEqual(chirp_table['Tone'].tolist(), ['Tone', ''])
+
+    def test_extend_frame(self):
+        buffer = ChirpRowBuffer()
+        buffer.extend_frame(self.converted)
+        buffer.extend_frame(self.converted)
+        self.assertEqual(len(buffer), 40)
+        self.assertEqual(len(buffer.to_frame()), 40)
+
+    def test_to_frame_matches_concat(self):
+        buffer = ChirpRowBuffer()
+        buffer.extend(row for _, row in self.converted.iterrows())
+        concatenated = pd.concat(
+            [row.to_frame().T for _, row in self.converted.iterrows()],
+            ignore_index=True)
+        self.assertEqual(buffer.to_frame().to_csv(index=False),
+                         concatenated.to_csv(index=False))
+
+    def test_clear(self):
+        buffer = ChirpRowBuffer()
+        buffer.extend_frame(self.converted)
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertTrue(buffer.to_frame().empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
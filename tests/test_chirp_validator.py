@@ -31,10 +31,21 @@ Test Cases:
     - test_validate_name: Tests the validation of name values.
     - test_validate_comment: Tests the validation of comment values.
     - test_validate_row: Tests the validation of complete CHIRP rows.
+    - test_validate_frame: Tests the column-wise validation of a CHIRP table.
+    - test_validate_frame_matches_validate_row: Compares validate_frame with
+      validate_row on converted test data.
+    - test_validation_rules: Tests the lookup tables built from MockChirp.
+    - test_band_warnings: Tests the debug messages about band plan offsets.
 """
 
 import unittest
-from wwara_chirp.chirpvalidator import ChirpValidator
+
+import pandas as pd
+
+from wwara_chirp.chirpvalidator import (ChirpValidator, FRAME_ERROR_COLUMNS,
+                                        ValidationRules)
+from wwara_chirp.mock_chirp import MockChirp
+from wwara_chirp.vectorized import convert_frame
 
 
 class TestCHIRPValidator(unittest.TestCase):
@@ -79,6 +90,12 @@ class TestCHIRPValidator(unittest.TestCase):
         assert ChirpValidator.validate_tone('DTCS') == True
         assert ChirpValidator.validate_tone('') == True
         assert ChirpValidator.validate_tone('invalid') == False
+        assert ChirpValidator.validate_tone(88.5) == True
+        assert ChirpValidator.validate_tone('88.5') == True
+        assert ChirpValidator.validate_tone('100.00') == True
+        assert ChirpValidator.validate_tone(100) == True
+        assert ChirpValidator.validate_tone(88.6) == False
+        assert ChirpValidator.validate_tone(float('nan')) == False
 
     def test_validate_tone_mode(self):
         assert ChirpValidator.validate_tone_mode('Tone') == True
@@ -89,6 +106,9 @@ class TestCHIRPValidator(unittest.TestCase):
     def test_validate_dtcs_code(self):
         assert ChirpValidator.validate_dtcs_code(23) == True
         assert ChirpValidator.validate_dtcs_code('invalid') == False
+        assert ChirpValidator.validate_dtcs_code(23.0) == True
+        assert ChirpValidator.validate_dtcs_code(24) == False
+        assert ChirpValidator.validate_dtcs_code(float('nan')) == False
 
     def test_validate_dtcs_polarity(self):
         assert ChirpValidator.validate_dtcs_polarity('NN') == True
@@ -116,28 +136,123 @@ class TestCHIRPValidator(unittest.TestCase):
             'Duplex': '+',
             'Offset': '0.600',
             'Tone': 'Tone',
-            'DTCS Code': '023',
-            'DTCS Polarity': 'NN',
+            'DtcsCode': 23,
+            'DtcsPolarity': 'NN',
             'Mode': 'FM',
             'Name': 'Repeater',
             'Comment': 'This is a comment.'
         }
         assert ChirpValidator.validate_row(chirp_row) == True
 
+        dtcs_row = dict(chirp_row, Tone='DTCS')
+        assert ChirpValidator.validate_row(dtcs_row) == True
+        with self.assertLogs('wwara_chirp.chirpvalidator', 'ERROR') as logs:
+            assert ChirpValidator.validate_row(
+                dict(dtcs_row, DtcsCode=24)) == False
+            assert ChirpValidator.validate_row(
+                dict(dtcs_row, DtcsPolarity='XX')) == False
+        assert 'Invalid DTCS code: 24' in logs.output[0]
+        assert 'Invalid DTCS polarity: XX' in logs.output[1]
+
         invalid_chirp_row = {
             'Location': 500,
             'Frequency': 'invalid',
             'Duplex': 'invalid',
             'Offset': 'invalid',
             'Tone': 'invalid',
-            'DTCS Code': 'invalid',
-            'DTCS Polarity': 'invalid',
+            'DtcsCode': 'invalid',
+            'DtcsPolarity': 'invalid',
             'Mode': 'invalid',
             'Name': 'A' * 17,
             'Comment': 'A' * 256
         }
         assert ChirpValidator.validate_row(invalid_chirp_row) == False
 
+    def test_validate_frame(self):
+        chirp_table = pd.DataFrame([
+            {'Location': 100, 'Frequency': '145.000', 'Duplex': '+',
+             'Offset': '0.600', 'Tone': 'Tone', 'DtcsCode': 23,
+             'DtcsPolarity': 'NN', 'Mode': 'FM', 'Name': 'Repeater',
+             'Comment': 'This is a comment.'},
+            {'Location': 500, 'Frequency': 'invalid', 'Duplex': '+',
+             'Offset': '0.600', 'Tone': 'DTCS', 'DtcsCode': 24,
+             'DtcsPolarity': 'NN', 'Mode': 'FM', 'Name': 'Invalid@Name',
+             'Comment': ''},
+        ])
+        mask, errors = ChirpValidator.validate_frame(chirp_table)
+        assert mask.tolist() == [True, False]
+        assert list(errors.columns) == FRAME_ERROR_COLUMNS
+        assert set(errors['row']) == {1}
+        assert errors['field'].tolist() == [
+            'Location', 'Frequency', 'DtcsCode', 'Name']
+        assert errors['reason'].tolist() == [
+            'Invalid memory location', 'Invalid frequency',
+            'Invalid DTCS code', 'Invalid characters in name']
+
+    def test_validate_frame_matches_validate_row(self):
+        df = pd.read_csv('test_files/WWARA-rptrlist-TEST.csv', skiprows=[0])
+        chirp_table = convert_frame(df, start_channel=300)
+        mask, errors = ChirpValidator.validate_frame(chirp_table)
+        expected = [ChirpValidator.validate_row(chirp_row)
+                    for chirp_row in chirp_table.to_dict('records')]
+        assert mask.tolist() == expected
+        assert not mask.all()
+        assert set(errors['row']) == set(chirp_table.index[~mask])
+
+    def test_validation_rules(self):
+        class OtherChirp(MockChirp):
+            TONES = (67.0, 254.1)
+            DTCS_CODES = (23, 754)
+            MODES = ('FM',)
+
+        rules = ValidationRules.from_chirp(OtherChirp)
+        assert rules.is_tone('254.1') == True
+        assert rules.is_tone(254.10) == True
+        assert rules.is_tone(88.5) == False
+        assert 754 in rules.dtcs_codes and 25 not in rules.dtcs_codes
+        assert rules.modes == {'FM', ''}
+        assert rules.number_pattern.match('146.960000')
+        assert not rules.name_pattern.match('Invalid@Name')
+
+        validator = type('OtherValidator', (ChirpValidator,),
+                         {'rules': rules})
+        assert validator.validate_mode('NFM') == False
+        assert ChirpValidator.validate_mode('NFM') == True
+
+        chirp_table = pd.DataFrame({
+            'Location': [1, 2, 3, 4], 'Frequency': '146.960000',
+            'Duplex': '-', 'Offset': '0.600000',
+            'Tone': [88.5, '88.5', '88.50', 88.6], 'DtcsCode': 23,
+            'DtcsPolarity': 'NN', 'Mode': 'FM', 'Name': 'W7ABC',
+            'Comment': ''})
+        mask, errors = ChirpValidator.validate_frame(chirp_table)
+        assert mask.tolist() == [True, True, True, False]
+        assert mask.tolist() == [ChirpValidator.validate_tone(tone)
+                                 for tone in chirp_table['Tone']]
+
+    def test_band_warnings(self):
+        with self.assertLogs('wwara_chirp.chirpvalidator', 'DEBUG') as logs:
+            assert ChirpValidator.validate_offset('1.000000',
+                                                  '146.450000') == True
+            assert ChirpValidator.validate_offset('300.000000',
+                                                  '146.000000') == True
+            assert ChirpValidator.validate_offset('5.000000',
+                                                  '421.000000') == True
+            assert ChirpValidator.validate_frequency('162.550000') == True
+        assert len(logs.records) == 3
+        assert 'Non-standard offset for the 2m band' in logs.output[0]
+        assert 'Cross band repeater' in logs.output[1]
+        assert 'outside the amateur bands' in logs.output[2]
+
+        with self.assertNoLogs('wwara_chirp.chirpvalidator', 'DEBUG'):
+            assert ChirpValidator.validate_offset('0.600000',
+                                                  '146.960000') == True
+            assert ChirpValidator.validate_offset('1.600000',
+                                                  '224.860000') == True
+            assert ChirpValidator.validate_offset('5.000000',
+                                                  '442.100000') == True
+            assert ChirpValidator.validate_offset('0.600000') == True
+
 
 if __name__ == '__main__':
     unittest.main()
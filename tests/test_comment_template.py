@@ -0,0 +1,138 @@
+# tests/test_comment_template.py
+
+"""
+Unit Tests for the comment templates
+
+Purpose:
+    To ensure that the legacy template reproduces the original CHIRP
+    comments exactly, that the row and frame formatters agree, and that
+    templates can be configured from JSON files and the command line.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_comment_template.py
+
+Test Cases:
+    - test_legacy_template_matches_reference: Tests the default comments.
+    - test_format_frame_matches_format_row: Compares both formatters.
+    - test_overflow_policies: Tests skip, stop and truncate.
+    - test_load_template: Tests built-in names and JSON files.
+    - test_invalid_template: Tests rejecting unknown fields and options.
+    - test_process_file_comment_length: Tests the process_file option.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.comment_template import (BUILTIN_TEMPLATES, CommentItem,
+                                          CommentTemplate, LEGACY_TEMPLATE,
+                                          load_template)
+from wwara_chirp.wwara_chirp import process_file
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+
+
+class TestCommentTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.read_csv(TEST_CSV, skiprows=[0])
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_legacy_template_matches_reference(self):
+        reference = pd.read_csv('test_files/reference_output.csv',
+                                keep_default_na=False)
+        template = LEGACY_TEMPLATE.compile(255)
+        comments = [template.format_row(wwara_row)
+                    for index, wwara_row in self.df.iterrows()]
+        self.assertEqual(comments, reference['Comment'].tolist())
+
+        row = self.df.iloc[0].copy()
+        row['COMMENT'] = 'Net Tue'
+        row['RACES'] = 'Y'
+        comment = template.format_row(row)
+        self.assertTrue(comment.startswith('Net Tue   Lookout Mtn, WA'))
+        self.assertIn('Lon: -122.3625RACES DMR', comment)
+
+    def test_format_frame_matches_format_row(self):
+        df = self.df.copy()
+        df['COMMENT'] = df['COMMENT'].astype(object)
+        df.loc[0, 'COMMENT'] = 'A' * 200
+        df.loc[1, 'RACES'] = 'Y'
+        for name, template in BUILTIN_TEMPLATES.items():
+            for overflow in ('skip', 'stop', 'truncate'):
+                for max_length in (20, 60, 255):
+                    compiled = CommentTemplate(
+                        template.items, overflow).compile(max_length)
+                    expected = [compiled.format_row(wwara_row)
+                                for index, wwara_row in df.iterrows()]
+                    self.assertEqual(compiled.format_frame(df).tolist(),
+                                     expected,
+                                     f'{name} {overflow} {max_length}')
+
+    def test_overflow_policies(self):
+        row = {'CITY': 'Seattle', 'STATE': 'WA', 'SPONSOR': 'WWARA',
+               'URL': 'http://example.org'}
+        items = (CommentItem('{CITY}'), CommentItem(' {URL}'),
+                 CommentItem(' {SPONSOR}'))
+        comments = {
+            overflow: CommentTemplate(items, overflow, 15).compile()
+            .format_row(row)
+            for overflow in ('skip', 'stop', 'truncate')}
+        self.assertEqual(comments, {'skip': 'Seattle WWARA',
+                                    'stop': 'Seattle',
+                                    'truncate': 'Seattle http://'})
+
+    def test_load_template(self):
+        self.assertIs(load_template('legacy'), LEGACY_TEMPLATE)
+        self.assertEqual(load_template('short', 16).max_length, 16)
+
+        template_file = os.path.join(self.temp_dir.name, 'template.json')
+        with open(template_file, 'w') as f:
+            json.dump({'max_length': 24, 'overflow': 'truncate', 'items': [
+                {'text': '{LOCATION}', 'when': 'present'},
+                {'text': ' ARES', 'when': 'yes', 'fields': ['ARES']},
+            ]}, f)
+        template = load_template(template_file)
+        self.assertEqual(template.max_length, 24)
+        self.assertEqual(template.items[1].fields, ('ARES',))
+        self.assertEqual(CommentTemplate.from_dict(template.to_dict()),
+                         template)
+        self.assertEqual(template.compile().format_row(self.df.iloc[0]),
+                         'Lookout Mtn, WA WASHINGT')
+
+    def test_invalid_template(self):
+        with self.assertRaises(ValueError):
+            load_template('no-such-template')
+        with self.assertRaises(ValueError):
+            CommentTemplate.from_dict({'items': [{'text': '{CALLSIGN}'}]})
+        with self.assertRaises(ValueError):
+            CommentTemplate.from_dict({'items': [{'text': ' ARES',
+                                                  'when': 'yes'}]})
+        with self.assertRaises(ValueError):
+            CommentTemplate.from_dict({'items': [{'text': '{CITY}',
+                                                  'width': 10}]})
+        with self.assertRaises(ValueError):
+            CommentTemplate.from_dict({'overflow': 'wrap', 'items': []})
+
+    def test_process_file_comment_length(self):
+        for engine in ('row', 'vectorized', 'stdlib'):
+            output_file = os.path.join(self.temp_dir.name, f'{engine}.csv')
+            process_file(TEST_CSV, output_file, engine=engine,
+                         comment_template=load_template('short', 12))
+            chirp_table = pd.read_csv(output_file, keep_default_na=False)
+            self.assertEqual(len(chirp_table), len(self.df))
+            self.assertTrue((chirp_table['Comment'].str.len() <= 12).all())
+            self.assertEqual(chirp_table['Comment'][0], 'Lookout Mtn')
+
+
+if __name__ == '__main__':
+    unittest.main()
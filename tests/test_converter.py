@@ -0,0 +1,112 @@
+# tests/test_converter.py
+
+"""
+Unit Tests for the Converter class
+
+Purpose:
+    To ensure that each Converter owns its channel counter, limits and
+    output buffer, so that conversions can run concurrently in one
+    process.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_converter.py
+
+Test Cases:
+    - test_convert_file: Tests a conversion against the reference output.
+    - test_concurrent_conversions: Tests conversions running in threads.
+    - test_limits: Tests converting with custom CHIRP limits, also
+      through the process_frame wrappers.
+    - test_add_row: Tests the output buffer API.
+    - test_unknown_engine: Tests rejecting an unknown engine.
+"""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from wwara_chirp.chirpvalidator import (ChirpLimits, ChirpValidator,
+                                        DEFAULT_LIMITS)
+from wwara_chirp.converter import Converter
+from wwara_chirp.wwara_chirp import process_frame, process_frame_vectorized
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+
+
+class TestConverter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open('test_files/reference_output.csv', 'r') as f:
+            self.reference_output = f.read()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def convert(self, name, engine='row'):
+        output_file = os.path.join(self.temp_dir.name, name)
+        result = Converter(engine=engine).convert_file(TEST_CSV, output_file)
+        with open(output_file, 'r') as f:
+            return result, f.read()
+
+    def test_convert_file(self):
+        result, output = self.convert('output.csv')
+        self.assertTrue(result.ok)
+        self.assertEqual(result.rows_read, 434)
+        self.assertEqual(output, self.reference_output)
+
+    def test_concurrent_conversions(self):
+        engines = ['row', 'vectorized'] * 4
+        with ThreadPoolExecutor(max_workers=len(engines)) as executor:
+            futures = [executor.submit(self.convert, f'out{index}.csv',
+                                       engine)
+                       for index, engine in enumerate(engines)]
+            outputs = [future.result()[1] for future in futures]
+        for output in outputs:
+            self.assertEqual(output, self.reference_output)
+
+    def test_limits(self):
+        limits = ChirpLimits(channel_max=9, comment_length_max=40)
+        converter = Converter(limits=limits, engine='vectorized')
+        df = pd.read_csv(TEST_CSV, skiprows=[0])
+        chirp_table = converter.process_frame(df)
+        self.assertEqual(chirp_table['Location'].tolist(), list(range(10)))
+        self.assertTrue((chirp_table['Comment'].str.len() <= 40).all())
+        self.assertEqual(ChirpValidator.channel_max, 499)
+        self.assertTrue(ChirpValidator.validate_location(100))
+        self.assertFalse(converter.validator.validate_location(100))
+
+        validator = ChirpValidator.with_limits(limits)
+        self.assertEqual(validator.limits(), limits)
+        self.assertEqual(ChirpValidator.limits(), DEFAULT_LIMITS)
+        for engine in ('row', 'vectorized'):
+            chirp_table = process_frame(df, validator, engine)
+            self.assertEqual(chirp_table['Location'].tolist(),
+                             list(range(10)))
+        chirp_table = process_frame_vectorized(df, validator())
+        self.assertTrue((chirp_table['Comment'].str.len() <= 40).all())
+
+    def test_add_row(self):
+        df = pd.read_csv(TEST_CSV, skiprows=[0])
+        converter = Converter()
+        for index, wwara_row in df.head(3).iterrows():
+            self.assertTrue(converter.add_row(wwara_row))
+        self.assertEqual(converter.add_frame(df.iloc[3:5]), 2)
+        self.assertEqual(converter.to_frame()['Location'].tolist(),
+                         [0, 1, 2, 3, 4])
+        converter.reset()
+        self.assertEqual(converter.channel, 0)
+        self.assertTrue(converter.to_frame().empty)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Converter(engine='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
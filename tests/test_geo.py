@@ -0,0 +1,200 @@
+# tests/test_geo.py
+
+"""
+Unit Tests for geographic selection
+
+Purpose:
+    To ensure that repeaters are selected by distance from a point and
+    by bounding box the same way by every engine, that the grid index
+    finds the same repeaters as a full scan, and that selected
+    repeaters can be numbered by distance.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_geo.py
+
+Test Cases:
+    - test_haversine: Tests the scalar and array distances.
+    - test_parse: Tests parsing and rejecting points and boxes.
+    - test_geo_index: Tests radius and box queries of the grid index.
+    - test_select_frame_and_records: Tests that both paths, and the
+      indexed path, agree.
+    - test_convert_file: Tests filtered, distance ordered conversions.
+    - test_text_coordinates: Tests that every engine selects the same
+      repeaters when a coordinate column is read as text.
+"""
+
+import math
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.converter import Converter
+from wwara_chirp.core import ENGINES
+from wwara_chirp.geo import (GeoFilter, GeoIndex, haversine_km,
+                             haversine_km_array, parse_bbox, parse_point)
+from wwara_chirp.stdlib_backend import read_input
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+
+SEATTLE = (47.6062, -122.3321)
+TACOMA = (47.2529, -122.4443)
+
+
+class TestGeo(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.read_csv(TEST_CSV, skiprows=[0])
+        self.records = read_input(TEST_CSV)
+
+    def test_haversine(self):
+        distance = haversine_km(*SEATTLE, *TACOMA)
+        self.assertAlmostEqual(distance, 40.1, delta=0.5)
+        self.assertEqual(haversine_km(*SEATTLE, *SEATTLE), 0.0)
+        self.assertAlmostEqual(haversine_km(0, 179.5, 0, -179.5),
+                               haversine_km(0, 0, 0, 1))
+
+        distances = haversine_km_array([TACOMA[0], math.nan],
+                                       [TACOMA[1], 0.0], *SEATTLE)
+        self.assertAlmostEqual(distances[0], distance)
+        self.assertTrue(math.isnan(distances[1]))
+
+    def test_parse(self):
+        self.assertEqual(parse_point('47.6, -122.3'), (47.6, -122.3))
+        self.assertEqual(parse_bbox('47,-123,48,-122'),
+                         (47.0, -123.0, 48.0, -122.0))
+        for text in ('47.6', '47.6,-122.3,0', 'north,west', '91,0',
+                     '0,181'):
+            with self.assertRaises(ValueError):
+                parse_point(text)
+        with self.assertRaises(ValueError):
+            parse_bbox('48,-123,47,-122')
+        with self.assertRaises(ValueError):
+            GeoFilter.from_args(near='47.6,-122.3')
+        with self.assertRaises(ValueError):
+            GeoFilter.from_args(near='47.6,-122.3', radius_km=0)
+        with self.assertRaises(ValueError):
+            GeoFilter.from_args(bbox='47,-123,48,-122', sort=True)
+
+    def test_geo_index(self):
+        index = GeoIndex(self.df['LATITUDE'].tolist(),
+                         self.df['LONGITUDE'].tolist())
+        self.assertEqual(len(index), self.df[['LATITUDE', 'LONGITUDE']]
+                         .dropna().shape[0])
+
+        for radius_km in (1, 25, 150):
+            found = index.within_radius(*SEATTLE, radius_km)
+            distances = haversine_km_array(self.df['LATITUDE'],
+                                           self.df['LONGITUDE'], *SEATTLE)
+            expected = sorted(position for position, distance
+                              in enumerate(distances)
+                              if distance <= radius_km)
+            self.assertEqual(sorted(position for _, position in found),
+                             expected)
+            self.assertEqual([distance for distance, _ in found],
+                             sorted(distance for distance, _ in found))
+
+        bbox = (47.0, -123.0, 48.0, -122.0)
+        expected = self.df.index[self.df['LATITUDE'].between(47, 48)
+                                 & self.df['LONGITUDE'].between(-123, -122)]
+        self.assertEqual(index.within_bbox(bbox), expected.tolist())
+
+        wrapped = GeoIndex([10.0, 10.0, 10.0], [179.9, -179.9, 0.0])
+        self.assertEqual(wrapped.within_bbox((0, 179, 20, -179)), [0, 1])
+        self.assertEqual([position for _, position
+                          in wrapped.within_radius(10.0, 180.0, 50)], [0, 1])
+
+    def test_select_frame_and_records(self):
+        geo_filters = [
+            GeoFilter.from_args(near='47.61,-122.33', radius_km=25),
+            GeoFilter.from_args(near='47.61,-122.33', radius_km=25,
+                                sort=True),
+            GeoFilter.from_args(bbox='47,-123,48,-122'),
+            GeoFilter.from_args(near='47.61,-122.33', radius_km=80,
+                                bbox='47,-123,48,-122', sort=True),
+        ]
+        index = GeoIndex.from_frame(self.df)
+        for geo_filter in geo_filters:
+            selected = geo_filter.select_frame(self.df)
+            records = geo_filter.select_records(self.records)
+            self.assertGreater(len(selected), 0)
+            self.assertEqual(selected['FC_RECORD_ID'].tolist(),
+                             [record['FC_RECORD_ID'] for record in records],
+                             str(geo_filter))
+            self.assertTrue(selected.equals(
+                geo_filter.select_frame(self.df, index)), str(geo_filter))
+
+        text = self.df.astype({'LATITUDE': object})
+        text.loc[0, 'LATITUDE'] = 'unknown'
+        for geo_index in (None, GeoIndex.from_frame(text)):
+            selected = geo_filters[2].select_frame(text, geo_index)
+            self.assertNotIn(self.df['FC_RECORD_ID'][0],
+                             selected['FC_RECORD_ID'].tolist())
+
+        nearest = geo_filters[1].select_frame(self.df)
+        distances = haversine_km_array(nearest['LATITUDE'],
+                                       nearest['LONGITUDE'], 47.61, -122.33)
+        self.assertEqual(list(distances), sorted(distances))
+        self.assertLessEqual(distances.max(), 25)
+
+    def test_convert_file(self):
+        geo_filter = GeoFilter.from_args(near='47.61,-122.33', radius_km=25,
+                                         sort=True)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outputs = {}
+            for engine in ENGINES:
+                output_file = os.path.join(temp_dir, f'{engine}.csv')
+                result = Converter(engine=engine,
+                                   geo_filter=geo_filter).convert_file(
+                    TEST_CSV, output_file)
+                self.assertTrue(result.ok)
+                self.assertEqual(result.rows_read, len(self.df))
+                with open(output_file) as f:
+                    outputs[engine] = f.read()
+            self.assertEqual(outputs['row'], outputs['vectorized'])
+            self.assertEqual(outputs['row'], outputs['stdlib'])
+
+            chirp_df = pd.read_csv(os.path.join(temp_dir, 'row.csv'))
+            self.assertEqual(chirp_df['Location'].tolist(),
+                             list(range(len(chirp_df))))
+            self.assertLess(len(chirp_df), len(self.df))
+
+    def test_text_coordinates(self):
+        index = GeoIndex(['47.6', ' 47.6 ', 'inf', 'nan', 'unknown'],
+                         ['-122.3'] * 5)
+        self.assertEqual(len(index), 2)
+
+        with open(TEST_CSV) as f:
+            spec_line = f.readline()
+        df = pd.read_csv(TEST_CSV, skiprows=[0], dtype=str,
+                         keep_default_na=False)
+        df.loc[0, 'LATITUDE'] = 'unknown'
+        geo_filter = GeoFilter.from_args(near='47.61,-122.33', radius_km=25)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'text.csv')
+            with open(input_file, 'w', newline='') as f:
+                f.write(spec_line)
+                df.to_csv(f, index=False)
+            self.assertIsInstance(read_input(input_file)[2]['LATITUDE'],
+                                  str)
+
+            outputs = {}
+            for engine in ENGINES:
+                output_file = os.path.join(temp_dir, f'{engine}.csv')
+                result = Converter(engine=engine,
+                                   geo_filter=geo_filter).convert_file(
+                    input_file, output_file)
+                self.assertTrue(result.ok)
+                with open(output_file) as f:
+                    outputs[engine] = f.read()
+            self.assertEqual(outputs['row'], outputs['vectorized'])
+            self.assertEqual(outputs['row'], outputs['stdlib'])
+            self.assertGreater(len(outputs['row'].splitlines()), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
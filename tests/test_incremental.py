@@ -0,0 +1,151 @@
+# tests/test_incremental.py
+
+"""
+Unit Tests for incremental conversion with a state cache
+
+Purpose:
+    To ensure that records unchanged since the cached run are reused, that
+    changes are reported correctly, and that the output always matches a
+    full conversion.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_incremental.py
+
+Test Cases:
+    - test_first_run: Tests a run without a cache file.
+    - test_second_run_reuses_rows: Tests that unchanged rows are not
+      converted again.
+    - test_change_summary: Tests added, removed and modified records.
+    - test_duplicate_ids: Tests that records sharing an FC_RECORD_ID are
+      reused on the next run.
+    - test_process_file_incremental: Tests the process_file integration.
+    - test_settings_change: Tests that another comment template starts
+      from an empty cache.
+"""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp import wwara_chirp
+from wwara_chirp.chirpvalidator import ChirpValidator
+from wwara_chirp.comment_template import SHORT_TEMPLATE
+from wwara_chirp.converter import Converter
+from wwara_chirp.incremental import StateCache, convert_incremental
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temp_dir.name, 'state.json')
+        self.df = pd.read_csv(TEST_CSV, skiprows=[0])
+        self.validator = ChirpValidator()
+        self.converted = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def counting_process_row(self, wwara_row):
+        self.converted += 1
+        return wwara_chirp.process_row(wwara_row)
+
+    def convert(self, df):
+        cache = StateCache.load(self.cache_file)
+        chirp_table, cache, summary = convert_incremental(
+            df, cache, self.counting_process_row, self.validator)
+        cache.save(self.cache_file)
+        return chirp_table, summary
+
+    def test_first_run(self):
+        chirp_table, summary = self.convert(self.df)
+        self.assertEqual(self.converted, len(self.df))
+        self.assertEqual(len(summary.added), len(self.df))
+        self.assertEqual(summary.unchanged, 0)
+        self.assertEqual(len(StateCache.load(self.cache_file)), len(self.df))
+
+    def test_second_run_reuses_rows(self):
+        first_table, _ = self.convert(self.df)
+        self.converted = 0
+        second_table, summary = self.convert(self.df)
+        self.assertEqual(self.converted, 0)
+        self.assertEqual(summary.unchanged, len(self.df))
+        self.assertEqual(first_table.to_csv(index=False),
+                         second_table.to_csv(index=False))
+
+    def test_change_summary(self):
+        self.convert(self.df)
+        changed = self.df.iloc[1:].copy()
+        changed.loc[2, 'CALL'] = 'K7NEW'
+        new_record = changed.iloc[[0]].copy()
+        new_record['FC_RECORD_ID'] = 999999
+        changed = pd.concat([changed, new_record], ignore_index=True)
+
+        self.converted = 0
+        chirp_table, summary = self.convert(changed)
+        self.assertEqual(self.converted, 2)
+        self.assertEqual(summary.added, ['999999'])
+        self.assertEqual(summary.removed,
+                         [str(self.df.loc[0, 'FC_RECORD_ID'])])
+        self.assertEqual(summary.modified,
+                         [str(self.df.loc[2, 'FC_RECORD_ID'])])
+        self.assertIn('K7NEW', chirp_table['Name'].tolist())
+
+        full_table = Converter().process_frame(changed)
+        self.assertEqual(chirp_table.to_csv(index=False),
+                         full_table.to_csv(index=False))
+
+    def test_duplicate_ids(self):
+        duplicated = self.df.copy()
+        duplicate_id = str(duplicated.loc[0, 'FC_RECORD_ID'])
+        duplicated.loc[1, 'FC_RECORD_ID'] = duplicated.loc[0, 'FC_RECORD_ID']
+        self.convert(duplicated)
+        self.assertEqual(len(StateCache.load(self.cache_file)),
+                         len(duplicated))
+
+        self.converted = 0
+        chirp_table, summary = self.convert(duplicated)
+        self.assertEqual(self.converted, 0)
+        self.assertEqual(summary.modified, [])
+        self.assertEqual(summary.unchanged, len(duplicated))
+
+        chirp_table, summary = self.convert(duplicated.drop(index=1))
+        self.assertEqual(summary.removed, [duplicate_id])
+        self.assertEqual(summary.unchanged, len(duplicated) - 1)
+
+    def test_process_file_incremental(self):
+        output_file = os.path.join(self.temp_dir.name, 'output.csv')
+        for run in range(2):
+            summary = wwara_chirp.process_file(
+                TEST_CSV, output_file, state_cache=self.cache_file)
+            with open(output_file, 'r') as f:
+                output = f.read()
+            with open('test_files/reference_output.csv', 'r') as f:
+                reference_output = f.read()
+            self.assertEqual(output, reference_output)
+            os.remove(output_file)
+        self.assertEqual(summary.unchanged, len(self.df))
+
+    def test_settings_change(self):
+        output_file = os.path.join(self.temp_dir.name, 'output.csv')
+        wwara_chirp.process_file(TEST_CSV, output_file,
+                                 state_cache=self.cache_file)
+        os.remove(output_file)
+        summary = wwara_chirp.process_file(
+            TEST_CSV, output_file, state_cache=self.cache_file,
+            comment_template=SHORT_TEMPLATE)
+        self.assertEqual(summary.unchanged, 0)
+        self.assertEqual(len(summary.added), len(self.df))
+        chirp_table = pd.read_csv(output_file, keep_default_na=False)
+        self.assertEqual(chirp_table['Comment'][0], 'Lookout Mtn')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# tests/test_log_setup.py
+
+"""
+Unit Tests for the logging setup
+
+Purpose:
+    To ensure that the package's records reach the configured log file
+    at the configured level, directly or through a queue, and that
+    repeated warnings and errors are counted by reason instead of being
+    logged one by one.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_log_setup.py
+
+Test Cases:
+    - test_log_file: Tests the log file path and level, with and
+      without the queue.
+    - test_repeats: Tests counting repeated errors by reason.
+"""
+
+import logging
+import os
+import tempfile
+import unittest
+
+from wwara_chirp.log_setup import configure_logging, message_reason
+
+log = logging.getLogger('wwara_chirp.chirpvalidator')
+
+
+class TestLogSetup(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.package_log = logging.getLogger('wwara_chirp')
+        self.level = self.package_log.level
+
+    def tearDown(self):
+        self.package_log.setLevel(self.level)
+        self.temp_dir.cleanup()
+
+    def read_log(self, log_file):
+        with open(log_file) as f:
+            return [line.split(' - ', 2)[1:] for line in f.read().splitlines()]
+
+    def test_log_file(self):
+        for queue_records in (False, True):
+            log_file = os.path.join(self.temp_dir.name, f'{queue_records}',
+                                    'wwara.log')
+            logs = configure_logging(log_file, 'INFO', queue_records)
+            log.debug('Not logged')
+            log.info('Output file written: chirp.csv')
+            log.error('Invalid mode: XX')
+            logs.stop()
+            logs.stop()
+            log.error('After stop')
+            self.assertEqual(self.read_log(log_file),
+                             [['INFO', 'Output file written: chirp.csv'],
+                              ['ERROR', 'Invalid mode: XX']])
+
+    def test_repeats(self):
+        self.assertEqual(message_reason('Invalid name length: A: B'),
+                         'Invalid name length')
+        log_file = os.path.join(self.temp_dir.name, 'wwara.log')
+        logs = configure_logging(log_file, queue_records=True,
+                                 repeat_limit=2)
+        for location in range(500, 505):
+            log.error(f'Invalid memory location: {location}')
+        log.warning('Cross band repeater: 439.725000 MHz')
+        log.info('Output file written: chirp.csv')
+        logs.stop()
+        self.assertEqual(self.read_log(log_file), [
+            ['ERROR', 'Invalid memory location: 500'],
+            ['ERROR', 'Invalid memory location: 501'],
+            ['WARNING', 'Cross band repeater: 439.725000 MHz'],
+            ['INFO', 'Output file written: chirp.csv'],
+            ['ERROR', 'Repeated: Invalid memory location: 5 time(s), '
+                      '2 logged'],
+            ['WARNING', 'Repeated: Cross band repeater: 1 time(s), '
+                        '1 logged'],
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
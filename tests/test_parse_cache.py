@@ -0,0 +1,150 @@
+# tests/test_parse_cache.py
+
+"""
+Unit Tests for the parse cache
+
+Purpose:
+    To ensure that a parsed WWARA table is saved and reused while its
+    input is unchanged, that a changed input or data specification
+    version is parsed again, and that conversions through the cache
+    write the same output as without it.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_parse_cache.py
+
+Test Cases:
+    - test_reuse: Tests that an unchanged input is read from the cache.
+    - test_invalidation: Tests changed inputs, versions and bad files.
+    - test_untrusted_files: Tests that truncated, corrupt and pickled
+      cache files are parsed again and never unpickled.
+    - test_convert_file: Tests conversions through the cache.
+"""
+
+import filecmp
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.converter import Converter, read_wwara_frame
+from wwara_chirp.core import ENGINES
+from wwara_chirp.parse_cache import cache_path, read_cached
+from wwara_chirp.stdlib_backend import read_input
+from wwara_chirp.wwara_extract import read_spec_version
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+
+class RemoveOnUnpickle:
+    """Pickles to a call that removes a file when it is unpickled."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return os.remove, (self.path,)
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.temp_dir.name,
+                                       os.path.basename(TEST_CSV))
+        shutil.copy(TEST_CSV, self.input_file)
+        self.reads = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def counting_read(self, input_file, member):
+        self.reads += 1
+        return read_wwara_frame(input_file, member)
+
+    def read(self):
+        return read_cached(self.input_file, 'rptrlist', 'frame',
+                           self.counting_read)
+
+    def test_reuse(self):
+        first = self.read()
+        self.assertTrue(os.path.isfile(
+            cache_path(self.input_file, 'rptrlist', 'frame')))
+        second = self.read()
+        self.assertEqual(self.reads, 1)
+        pd.testing.assert_frame_equal(first, second)
+        pd.testing.assert_frame_equal(second, read_wwara_frame(TEST_CSV))
+
+    def test_invalidation(self):
+        self.read()
+        with open(self.input_file, 'a') as f:
+            f.write('\n')
+        self.read()
+        self.assertEqual(self.reads, 2)
+
+        with open(self.input_file) as f:
+            lines = f.readlines()
+        lines[0] = 'DATA_SPEC_VERSION=2099.1.1\n'
+        with open(self.input_file, 'w') as f:
+            f.writelines(lines)
+        self.assertEqual(read_spec_version(self.input_file), '2099.1.1')
+        self.read()
+        self.assertEqual(self.reads, 3)
+
+        with open(cache_path(self.input_file, 'rptrlist', 'frame'),
+                  'wb') as f:
+            f.write(b'not a cache')
+        self.read()
+        self.read()
+        self.assertEqual(self.reads, 4)
+
+    def test_untrusted_files(self):
+        marker_file = os.path.join(self.temp_dir.name, 'marker')
+        open(marker_file, 'w').close()
+        payload = pickle.dumps({'key': None,
+                                'table': RemoveOnUnpickle(marker_file)})
+
+        for kind, read in (('frame', self.counting_read),
+                           ('records', read_input)):
+            cache_file = cache_path(self.input_file, 'rptrlist', kind)
+            expected = read_cached(self.input_file, 'rptrlist', kind, read)
+            with open(cache_file, 'rb') as f:
+                cached = f.read()
+            for contents in (cached[:len(cached) // 2], cached[:1],
+                             b'{"key": {}, "rows": 1}', b'PK\x03\x04',
+                             payload):
+                with open(cache_file, 'wb') as f:
+                    f.write(contents)
+                table = read_cached(self.input_file, 'rptrlist', kind, read)
+                self.assertEqual(len(table), len(expected))
+                self.assertTrue(os.path.exists(marker_file))
+        self.assertEqual(self.reads, 6)
+
+    def test_convert_file(self):
+        for engine in ENGINES:
+            for run in range(2):
+                output_file = os.path.join(self.temp_dir.name,
+                                           f'{engine}-{run}.csv')
+                result = Converter(engine=engine,
+                                   parse_cache='').convert_file(
+                    self.input_file, output_file)
+                self.assertTrue(result.ok)
+                self.assertTrue(filecmp.cmp(output_file, REFERENCE_CSV,
+                                            shallow=False), engine)
+
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        output_file = os.path.join(self.temp_dir.name, 'cache-dir.csv')
+        Converter(parse_cache=cache_dir).convert_file(self.input_file,
+                                                      output_file)
+        self.assertTrue(os.path.isfile(
+            cache_path(self.input_file, 'rptrlist', 'frame', cache_dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# tests/test_profiles.py
+
+"""
+Unit Tests for radio profiles
+
+Purpose:
+    To ensure that radio profiles are checked and loaded, that the chirp
+    profile writes the reference CHIRP file, and that several profiles
+    rendered from one conversion get their own columns, defaults,
+    Locations, modes and limits.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_profiles.py
+
+Test Cases:
+    - test_profile: Tests checking, loading and saving profiles.
+    - test_chirp_profile: Tests the chirp profile against the reference.
+    - test_profiles: Tests rendering several profiles in one pass.
+    - test_locations: Tests that a profile's Locations start at its first
+      memory, have no gaps and fill the radio.
+    - test_no_comments: Tests a profile without comments, and that a
+      rejected input creates no output directory.
+"""
+
+import filecmp
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.chirpvalidator import ChirpLimits
+from wwara_chirp.converter import Converter
+from wwara_chirp.profiles import (BUILTIN_PROFILES, ProfileRenderer,
+                                  RadioProfile, load_profile,
+                                  profile_outputs)
+from wwara_chirp.profiling import Profiler
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+
+class TestProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_profile(self):
+        for config in ({'name': 'x', 'columns': ['Location', 'Colour']},
+                       {'name': 'x', 'columns': ['Name', 'Frequency']},
+                       {'name': 'x', 'defaults': {'Frequency': '146'}},
+                       {'name': 'x', 'modes': ['FM', 'C4FM']},
+                       {'name': 'x', 'mode_fallbacks': {'DV': 'D-STAR'}},
+                       {'name': 'x', 'limits': {'channels': 10}},
+                       {'name': 'x', 'memory': 10},
+                       {'columns': ['Location', 'Frequency']}):
+            with self.assertRaises(ValueError, msg=config):
+                RadioProfile.from_dict(config)
+        with self.assertRaises(ValueError):
+            load_profile('no-such-radio')
+        with self.assertRaises(ValueError):
+            profile_outputs('out', [BUILTIN_PROFILES['uv5r']] * 2)
+
+        profile_file = os.path.join(self.temp_dir.name, 'mobile.json')
+        with open(profile_file, 'w') as f:
+            json.dump({'name': 'mobile',
+                       'limits': {'channel_max': 199},
+                       'columns': ['Location', 'Name', 'Frequency',
+                                   'Mode', 'Bank'],
+                       'defaults': {'Power': '50W', 'Bank': 'WWARA'},
+                       'modes': ['FM', 'NFM'],
+                       'mode_fallbacks': {'DV': 'FM'}}, f)
+        profile = load_profile(profile_file)
+        self.assertEqual(profile.limits, ChirpLimits(channel_max=199))
+        self.assertEqual(profile.modes, frozenset(['FM', 'NFM']))
+        self.assertEqual(profile.default_values()['Power'], '50W')
+        self.assertEqual(RadioProfile.from_dict(profile.to_dict()), profile)
+        for profile in BUILTIN_PROFILES.values():
+            self.assertEqual(RadioProfile.from_dict(profile.to_dict()),
+                             profile)
+            self.assertIs(load_profile(profile.name), profile)
+
+    def test_chirp_profile(self):
+        output_file = os.path.join(self.temp_dir.name, 'chirp.csv')
+        result = Converter().convert_file_profiles(
+            TEST_CSV, output_file, [load_profile('chirp')])
+        self.assertEqual(result.output_files, (output_file,))
+        self.assertTrue(filecmp.cmp(output_file, REFERENCE_CSV,
+                                    shallow=False))
+        self.assertFalse(Converter().convert_file_profiles(
+            TEST_CSV, output_file, [load_profile('chirp')]).ok)
+
+    def test_profiles(self):
+        limits = ChirpLimits(channel_max=99, comment_length_max=40)
+        profiles = [RadioProfile('small', limits=limits),
+                    BUILTIN_PROFILES['uv5r'], BUILTIN_PROFILES['ft60']]
+        output_dir = os.path.join(self.temp_dir.name, 'radios')
+        profiler = Profiler()
+        converter = Converter(engine='vectorized', profiler=profiler)
+        result = converter.convert_file_profiles(TEST_CSV, output_dir,
+                                                 profiles)
+        self.assertEqual(profiler.calls['read'], 1)
+        self.assertEqual(result.output_files, tuple(
+            os.path.join(output_dir, f'{name}.csv')
+            for name in ('small', 'uv5r', 'ft60')))
+        small, uv5r, ft60 = (pd.read_csv(output_file, keep_default_na=False)
+                             for output_file in result.output_files)
+        self.assertEqual(result.rows_written,
+                         len(small) + len(uv5r) + len(ft60))
+
+        expected_file = os.path.join(self.temp_dir.name, 'small.csv')
+        Converter(limits=ChirpLimits(comment_length_max=40),
+                  engine='vectorized').convert_file(TEST_CSV, expected_file)
+        expected = pd.read_csv(expected_file, keep_default_na=False).head(100)
+        pd.testing.assert_frame_equal(
+            small, expected.assign(Location=range(100)))
+
+        self.assertNotIn('URCALL', uv5r.columns)
+        self.assertEqual(set(uv5r['Mode']), {'FM', 'NFM'})
+        self.assertEqual(set(uv5r['Power']), {'4.0W'})
+        self.assertLessEqual(uv5r['Location'].max(), 127)
+        self.assertLessEqual(uv5r['Name'].str.len().max(), 7)
+
+        self.assertEqual(set(ft60['Mode']), {'FM'})
+        self.assertEqual(ft60['Location'].tolist(),
+                         list(range(1, len(ft60) + 1)))
+        self.assertLessEqual(ft60['Name'].str.len().max(), 6)
+        table = ProfileRenderer(Converter().read_frame(TEST_CSV)).table
+        fm_rows = table[table['Mode'].isin(['FM', 'NFM'])]
+        self.assertEqual(len(ft60), fm_rows['Frequency'].astype(float)
+                         .between(108, 520).sum())
+
+    def test_locations(self):
+        profile = BUILTIN_PROFILES['uv5r']
+        renderer = ProfileRenderer(Converter().read_frame(TEST_CSV))
+        with self.assertLogs('wwara_chirp.profiles', 'WARNING') as logs:
+            chirp_table = renderer.render(profile)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(chirp_table['Location'].tolist(),
+                         list(range(profile.limits.channel_min,
+                                    profile.limits.channel_max + 1)))
+        frequency = chirp_table['Frequency'].astype(float)
+        self.assertTrue(frequency.between(136, 520).all())
+
+    def test_no_comments(self):
+        profile = RadioProfile(
+            'quiet', limits=ChirpLimits(comment_length_max=0))
+        renderer = ProfileRenderer(Converter().read_frame(TEST_CSV))
+        chirp_table = renderer.render(profile)
+        self.assertEqual(len(chirp_table), len(pd.read_csv(REFERENCE_CSV)))
+        self.assertEqual(set(chirp_table['Comment']), {''})
+
+        output_dir = os.path.join(self.temp_dir.name, 'radios')
+        result = Converter().convert_file_profiles(
+            'test_files/missing.csv', output_dir,
+            [profile, BUILTIN_PROFILES['uv5r']])
+        self.assertFalse(result.ok)
+        self.assertFalse(os.path.exists(output_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# tests/test_profiling.py
+
+"""
+Unit Tests for conversion profiling
+
+Purpose:
+    To ensure that a Profiler times every stage of a conversion with each
+    engine, counts rejected rows by the validator check that rejected
+    them, does not change the output, and that NULL_PROFILER leaves the
+    conversion code unchanged.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_profiling.py
+
+Test Cases:
+    - test_report: Tests the stages, row counts and JSON report.
+    - test_rejections: Tests rejected rows by reason with tight limits.
+    - test_null_profiler: Tests that disabled profiling adds nothing.
+"""
+
+import filecmp
+import json
+import os
+import tempfile
+import unittest
+
+from wwara_chirp.chirpvalidator import ChirpLimits, ChirpValidator
+from wwara_chirp.converter import Converter
+from wwara_chirp.core import ENGINES
+from wwara_chirp.profiling import NULL_PROFILER, STAGES, Profiler
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def convert(self, name, chunksize=None, **settings):
+        profiler = Profiler()
+        output_file = os.path.join(self.temp_dir.name, f'{name}.csv')
+        result = Converter(profiler=profiler, **settings).convert_file(
+            TEST_CSV, output_file, chunksize=chunksize)
+        self.assertTrue(result.ok)
+        profiler.finish(result.rows_read, result.rows_written)
+        return profiler, output_file
+
+    def test_report(self):
+        for engine in ENGINES:
+            for chunksize in (None, 100):
+                profiler, output_file = self.convert(
+                    f'{engine}-{chunksize}', chunksize, engine=engine)
+                self.assertTrue(filecmp.cmp(output_file, REFERENCE_CSV,
+                                            shallow=False),
+                                (engine, chunksize))
+                report = profiler.report()
+                self.assertEqual(report['rows_read'], 434)
+                self.assertEqual(report['rows_written'], 434)
+                self.assertEqual(report['rows_rejected'], 0)
+                for stage in STAGES:
+                    self.assertIn(stage, report['stages'],
+                                  (engine, chunksize))
+                if engine != 'vectorized':
+                    self.assertEqual(report['stages']['convert']['calls'],
+                                     434)
+                    self.assertEqual(
+                        report['stages']['validate.location']['calls'], 434)
+                self.assertIn('Profile: 434 rows read',
+                              profiler.format_report())
+
+        json_file = os.path.join(self.temp_dir.name, 'profile.json')
+        profiler.write_json(json_file)
+        with open(json_file) as f:
+            self.assertEqual(list(json.load(f)['stages'])[:2],
+                             ['read', 'select'])
+
+    def test_rejections(self):
+        limits = ChirpLimits(channel_max=99, offset_max=1)
+        rejections = {}
+        for engine in ENGINES:
+            profiler, output_file = self.convert(engine, engine=engine,
+                                                 limits=limits)
+            rejections[engine] = profiler.rejections
+            self.assertEqual(sum(profiler.rejections.values()),
+                             434 - profiler.rows_written)
+            self.assertEqual(profiler.rejections['location'], 334)
+            self.assertEqual(profiler.rejections['offset'], 20)
+        self.assertEqual(rejections['row'], rejections['stdlib'])
+        self.assertEqual(rejections['row'], rejections['vectorized'])
+
+    def test_null_profiler(self):
+        self.assertIs(NULL_PROFILER.validator(ChirpValidator),
+                      ChirpValidator)
+        self.assertIs(NULL_PROFILER.wrap('convert', len), len)
+        with NULL_PROFILER.stage('read'):
+            pass
+        self.assertEqual(NULL_PROFILER.report()['stages'], {})
+        self.assertIs(Converter().validator, ChirpValidator)
+        self.assertTrue(issubclass(Profiler().validator(ChirpValidator),
+                                   ChirpValidator))
+
+
+if __name__ == '__main__':
+    unittest.main()
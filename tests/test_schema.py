@@ -0,0 +1,140 @@
+# tests/test_schema.py
+
+"""
+Unit Tests for the WWARA schema and typed reader
+
+Purpose:
+    To ensure that inputs are checked against the schema of their
+    DATA_SPEC_VERSION before conversion, that the typed reader applies
+    the schema, uses less memory than type inference, and converts to
+    the same CHIRP output with every pandas engine and conversion mode,
+    and that positional records behave like the rows they present.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_schema.py
+
+Test Cases:
+    - test_dtypes: Tests the column types and the missing flags.
+    - test_memory: Tests that the typed frame is smaller.
+    - test_convert_file: Tests typed conversions against the reference.
+    - test_schema_registry: Tests looking up and checking schemas.
+    - test_unknown_version: Tests rejecting inputs before conversion.
+    - test_positional_record: Tests the record mapping.
+"""
+
+import filecmp
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.columns import WWARA_COLUMNS
+from wwara_chirp.converter import Converter, read_wwara_frame
+from wwara_chirp.core import ENGINES
+from wwara_chirp.schema import (FLAG_COLUMNS, SCHEMAS, WWARA_DTYPES,
+                                RecordAccessor, fill_flags, input_schema,
+                                read_typed_frame, schema_for,
+                                validate_schema)
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+
+class TestSchema(unittest.TestCase):
+
+    def test_dtypes(self):
+        self.assertEqual(set(WWARA_DTYPES), set(WWARA_COLUMNS))
+        df = read_typed_frame(TEST_CSV)
+        self.assertEqual(list(df.columns), WWARA_COLUMNS)
+        self.assertEqual(df['OUTPUT_FREQ'].dtype, 'float64')
+        self.assertEqual(df['FC_RECORD_ID'].dtype, 'int64')
+        self.assertIsInstance(df['STATE'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['LINK'].dtype, object)
+        for column in FLAG_COLUMNS:
+            self.assertIsInstance(df[column].dtype, pd.CategoricalDtype)
+            self.assertFalse(df[column].isna().any(), column)
+
+        flags = pd.DataFrame({'ARES': pd.Categorical(['Y', None, 'Y']),
+                              'WX': pd.Categorical([None, 'N', 'Y'])})
+        flags = fill_flags(flags)
+        self.assertEqual(flags['ARES'].tolist(), ['Y', 'N', 'Y'])
+        self.assertEqual(flags['WX'].tolist(), ['N', 'N', 'Y'])
+
+    def test_memory(self):
+        inferred = read_wwara_frame(TEST_CSV).memory_usage(deep=True).sum()
+        typed = read_typed_frame(TEST_CSV).memory_usage(deep=True).sum()
+        self.assertLess(typed, inferred / 2)
+
+    def test_convert_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for engine in ('row', 'vectorized'):
+                for chunksize in (None, 100):
+                    output_file = os.path.join(temp_dir,
+                                               f'{engine}-{chunksize}.csv')
+                    result = Converter(engine=engine,
+                                       reader='typed').convert_file(
+                        TEST_CSV, output_file, chunksize=chunksize)
+                    self.assertTrue(result.ok)
+                    self.assertTrue(filecmp.cmp(output_file, REFERENCE_CSV,
+                                                shallow=False),
+                                    (engine, chunksize))
+
+        with self.assertRaises(ValueError):
+            Converter(reader='arrow')
+
+    def test_schema_registry(self):
+        schema = input_schema(TEST_CSV)
+        self.assertIs(schema, SCHEMAS['2015.2.2'])
+        self.assertEqual(schema.columns, tuple(WWARA_COLUMNS))
+        self.assertEqual(schema.positions['OUTPUT_FREQ'], 2)
+        self.assertTrue(validate_schema(TEST_CSV))
+        for version in (None, '2030.1.0'):
+            with self.assertRaises(ValueError):
+                schema_for(version)
+
+        schema.check_columns(WWARA_COLUMNS)
+        for columns in (WWARA_COLUMNS[:-1], WWARA_COLUMNS + ['EXTRA'],
+                        WWARA_COLUMNS[1:] + WWARA_COLUMNS[:1]):
+            with self.assertRaises(ValueError):
+                schema.check_columns(columns)
+
+    def test_unknown_version(self):
+        with open(TEST_CSV) as f:
+            lines = f.readlines()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            inputs = {'2030.1.0': 'DATA_SPEC_VERSION=2030.1.0\n',
+                      'none': 'WWARA repeater list\n'}
+            for name, title in inputs.items():
+                input_file = os.path.join(temp_dir, f'{name}.csv')
+                with open(input_file, 'w') as f:
+                    f.writelines([title] + lines[1:])
+                self.assertFalse(validate_schema(input_file))
+                with self.assertRaises(ValueError):
+                    read_typed_frame(input_file)
+                for engine in ENGINES:
+                    output_file = os.path.join(temp_dir,
+                                               f'{name}-{engine}.csv')
+                    result = Converter(engine=engine).convert_file(
+                        input_file, output_file)
+                    self.assertFalse(result.ok)
+                    self.assertFalse(os.path.exists(output_file))
+
+    def test_positional_record(self):
+        df = read_wwara_frame(TEST_CSV)
+        records = list(RecordAccessor(df.columns).records(df.head(3)))
+        self.assertEqual(len(records), 3)
+        for record, (index, row) in zip(records, df.head(3).iterrows()):
+            self.assertEqual(list(record), WWARA_COLUMNS)
+            self.assertEqual(record['CALL'], row['CALL'])
+            self.assertEqual(record['OUTPUT_FREQ'], row['OUTPUT_FREQ'])
+            self.assertEqual(record.get('MISSING', 'default'), 'default')
+        with self.assertRaises(KeyError):
+            records[0]['MISSING']
+
+
+if __name__ == '__main__':
+    unittest.main()
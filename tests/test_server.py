@@ -0,0 +1,167 @@
+# tests/test_server.py
+
+"""
+Unit Tests for the conversion service
+
+Purpose:
+    To ensure that the HTTP service exports the same CHIRP files as a
+    conversion of the extract file, normalizes queries into cache keys,
+    serves repeated queries from its LRU cache, rejects invalid queries,
+    and loads a changed extract, emptying the cache.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+    The service listens on a free port of 127.0.0.1.
+
+    Example:
+        pytest tests/test_server.py
+
+Test Cases:
+    - test_export: Tests exports against file conversions.
+    - test_query: Tests query normalization and invalid queries.
+    - test_cache: Tests cache hits, eviction and loading a changed
+      extract without making requests wait.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from wwara_chirp.bands import FrequencyFilter
+from wwara_chirp.converter import Converter
+from wwara_chirp.geo import GeoFilter
+from wwara_chirp.server import ConversionService, ExportQuery, make_server
+from wwara_chirp.watch import WatchedExtract
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.temp_dir.name, 'rptrlist.csv')
+        shutil.copy(TEST_CSV, self.input_file)
+        self.service = ConversionService(
+            WatchedExtract(self.input_file, settle_seconds=0), cache_size=2)
+        self.assertTrue(self.service.reload())
+        self.server = make_server(self.service, port=0)
+        self.url = 'http://%s:%d' % self.server.server_address[:2]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.temp_dir.cleanup()
+
+    def get(self, path, method='GET'):
+        with urlopen(Request(self.url + path, method=method)) as response:
+            return response.read(), response.headers
+
+    def convert_file(self, **settings):
+        output_file = os.path.join(self.temp_dir.name, 'converted.csv')
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        Converter(**settings).convert_file(self.input_file, output_file)
+        with open(output_file, 'rb') as f:
+            return f.read()
+
+    def test_export(self):
+        body, headers = self.get('/export')
+        with open(REFERENCE_CSV, 'rb') as f:
+            self.assertEqual(body, f.read())
+        self.assertEqual(headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(headers['Content-Type'], 'text/csv; charset=utf-8')
+
+        body, headers = self.get('/export?band=2m&freq_range=440-441')
+        self.assertEqual(body, self.convert_file(
+            frequency_filter=FrequencyFilter.from_args(['2m'],
+                                                       ['440-441'])))
+
+        body, headers = self.get('/export?band=2m&near=47.61,-122.33'
+                                 '&radius_km=40&sort=distance')
+        self.assertEqual(body, self.convert_file(
+            frequency_filter=FrequencyFilter.from_args(['2m']),
+            geo_filter=GeoFilter.from_args('47.61,-122.33', 40,
+                                           sort=True)))
+        snapshot = self.service.dataset.current
+        self.assertIn('geo_index', vars(snapshot))
+        geo_index = snapshot.geo_index
+        self.get('/export?near=47.2,-122.4&radius_km=10')
+        self.assertIs(self.service.dataset.current.geo_index, geo_index)
+
+        body, headers = self.get('/export?mode=DV&channel_min=10'
+                                 '&channel_max=12&comment=none')
+        lines = body.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 4)
+        for location, line in zip(range(10, 13), lines[1:]):
+            fields = line.split(',')
+            self.assertEqual(fields[0], str(location))
+            self.assertEqual(fields[12], 'DV')
+            self.assertEqual(fields[16], '')
+
+        body, headers = self.get('/status')
+        self.assertIn(b'"records": 434', body)
+
+    def test_query(self):
+        self.assertEqual(
+            ExportQuery.from_params({'band': ['70cm,2m'], 'mode': ['fm']}),
+            ExportQuery.from_params({'band': ['440', '146'],
+                                     'mode': ['FM', 'FM']}))
+        self.assertNotEqual(ExportQuery.from_params({'band': ['2m']}),
+                            ExportQuery())
+        for query in ('band=99m', 'mode=AM', 'channel_min=10&channel_max=5',
+                      'channel_max=x', 'comment=/etc/passwd', 'near=47,-122',
+                      'radius_km=10', 'sort=name', 'color=red'):
+            with self.assertRaises(HTTPError) as error:
+                self.get(f'/export?{query}')
+            self.assertEqual(error.exception.code, 400, query)
+        for path, method in (('/', 'GET'), ('/export', 'POST')):
+            with self.assertRaises(HTTPError) as error:
+                self.get(path, method)
+            self.assertEqual(error.exception.code, 404)
+
+    def test_cache(self):
+        for path, cache in (('/export?band=2m', 'miss'),
+                            ('/export?band=146', 'hit'),
+                            ('/export?band=70cm', 'miss'),
+                            ('/export?band=6m', 'miss'),
+                            ('/export?band=2m', 'miss')):
+            body, headers = self.get(path)
+            self.assertEqual(headers['X-Cache'], cache, path)
+
+        with open(self.input_file) as f:
+            lines = f.readlines()
+        with open(self.input_file, 'w') as f:
+            f.writelines(lines[:12])
+        dataset = self.service.dataset
+        with dataset._load_lock:
+            body, headers = self.get('/export?band=2m')
+            self.assertEqual(headers['X-Cache'], 'hit')
+            self.assertEqual(dataset.generation, 1)
+        self.assertTrue(dataset.refresh())
+        deadline = time.monotonic() + 30
+        while dataset.generation < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        body, headers = self.get('/export?band=2m')
+        self.assertEqual(headers['X-Cache'], 'miss')
+        self.assertEqual(self.service.dataset.generation, 2)
+        self.assertEqual(len(self.service.dataset.frame), 10)
+        self.assertEqual(body, self.convert_file(
+            frequency_filter=FrequencyFilter.from_args(['2m'])))
+
+        body, headers = self.get('/reload', 'POST')
+        self.assertIn(b'"generation": 3', body)
+        self.assertEqual(len(self.service.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
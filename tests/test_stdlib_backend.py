@@ -0,0 +1,118 @@
+# tests/test_stdlib_backend.py
+
+"""
+Unit Tests for the standard library conversion engine
+
+Purpose:
+    To ensure that the stdlib engine reads WWARA files the way pandas
+    does and writes the same CHIRP file as the pandas engines, without
+    importing pandas.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_stdlib_backend.py
+
+Test Cases:
+    - test_infer_column: Tests the pandas column type rules.
+    - test_read_matches_pandas: Tests reading the same values as pandas.
+    - test_convert_file: Tests a conversion against the reference output.
+    - test_convert_file_zip: Tests converting a DataBaseExtract.zip.
+    - test_no_pandas_import: Tests that pandas is never imported.
+"""
+
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+
+import pandas as pd
+
+from wwara_chirp.converter import Converter
+from wwara_chirp.stdlib_backend import (convert_file, infer_column,
+                                        read_input)
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+
+NO_PANDAS_SCRIPT = f'''
+import sys
+from wwara_chirp.wwara_chirp import process_file
+process_file({TEST_CSV!r}, sys.argv[1], engine='stdlib')
+print('pandas' in sys.modules)
+'''
+
+
+class TestStdlibBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open('test_files/reference_output.csv', 'r') as f:
+            self.reference_output = f.read()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_output(self, output_file):
+        with open(output_file, 'r') as f:
+            return f.read()
+
+    def test_infer_column(self):
+        self.assertEqual(infer_column(['1', ' 2']), [1, 2])
+        with_missing = infer_column(['1', ''])
+        self.assertIsInstance(with_missing[0], float)
+        self.assertTrue(math.isnan(with_missing[1]))
+        self.assertEqual(infer_column(['100', '88.5']), [100.0, 88.5])
+        self.assertEqual(infer_column(['True', 'false']), [True, False])
+        self.assertEqual(infer_column(['Y', 'N']), ['Y', 'N'])
+        self.assertTrue(math.isnan(infer_column(['Y', 'NA'])[1]))
+        self.assertTrue(all(math.isnan(value)
+                            for value in infer_column(['', ''])))
+
+    def test_read_matches_pandas(self):
+        records = read_input(TEST_CSV)
+        df = pd.read_csv(TEST_CSV, skiprows=[0])
+        self.assertEqual(len(records), len(df))
+        for column in df.columns:
+            expected = df[column].tolist()
+            actual = [record[column] for record in records]
+            self.assertEqual([type(value) for value in actual],
+                             [type(value) for value in expected], column)
+            self.assertEqual(str(actual), str(expected), column)
+
+    def test_convert_file(self):
+        output_file = os.path.join(self.temp_dir.name, 'output.csv')
+        result = convert_file(TEST_CSV, output_file)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.rows_read, 434)
+        self.assertEqual(self.read_output(output_file), self.reference_output)
+
+        output_file = os.path.join(self.temp_dir.name, 'converter.csv')
+        Converter(engine='stdlib').convert_file(TEST_CSV, output_file)
+        self.assertEqual(self.read_output(output_file), self.reference_output)
+
+        self.assertFalse(convert_file(TEST_CSV, output_file).ok)
+
+    def test_convert_file_zip(self):
+        archive_path = os.path.join(self.temp_dir.name, 'DataBaseExtract.zip')
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            archive.write(TEST_CSV, 'WWARA-rptrlist-20260201.csv')
+        output_file = os.path.join(self.temp_dir.name, 'output.csv')
+        convert_file(archive_path, output_file)
+        self.assertEqual(self.read_output(output_file), self.reference_output)
+
+    def test_no_pandas_import(self):
+        output_file = os.path.join(self.temp_dir.name, 'output.csv')
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run(
+            [sys.executable, '-c', NO_PANDAS_SCRIPT, output_file],
+            capture_output=True, text=True, env=env, check=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+        self.assertEqual(self.read_output(output_file), self.reference_output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# tests/test_vectorized.py
+
+"""
+Unit Tests for the vectorized WWARA to CHIRP conversion engine
+
+Purpose:
+    To ensure that convert_frame produces the same CHIRP rows as the
+    per-row process_row engine.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_vectorized.py
+
+Test Cases:
+    - test_convert_frame_matches_process_row: Compares both engines on the
+      test extract, row by row.
+    - test_convert_frame_start_channel: Tests Location numbering.
+    - test_convert_comment_budget: Tests the 255 character comment budget.
+"""
+
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.columns import CHIRP_COLUMNS
+from wwara_chirp.converter import Converter
+from wwara_chirp.vectorized import convert_frame, convert_comment
+
+
+class TestVectorized(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.read_csv('test_files/WWARA-rptrlist-TEST.csv',
+                              skiprows=[0])
+
+    def test_convert_frame_matches_process_row(self):
+        converted = convert_frame(self.df)
+        self.assertEqual(list(converted.columns), CHIRP_COLUMNS)
+        self.assertEqual(len(converted), len(self.df))
+
+        converter = Converter()
+        for index, wwara_row in self.df.iterrows():
+            expected = converter.convert_row(wwara_row)
+            actual = converted.iloc[index]
+            for column in CHIRP_COLUMNS:
+                self.assertEqual(str(actual[column]), str(expected[column]),
+                                 f'row {index} column {column}')
+
+    def test_convert_frame_start_channel(self):
+        converted = convert_frame(self.df.head(3), start_channel=10)
+        self.assertEqual(converted['Location'].tolist(), [10, 11, 12])
+
+    def test_convert_comment_budget(self):
+        row = self.df.head(1).copy()
+        row['COMMENT'] = 'A' * 250
+        comment = convert_comment(row).iloc[0]
+        self.assertLessEqual(len(comment), 255)
+        self.assertTrue(comment.startswith('A' * 250))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+# tests/test_watch.py
+
+"""
+Unit Tests for watched extracts
+
+Purpose:
+    To ensure that the newest extract of a directory is found, loaded
+    and swapped in whole, that invalid and unfinished extracts are
+    skipped while the previous one stays in use, and that the CHIRP
+    file written for each extract is the one process_file writes, even
+    if writing it first failed.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_watch.py
+
+Test Cases:
+    - test_find_extracts: Tests finding and ordering extracts.
+    - test_swap: Tests loading new, invalid and unfinished extracts.
+    - test_retry_swap: Tests retrying a failed write, loads that do not
+      wait and loads started by refresh.
+    - test_background: Tests polling from a background thread.
+    - test_main: Tests the watch command.
+"""
+
+import filecmp
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from wwara_chirp.converter import Converter
+from wwara_chirp.watch import (OutputWriter, WatchedExtract, find_extracts,
+                               main)
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, 'incoming')
+        os.mkdir(self.directory)
+        self.output_file = os.path.join(self.temp_dir.name, 'chirp.csv')
+        with open(TEST_CSV) as f:
+            self.lines = f.readlines()
+        self.mtime = time.time() - 3600
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def add_extract(self, name, lines=None):
+        """Write an extract, each one newer than the one before."""
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.writelines(self.lines if lines is None else lines)
+        self.mtime += 60
+        os.utime(path, (self.mtime, self.mtime))
+        return path
+
+    def test_find_extracts(self):
+        newer = self.add_extract('WWARA-rptrlist-20260102.csv')
+        older = self.add_extract('WWARA-rptrlist-20260101.csv')
+        archive = self.add_extract('DataBaseExtract.zip')
+        pending = self.add_extract('WWARA-pending-rptrlist-20260103.csv')
+        self.add_extract('notes.txt')
+        self.assertEqual(find_extracts(self.directory),
+                         [newer, older, archive])
+        self.assertEqual(find_extracts(self.directory, 'pending'),
+                         [archive, pending])
+
+    def test_swap(self):
+        writer = OutputWriter(self.output_file,
+                              Converter(engine='vectorized'))
+        extract = WatchedExtract(self.directory, settle_seconds=0,
+                                 on_swap=writer)
+        self.assertFalse(extract.load())
+        first = self.add_extract('WWARA-rptrlist-20260101.csv')
+        self.assertTrue(extract.changed())
+        self.assertTrue(extract.load())
+        self.assertFalse(extract.load())
+        snapshot = extract.current
+        self.assertEqual((snapshot.input_file, snapshot.generation),
+                         (first, 1))
+        self.assertTrue(filecmp.cmp(self.output_file, REFERENCE_CSV,
+                                    shallow=False))
+
+        self.add_extract('WWARA-rptrlist-20260102.csv',
+                         ['DATA_SPEC_VERSION=2030.1.0\n'] + self.lines[1:])
+        self.assertFalse(extract.load())
+        self.assertFalse(extract.changed())
+        self.assertIs(extract.current, snapshot)
+
+        second = self.add_extract('WWARA-rptrlist-20260103.csv',
+                                  self.lines[:102])
+        self.assertTrue(extract.load())
+        self.assertEqual(extract.generation, 2)
+        self.assertEqual(len(extract.frame), 100)
+        self.assertEqual(len(snapshot.frame), 434)
+        self.assertEqual(writer.written, 2)
+        expected_file = os.path.join(self.temp_dir.name, 'expected.csv')
+        Converter().convert_file(second, expected_file)
+        self.assertTrue(filecmp.cmp(self.output_file, expected_file,
+                                    shallow=False))
+        self.assertEqual(os.listdir(self.temp_dir.name).count('chirp.csv'),
+                         1)
+
+        extract.settle_seconds = 3600
+        self.add_extract('WWARA-rptrlist-20260104.csv')
+        os.utime(os.path.join(self.directory, 'WWARA-rptrlist-20260104.csv'))
+        self.assertFalse(extract.load())
+        self.assertTrue(extract.load(force=True))
+        self.assertEqual(extract.generation, 3)
+
+    def test_retry_swap(self):
+        output_dir = os.path.join(self.temp_dir.name, 'radios')
+        writer = OutputWriter(os.path.join(output_dir, 'chirp.csv'),
+                              Converter(engine='vectorized'))
+        extract = WatchedExtract(self.directory, settle_seconds=0,
+                                 on_swap=writer)
+        self.add_extract('WWARA-rptrlist-20260101.csv')
+        self.assertTrue(extract.load())
+        self.assertEqual(writer.written, 0)
+        self.assertFalse(extract.load())
+        os.mkdir(output_dir)
+        self.assertFalse(extract.load())
+        self.assertEqual(writer.written, 1)
+        self.assertFalse(extract.load())
+        self.assertEqual(writer.written, 1)
+
+        with extract._load_lock:
+            self.assertFalse(extract.load(force=True, blocking=False))
+            self.add_extract('WWARA-rptrlist-20260102.csv')
+            self.assertFalse(extract.refresh())
+        self.assertTrue(extract.refresh())
+        deadline = time.monotonic() + 30
+        while writer.written < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(extract.generation, 2)
+        self.assertEqual(writer.written, 2)
+
+    def test_background(self):
+        self.add_extract('WWARA-rptrlist-20260101.csv')
+        extract = WatchedExtract(self.directory, settle_seconds=0)
+        extract.start(interval=0.05)
+        try:
+            self.assertTrue(extract.watching)
+            second = self.add_extract('WWARA-rptrlist-20260102.csv',
+                                      self.lines[:12])
+            deadline = time.monotonic() + 30
+            while extract.generation < 2 and time.monotonic() < deadline:
+                snapshot = extract.current
+                if snapshot is not None:
+                    self.assertIn(len(snapshot.frame), (434, 10))
+                time.sleep(0.01)
+        finally:
+            extract.stop()
+        self.assertFalse(extract.watching)
+        self.assertEqual(extract.current.input_file, second)
+        self.assertEqual(len(extract.frame), 10)
+
+    def test_main(self):
+        self.add_extract('WWARA-rptrlist-20260101.csv')
+        log_file = os.path.join(self.temp_dir.name, 'watch.log')
+        self.assertEqual(main([self.directory, self.output_file, '--once',
+                               '--log-file', log_file]), 0)
+        self.assertTrue(filecmp.cmp(self.output_file, REFERENCE_CSV,
+                                    shallow=False))
+        shutil.rmtree(self.directory)
+        os.mkdir(self.directory)
+        self.assertEqual(main([self.directory, self.output_file, '--once',
+                               '--log-file', log_file]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
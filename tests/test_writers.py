@@ -0,0 +1,203 @@
+# tests/test_writers.py
+
+"""
+Unit Tests for the CHIRP file writer
+
+Purpose:
+    To ensure that ChirpCsvWriter writes the bytes DataFrame.to_csv
+    writes, from rows and from DataFrames, that the output file is only
+    replaced once it is complete, and that every engine writes the same
+    rows to the extra output formats.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_writers.py
+
+Test Cases:
+    - test_format: Tests rows, DataFrames and csv_blocks against
+      DataFrame.to_csv.
+    - test_atomic: Tests that a failed write keeps the previous file.
+    - test_atomic_outputs: Tests that a failed extra output keeps every
+      previous file.
+    - test_extra_outputs: Tests the CSV and NDJSON extra outputs.
+    - test_arrow_outputs: Tests the Parquet and Arrow IPC outputs, if
+      pyarrow is installed.
+    - test_arrow_missing: Tests rejecting them if it is not.
+"""
+
+import filecmp
+import importlib.util
+import json
+import math
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from wwara_chirp.converter import Converter
+from wwara_chirp.core import ENGINES
+from wwara_chirp.writers import (ChirpCsvWriter, ChirpOutputs, csv_blocks,
+                                 output_format)
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+REFERENCE_CSV = 'test_files/reference_output.csv'
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestWriters(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.temp_dir.name, 'chirp.csv')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_format(self):
+        converter = Converter(engine='vectorized')
+        chirp_table = converter.convert_frame(converter.read_frame(TEST_CSV))
+        chirp_table.loc[0, 'Name'] = 'Quote "me", twice\nplease'
+        chirp_table.loc[1, 'Comment'] = math.nan
+        chirp_table['Skip'] = pd.array([None] * len(chirp_table),
+                                       dtype='string')
+        chirp_table['TStep'] = 5.0
+        expected_file = os.path.join(self.temp_dir.name, 'expected.csv')
+        chirp_table.to_csv(expected_file, index=False)
+        expected = self.read(expected_file)
+
+        for buffer_size in (1, 4096):
+            with ChirpCsvWriter(self.output_file,
+                                buffer_size=buffer_size) as output:
+                output.write_frame(chirp_table[:100])
+                output.write_frame(chirp_table[100:100])
+                output.write_rows(chirp_table[100:].to_dict('records'))
+            self.assertEqual(output.rows_written, len(chirp_table))
+            self.assertEqual(self.read(self.output_file), expected)
+
+        for block_size in (1, 4096, 1 << 20):
+            blocks = list(csv_blocks(chirp_table, block_size=block_size))
+            self.assertEqual(b''.join(blocks), expected)
+            for block in blocks[:-1]:
+                self.assertGreaterEqual(len(block), block_size)
+
+        columns = ['Location', 'Name', 'Frequency']
+        with ChirpCsvWriter(self.output_file, columns) as output:
+            output.write_row({'Location': 0, 'Frequency': '146.960000'})
+        self.assertEqual(self.read(self.output_file).decode().splitlines(),
+                         ['Location,Name,Frequency', '0,,146.960000'])
+        with self.assertRaises(ValueError):
+            ChirpCsvWriter(self.output_file, buffer_size=0)
+
+    def test_atomic(self):
+        with open(self.output_file, 'w') as f:
+            f.write('previous\n')
+        output = ChirpCsvWriter(self.output_file)
+        with self.assertRaises(KeyError):
+            with output:
+                output.write_row({'Location': 0})
+                self.assertTrue(os.path.exists(output.temp_file))
+                output.write_frame(pd.DataFrame({'Location': [1]}))
+        self.assertEqual(self.read(self.output_file), b'previous\n')
+        self.assertEqual(os.listdir(self.temp_dir.name), ['chirp.csv'])
+
+        with output:
+            output.write_row({'Location': 0})
+        self.assertTrue(self.read(self.output_file).startswith(b'Location,'))
+        self.assertEqual(os.listdir(self.temp_dir.name), ['chirp.csv'])
+
+    def test_atomic_outputs(self):
+        ndjson_file = os.path.join(self.temp_dir.name, 'chirp.ndjson')
+        copy_file = os.path.join(self.temp_dir.name, 'copies', 'copy.csv')
+        for path in (self.output_file, ndjson_file):
+            with open(path, 'w') as f:
+                f.write('previous\n')
+        output = ChirpOutputs(self.output_file, [ndjson_file, copy_file],
+                              ['Location', 'Name'])
+        with self.assertRaises(OSError):
+            with output:
+                output.write_row({'Location': 0})
+        for path in (self.output_file, ndjson_file):
+            self.assertEqual(self.read(path), b'previous\n')
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)),
+                         ['chirp.csv', 'chirp.ndjson'])
+
+        os.mkdir(os.path.dirname(copy_file))
+        with output:
+            output.write_row({'Location': 0})
+        self.assertEqual(self.read(self.output_file), b'Location,Name\n0,\n')
+        self.assertEqual(self.read(copy_file), self.read(self.output_file))
+        with open(ndjson_file, encoding='utf-8') as f:
+            self.assertEqual(json.loads(f.readline())['Location'], 0)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)),
+                         ['chirp.csv', 'chirp.ndjson', 'copies'])
+
+    def convert(self, name, engine='vectorized', extensions=(), **settings):
+        """Convert TEST_CSV, returning the extra output paths."""
+        output_file = os.path.join(self.temp_dir.name, f'{name}.csv')
+        extra_outputs = [os.path.join(self.temp_dir.name, f'{name}{ext}')
+                         for ext in extensions]
+        result = Converter(engine=engine).convert_file(
+            TEST_CSV, output_file, extra_outputs=extra_outputs, **settings)
+        self.assertTrue(result.ok)
+        self.assertTrue(filecmp.cmp(output_file, REFERENCE_CSV,
+                                    shallow=False), name)
+        return extra_outputs
+
+    def test_extra_outputs(self):
+        self.assertEqual(output_format('chirp.JSONL'), 'ndjson')
+        with self.assertRaises(ValueError):
+            output_format('chirp.xlsx')
+
+        records = []
+        for engine in ENGINES:
+            for settings in ({}, {'chunksize': 100}):
+                name = f'{engine}-{len(settings)}'
+                copy_file, ndjson_file = self.convert(
+                    name, engine, ('.copy.csv', '.ndjson'), **settings)
+                self.assertTrue(filecmp.cmp(copy_file, REFERENCE_CSV,
+                                            shallow=False), name)
+                with open(ndjson_file, encoding='utf-8') as f:
+                    records.append([json.loads(line) for line in f])
+        for other in records[1:]:
+            self.assertEqual(other, records[0])
+
+        reference = pd.read_csv(REFERENCE_CSV, keep_default_na=False,
+                                dtype=str)
+        self.assertEqual(len(records[0]), len(reference))
+        for record, row in zip(records[0], reference.to_dict('records')):
+            self.assertIsInstance(record['Location'], int)
+            self.assertIsInstance(record['DtcsCode'], int)
+            self.assertEqual({column: str(value)
+                              for column, value in record.items()}, row)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_arrow_outputs(self):
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+
+        parquet_file, arrow_file = self.convert('arrow', 'row',
+                                                ('.parquet', '.arrow'))
+        for table in (pq.read_table(parquet_file),
+                      feather.read_table(arrow_file)):
+            self.assertEqual(table.num_rows, 434)
+            self.assertEqual(str(table.schema.field('Location').type),
+                             'int64')
+            self.assertEqual(table.column('Frequency')[0].as_py(),
+                             '29.680000')
+
+    @unittest.skipIf(HAS_PYARROW, 'pyarrow is installed')
+    def test_arrow_missing(self):
+        with self.assertRaisesRegex(ValueError, 'pyarrow'):
+            output_format('chirp.parquet')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,6 +16,10 @@
         - test_validate_input_file: Tests the validation of input file paths.
         - test_validate_output_file: Tests the validation of output file paths.
         - test_process_row: Tests the processing of WWARA rows into CHIRP rows.
+        - test_process_file_vectorized: Tests the vectorized engine against the
+          reference output.
+        - test_process_file_chunked: Tests streaming conversion in chunks,
+          and rejecting bad files and chunk sizes.
 """
 import subprocess
 import sys
@@ -23,7 +27,7 @@ import os
 import unittest
 import pandas as pd
 
-from wwara_chirp.wwara_chirp import write_output_file, main, process_row, process_file
+from wwara_chirp.wwara_chirp import write_output_file, main, process_row, process_file, process_file_chunked
 
 # Add the module's directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -49,6 +53,47 @@ class TestWWARACSVToChirpCSV(unittest.TestCase):
         self.assertEqual(output, reference_output)
         os.remove('test_files/test_output_file.csv')
 
+    def test_process_file_vectorized(self):
+        process_file('test_files/WWARA-rptrlist-TEST.csv',
+                     'test_files/test_output_vectorized.csv',
+                     engine='vectorized')
+        with open('test_files/test_output_vectorized.csv', 'r') as f:
+            output = f.read()
+        with open('test_files/reference_output.csv', 'r') as f:
+            reference_output = f.read()
+        self.assertEqual(output, reference_output)
+        os.remove('test_files/test_output_vectorized.csv')
+
+    def test_process_file_chunked(self):
+        for engine in ('row', 'vectorized'):
+            process_file('test_files/WWARA-rptrlist-TEST.csv',
+                         'test_files/test_output_chunked.csv',
+                         engine=engine, chunksize=7)
+            with open('test_files/test_output_chunked.csv', 'r') as f:
+                output = f.read()
+            with open('test_files/reference_output.csv', 'r') as f:
+                reference_output = f.read()
+            self.assertEqual(output, reference_output)
+            os.remove('test_files/test_output_chunked.csv')
+
+        with self.assertRaises(SystemExit):
+            process_file_chunked('test_files/missing.csv',
+                                 'test_files/test_output_chunked.csv', 7)
+        with self.assertRaises(SystemExit):
+            process_file_chunked('test_files/WWARA-rptrlist-TEST.csv',
+                                 'test_files/reference_output.csv', 7)
+        self.assertFalse(os.path.exists('test_files/test_output_chunked.csv'))
+        with self.assertRaises(ValueError):
+            process_file('test_files/WWARA-rptrlist-TEST.csv',
+                         'test_files/test_output_chunked.csv', chunksize=-1)
+        for chunksize in ('0', '-5'):
+            sys.argv = ['wwara_chirp', 'test_files/WWARA-rptrlist-TEST.csv',
+                        'test_files/test_output_chunked.csv', '--chunksize',
+                        chunksize]
+            with self.assertRaises(SystemExit) as error:
+                main()
+            self.assertEqual(error.exception.code, 2)
+
     def test_main(self):
         # Simulate command line arguments
         sys.argv = ['wwara_chirp', 'test_files/WWARA-rptrlist-TEST.csv', 'test_files/test_output_main.csv']
@@ -0,0 +1,92 @@
+# tests/test_wwara_extract.py
+
+"""
+Unit Tests for reading the WWARA DataBaseExtract.zip archive
+
+Purpose:
+    To ensure that the WWARA lists can be found and streamed straight out
+    of the nightly extract archive, and that converting the archive gives
+    the same output as converting the unpacked CSV file.
+
+Usage:
+    Run these tests from the tests directory using pytest or unittest.
+
+    Example:
+        pytest tests/test_wwara_extract.py
+
+Test Cases:
+    - test_is_zip_extract: Tests telling archives from CSV files.
+    - test_find_member: Tests finding each list by file name pattern.
+    - test_open_input: Tests reading a list straight from the archive.
+    - test_process_file_zip: Tests converting the archive end to end.
+    - test_validate_extract: Tests rejecting an archive without the list.
+"""
+
+import os
+import tempfile
+import unittest
+import zipfile
+
+import pandas as pd
+
+from wwara_chirp.wwara_chirp import process_file
+from wwara_chirp.wwara_extract import (find_member, is_zip_extract,
+                                       open_input, validate_extract)
+
+TEST_CSV = 'test_files/WWARA-rptrlist-TEST.csv'
+
+
+class TestWWARAExtract(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.archive_path = os.path.join(self.temp_dir.name,
+                                         'DataBaseExtract.zip')
+        with zipfile.ZipFile(self.archive_path, 'w',
+                             zipfile.ZIP_DEFLATED) as archive:
+            archive.write(TEST_CSV, 'WWARA-rptrlist-20260201.csv')
+            archive.write(TEST_CSV, 'WWARA-pending-rptrlist-20260201.csv')
+            archive.writestr('readme.txt', 'WWARA database extract')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_is_zip_extract(self):
+        self.assertTrue(is_zip_extract(self.archive_path))
+        self.assertFalse(is_zip_extract(TEST_CSV))
+
+    def test_find_member(self):
+        with zipfile.ZipFile(self.archive_path) as archive:
+            self.assertEqual(find_member(archive),
+                             'WWARA-rptrlist-20260201.csv')
+            self.assertEqual(find_member(archive, 'pending'),
+                             'WWARA-pending-rptrlist-20260201.csv')
+            with self.assertRaises(ValueError):
+                find_member(archive, 'expired')
+            with self.assertRaises(ValueError):
+                find_member(archive, 'unknown')
+
+    def test_open_input(self):
+        with open_input(self.archive_path) as source:
+            from_archive = pd.read_csv(source, skiprows=[0])
+        with open_input(TEST_CSV) as source:
+            from_csv = pd.read_csv(source, skiprows=[0])
+        pd.testing.assert_frame_equal(from_archive, from_csv)
+
+    def test_process_file_zip(self):
+        output_file = os.path.join(self.temp_dir.name, 'output.csv')
+        process_file(self.archive_path, output_file)
+        with open(output_file, 'r') as f:
+            output = f.read()
+        with open('test_files/reference_output.csv', 'r') as f:
+            reference_output = f.read()
+        self.assertEqual(output, reference_output)
+
+    def test_validate_extract(self):
+        self.assertTrue(validate_extract(self.archive_path))
+        self.assertTrue(validate_extract(TEST_CSV))
+        self.assertFalse(validate_extract(self.archive_path, 'expired'))
+
+
+if __name__ == '__main__':
+    unittest.main()